@@ -29,6 +29,15 @@ def _is_sqlite_url(url: str) -> bool:
     return url.startswith("sqlite:")
 
 
+def _include_object(obj, _name, type_, reflected, _compare_to) -> bool:
+    # Indexes declared with Index.ddl_if(dialect=...) only exist on that backend; skip them elsewhere.
+    if type_ == "index" and not reflected:
+        ddl_if = getattr(obj, "_ddl_if", None)
+        if ddl_if is not None and ddl_if.dialect and ddl_if.dialect != context.get_context().dialect.name:
+            return False
+    return True
+
+
 def run_migrations_offline() -> None:
     url = _get_url()
     context.configure(
@@ -38,6 +47,7 @@ def run_migrations_offline() -> None:
         dialect_opts={"paramstyle": "named"},
         compare_type=True,
         compare_server_default=True,
+        include_object=_include_object,
         render_as_batch=_is_sqlite_url(url),
     )
 
@@ -55,6 +65,7 @@ def run_migrations_online() -> None:
             target_metadata=target_metadata,
             compare_type=True,
             compare_server_default=True,
+            include_object=_include_object,
             render_as_batch=connection.dialect.name == "sqlite",
         )
 
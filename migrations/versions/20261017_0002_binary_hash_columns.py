@@ -0,0 +1,100 @@
+"""Store SHA-256 hash columns as raw 32-byte digests.
+
+Revision ID: 20261017_0002
+Revises: 20260208_0001
+Create Date: 2026-10-17 00:00:00
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0002"
+down_revision = "20260208_0001"
+branch_labels = None
+depends_on = None
+
+# (table, column, nullable)
+_HASH_COLUMNS = (
+    ("user_sessions", "token_hash", False),
+    ("user_sessions", "csrf_hash", False),
+    ("login_codes", "code_hash", False),
+    ("documents", "sha256", False),
+    ("analysis_jobs", "access_token_hash", True),
+)
+
+
+def _is_binary(bind, table: str, column: str) -> bool:
+    for col in sa.inspect(bind).get_columns(table):
+        if col["name"] == column:
+            return isinstance(col["type"], sa.LargeBinary)
+    return False
+
+
+def _convert_sqlite_values(bind, table: str, column: str, *, to_binary: bool) -> None:
+    source_type = "text" if to_binary else "blob"
+    rows = bind.execute(
+        sa.text(f"SELECT rowid, {column} FROM {table} WHERE typeof({column}) = '{source_type}'")
+    ).all()
+    for rowid, value in rows:
+        converted = bytes.fromhex(value) if to_binary else bytes(value).hex()
+        bind.execute(
+            sa.text(f"UPDATE {table} SET {column} = :value WHERE rowid = :rowid"),
+            {"value": converted, "rowid": rowid},
+        )
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    for table, column, nullable in _HASH_COLUMNS:
+        # The baseline revision builds tables from the current models, so fresh DBs are already binary.
+        if _is_binary(bind, table, column):
+            continue
+        if bind.dialect.name == "postgresql":
+            op.alter_column(
+                table,
+                column,
+                type_=sa.LargeBinary(32),
+                existing_type=sa.String(64),
+                existing_nullable=nullable,
+                postgresql_using=f"decode({column}, 'hex')",
+            )
+            continue
+        if bind.dialect.name == "sqlite":
+            # Convert in place first: the batch table copy CASTs values to the new column type.
+            _convert_sqlite_values(bind, table, column, to_binary=True)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(
+                column,
+                type_=sa.LargeBinary(32),
+                existing_type=sa.String(64),
+                existing_nullable=nullable,
+            )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    for table, column, nullable in _HASH_COLUMNS:
+        if not _is_binary(bind, table, column):
+            continue
+        if bind.dialect.name == "postgresql":
+            op.alter_column(
+                table,
+                column,
+                type_=sa.String(64),
+                existing_type=sa.LargeBinary(32),
+                existing_nullable=nullable,
+                postgresql_using=f"encode({column}, 'hex')",
+            )
+            continue
+        if bind.dialect.name == "sqlite":
+            # Convert in place first: the batch table copy CASTs values to the new column type.
+            _convert_sqlite_values(bind, table, column, to_binary=False)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(
+                column,
+                type_=sa.String(64),
+                existing_type=sa.LargeBinary(32),
+                existing_nullable=nullable,
+            )
@@ -0,0 +1,48 @@
+"""Add partial indexes for the pending queue and running-job heartbeat scans.
+
+Revision ID: 20261017_0003
+Revises: 20261017_0002
+Create Date: 2026-10-17 00:00:00
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0003"
+down_revision = "20261017_0002"
+branch_labels = None
+depends_on = None
+
+# (index name, column, status predicate)
+_PARTIAL_INDEXES = (
+    ("ix_analysis_jobs_pending_created_at", "created_at", "status = 'PENDING'"),
+    ("ix_analysis_jobs_running_heartbeat", "last_heartbeat_at", "status = 'RUNNING'"),
+)
+
+
+def _index_names(bind) -> set[str]:
+    return {ix["name"] for ix in sa.inspect(bind).get_indexes("analysis_jobs")}
+
+
+def upgrade() -> None:
+    # The baseline revision builds tables from the current models, so fresh DBs already have these.
+    existing = _index_names(op.get_bind())
+    for name, column, predicate in _PARTIAL_INDEXES:
+        if name in existing:
+            continue
+        op.create_index(
+            name,
+            "analysis_jobs",
+            [column],
+            postgresql_where=sa.text(predicate),
+            sqlite_where=sa.text(predicate),
+        )
+
+
+def downgrade() -> None:
+    existing = _index_names(op.get_bind())
+    for name, _column, _predicate in _PARTIAL_INDEXES:
+        if name in existing:
+            op.drop_index(name, table_name="analysis_jobs")
@@ -0,0 +1,63 @@
+"""Stamp created/updated timestamps with database-side UTC defaults.
+
+Revision ID: 20261017_0004
+Revises: 20261017_0003
+Create Date: 2026-10-17 00:00:00
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+from server.miscite.core.db import utcnow
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0004"
+down_revision = "20261017_0003"
+branch_labels = None
+depends_on = None
+
+_TIMESTAMP_COLUMNS = (
+    ("users", "created_at"),
+    ("user_sessions", "created_at"),
+    ("login_codes", "created_at"),
+    ("documents", "created_at"),
+    ("analysis_jobs", "created_at"),
+    ("analysis_job_events", "created_at"),
+    ("billing_accounts", "updated_at"),
+    ("billing_transactions", "created_at"),
+    ("cache_entries", "created_at"),
+)
+
+
+def _has_server_default(bind, table: str, column: str) -> bool:
+    for col in sa.inspect(bind).get_columns(table):
+        if col["name"] == column:
+            return col.get("default") is not None
+    return False
+
+
+def _set_server_default(table: str, column: str, default) -> None:
+    with op.batch_alter_table(table) as batch_op:
+        batch_op.alter_column(
+            column,
+            existing_type=sa.DateTime(),
+            existing_nullable=False,
+            server_default=default,
+        )
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    for table, column in _TIMESTAMP_COLUMNS:
+        # The baseline revision builds tables from the current models, so fresh DBs already have defaults.
+        if _has_server_default(bind, table, column):
+            continue
+        _set_server_default(table, column, utcnow())
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    for table, column in _TIMESTAMP_COLUMNS:
+        if _has_server_default(bind, table, column):
+            _set_server_default(table, column, None)
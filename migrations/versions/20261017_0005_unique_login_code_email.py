@@ -0,0 +1,50 @@
+"""Keep one login code per email (unique index) so code requests can upsert.
+
+Revision ID: 20261017_0005
+Revises: 20261017_0004
+Create Date: 2026-10-17 00:00:00
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0005"
+down_revision = "20261017_0004"
+branch_labels = None
+depends_on = None
+
+_INDEX = "ix_login_codes_email"
+
+
+def _email_index_unique(bind) -> bool | None:
+    for ix in sa.inspect(bind).get_indexes("login_codes"):
+        if ix["name"] == _INDEX:
+            return bool(ix.get("unique"))
+    return None
+
+
+def upgrade() -> None:
+    # The baseline revision builds tables from the current models, so fresh DBs already have this.
+    if _email_index_unique(op.get_bind()):
+        return
+    # Codes are short-lived; drop any address with several outstanding codes (it can request a new one).
+    op.execute(
+        sa.text(
+            "DELETE FROM login_codes WHERE email IN "
+            "(SELECT email FROM login_codes GROUP BY email HAVING COUNT(*) > 1)"
+        )
+    )
+    with op.batch_alter_table("login_codes") as batch:
+        if _email_index_unique(op.get_bind()) is not None:
+            batch.drop_index(_INDEX)
+        batch.create_index(_INDEX, ["email"], unique=True)
+
+
+def downgrade() -> None:
+    if _email_index_unique(op.get_bind()) is not True:
+        return
+    with op.batch_alter_table("login_codes") as batch:
+        batch.drop_index(_INDEX)
+        batch.create_index(_INDEX, ["email"], unique=False)
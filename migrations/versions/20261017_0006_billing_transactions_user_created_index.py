@@ -0,0 +1,42 @@
+"""Index billing transactions by (user_id, created_at) for the recent-activity query.
+
+Revision ID: 20261017_0006
+Revises: 20261017_0005
+Create Date: 2026-10-17 00:00:00
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0006"
+down_revision = "20261017_0005"
+branch_labels = None
+depends_on = None
+
+_TABLE = "billing_transactions"
+_COMPOSITE = "ix_billing_transactions_user_created_at"
+# Superseded: the composite index's leading column answers the same lookups.
+_USER_ID = "ix_billing_transactions_user_id"
+
+
+def _index_names(bind) -> set[str]:
+    return {ix["name"] for ix in sa.inspect(bind).get_indexes(_TABLE)}
+
+
+def upgrade() -> None:
+    # The baseline revision builds tables from the current models, so fresh DBs already match.
+    existing = _index_names(op.get_bind())
+    if _COMPOSITE not in existing:
+        op.create_index(_COMPOSITE, _TABLE, ["user_id", "created_at"])
+    if _USER_ID in existing:
+        op.drop_index(_USER_ID, table_name=_TABLE)
+
+
+def downgrade() -> None:
+    existing = _index_names(op.get_bind())
+    if _USER_ID not in existing:
+        op.create_index(_USER_ID, _TABLE, ["user_id"])
+    if _COMPOSITE in existing:
+        op.drop_index(_COMPOSITE, table_name=_TABLE)
@@ -0,0 +1,47 @@
+"""Index jobs by (user_id, created_at) and job events by (job_id, id) for dashboard and progress reads.
+
+Revision ID: 20261017_0007
+Revises: 20261017_0006
+Create Date: 2026-10-17 00:00:00
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0007"
+down_revision = "20261017_0006"
+branch_labels = None
+depends_on = None
+
+# (table, composite index, its columns, single-column index it supersedes, that index's column)
+_INDEXES = (
+    ("analysis_jobs", "ix_analysis_jobs_user_created_at", ["user_id", "created_at"], "ix_analysis_jobs_user_id", "user_id"),
+    ("analysis_job_events", "ix_analysis_job_events_job_id_id", ["job_id", "id"], "ix_analysis_job_events_job_id", "job_id"),
+)
+
+
+def _index_names(bind, table: str) -> set[str]:
+    return {ix["name"] for ix in sa.inspect(bind).get_indexes(table)}
+
+
+def upgrade() -> None:
+    # The baseline revision builds tables from the current models, so fresh DBs already match.
+    bind = op.get_bind()
+    for table, composite, columns, single, _column in _INDEXES:
+        existing = _index_names(bind, table)
+        if composite not in existing:
+            op.create_index(composite, table, columns)
+        if single in existing:
+            op.drop_index(single, table_name=table)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    for table, composite, _columns, single, column in _INDEXES:
+        existing = _index_names(bind, table)
+        if single not in existing:
+            op.create_index(single, table, [column])
+        if composite in existing:
+            op.drop_index(composite, table_name=table)
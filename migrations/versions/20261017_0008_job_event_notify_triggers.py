@@ -0,0 +1,56 @@
+"""NOTIFY job_events with the job id on job event inserts and job status changes (Postgres only).
+
+Revision ID: 20261017_0008
+Revises: 20261017_0007
+Create Date: 2026-10-17 00:00:00
+"""
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0008"
+down_revision = "20261017_0007"
+branch_labels = None
+depends_on = None
+
+# Triggers fire for every writer (worker processes, cancel routes, reapers) without each call site
+# remembering to notify; NOTIFY is delivered on commit and coalesces duplicates within a transaction.
+_FUNCTION = """
+CREATE OR REPLACE FUNCTION miscite_notify_job_event() RETURNS trigger AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'analysis_jobs' THEN
+        PERFORM pg_notify('job_events', NEW.id);
+    ELSE
+        PERFORM pg_notify('job_events', NEW.job_id);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+_TRIGGERS = (
+    ("analysis_job_events_notify", "analysis_job_events", "AFTER INSERT ON analysis_job_events FOR EACH ROW"),
+    (
+        "analysis_jobs_status_notify",
+        "analysis_jobs",
+        "AFTER UPDATE OF status ON analysis_jobs FOR EACH ROW WHEN (OLD.status IS DISTINCT FROM NEW.status)",
+    ),
+)
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute(_FUNCTION)
+    for name, table, when in _TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name} ON {table}")
+        op.execute(f"CREATE TRIGGER {name} {when} EXECUTE FUNCTION miscite_notify_job_event()")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for name, table, _when in _TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name} ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS miscite_notify_job_event()")
@@ -0,0 +1,47 @@
+"""Add a pg_trgm GIN index on documents.original_filename for the dashboard's substring search (Postgres only).
+
+Revision ID: 20261017_0009
+Revises: 20261017_0008
+Create Date: 2026-10-17 00:00:00
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0009"
+down_revision = "20261017_0008"
+branch_labels = None
+depends_on = None
+
+_INDEX = "ix_documents_original_filename_trgm"
+
+
+def _index_names(bind) -> set[str]:
+    return {ix["name"] for ix in sa.inspect(bind).get_indexes("documents")}
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    # The baseline revision builds tables from the current models, so fresh DBs already have this.
+    if _INDEX in _index_names(bind):
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        _INDEX,
+        "documents",
+        ["original_filename"],
+        postgresql_using="gin",
+        postgresql_ops={"original_filename": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    if _INDEX in _index_names(bind):
+        op.drop_index(_INDEX, table_name="documents")
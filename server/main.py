@@ -3,7 +3,9 @@ from __future__ import annotations
 import argparse
 import logging
 import os
+from contextlib import asynccontextmanager
 
+from anyio import to_thread
 from dotenv import load_dotenv
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.exception_handlers import http_exception_handler
@@ -11,11 +13,19 @@ from fastapi.responses import RedirectResponse
 from fastapi.staticfiles import StaticFiles
 import uvicorn
 
+from server.miscite.billing.stripe import install_http_client, stripe_sdk
+from server.miscite.core.cache import Cache
 from server.miscite.core.cli import add_runtime_args, apply_runtime_overrides
 from server.miscite.core.config import Settings
 from server.miscite.core.db import init_db
+from server.miscite.core.job_events import start_job_event_listener, stop_job_event_listener
 from server.miscite.core.middleware import BodySizeLimitMiddleware, SecurityHeadersMiddleware
 from server.miscite.routes import auth, billing, dashboard, health, seo
+from server.miscite.web import preload_templates, templates
+
+
+def _reload_enabled() -> bool:
+    return os.getenv("MISCITE_RELOAD", "").strip().lower() in {"1", "true", "yes", "y", "on"}
 
 
 def create_app() -> FastAPI:
@@ -26,8 +36,23 @@ def create_app() -> FastAPI:
 
     init_db(settings)
 
-    app = FastAPI(title="miscite", version="0.1.0")
+    @asynccontextmanager
+    async def lifespan(_app: FastAPI):
+        # Sync routes run in AnyIO's worker threads; size the pool for blocking Stripe/Mailgun/DB waits.
+        to_thread.current_default_thread_limiter().total_tokens = settings.web_threadpool_size
+        if settings.billing_enabled:
+            install_http_client(pool_maxsize=settings.web_threadpool_size)
+            stripe_sdk(settings)
+        start_job_event_listener(settings)
+        try:
+            yield
+        finally:
+            stop_job_event_listener()
+
+    app = FastAPI(title="miscite", version="0.1.0", lifespan=lifespan)
     app.state.settings = settings
+    # Shared by billing routes so Stripe lookups reuse one cache handle instead of building one per render.
+    app.state.billing_cache = Cache(settings=settings)
 
     app.add_middleware(
         BodySizeLimitMiddleware,
@@ -42,6 +67,12 @@ def create_app() -> FastAPI:
     app.include_router(dashboard.router)
     app.include_router(billing.router)
 
+    # Templates only change on deploy outside the dev reloader; skip Jinja's per-render mtime checks
+    # and compile them all now rather than on each template's first request.
+    templates.env.auto_reload = _reload_enabled()
+    if not templates.env.auto_reload:
+        preload_templates(settings.cache_dir / "jinja")
+
     app.mount("/static", StaticFiles(directory="server/miscite/static"), name="static")
 
     @app.exception_handler(HTTPException)
@@ -64,7 +95,7 @@ def main() -> None:
 
     load_dotenv()
     apply_runtime_overrides(args)
-    reload = os.getenv("MISCITE_RELOAD", "").strip().lower() in {"1", "true", "yes", "y", "on"}
+    reload = _reload_enabled()
     if getattr(args, "debug", False):
         uvicorn.run("server.main:app", host="0.0.0.0", port=8000, reload=reload, log_level="debug")
         return
@@ -1,12 +1,12 @@
 from __future__ import annotations
 
-import datetime as dt
 from dataclasses import dataclass
 
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from server.miscite.core.config import Settings
+from server.miscite.core.db import dialect_insert
 from server.miscite.core.models import BillingAccount, BillingTransaction
 
 
@@ -24,7 +24,6 @@ def get_or_create_account(db: Session, *, user_id: str, currency: str) -> Billin
             user_id=user_id,
             currency=currency,
             subscription_status="inactive",
-            updated_at=dt.datetime.now(dt.UTC),
         )
         db.add(account)
         db.flush()
@@ -33,6 +32,36 @@ def get_or_create_account(db: Session, *, user_id: str, currency: str) -> Billin
     return account
 
 
+def upsert_account(
+    db: Session,
+    *,
+    user_id: str,
+    currency: str,
+    stripe_customer_id: str | None = None,
+) -> BillingAccount:
+    # One statement creates the account or attaches a first-seen Stripe customer to the existing one.
+    upsert = dialect_insert(db, BillingAccount).values(
+        user_id=user_id,
+        currency=currency,
+        subscription_status="inactive",
+        stripe_customer_id=stripe_customer_id,
+    )
+    account = db.scalar(
+        upsert.on_conflict_do_update(
+            index_elements=[BillingAccount.user_id],
+            set_={
+                "stripe_customer_id": func.coalesce(
+                    BillingAccount.__table__.c.stripe_customer_id, upsert.excluded.stripe_customer_id
+                ),
+            },
+        ).returning(BillingAccount),
+        execution_options={"populate_existing": True},
+    )
+    if not account.currency:
+        account.currency = currency
+    return account
+
+
 def _apply_transaction(
     db: Session,
     *,
@@ -47,7 +76,6 @@ def _apply_transaction(
 ) -> BillingTransaction:
     account.balance_cents = int(account.balance_cents or 0) + int(amount_cents)
     account.currency = currency or account.currency or "usd"
-    account.updated_at = dt.datetime.now(dt.UTC)
 
     txn = BillingTransaction(
         user_id=account.user_id,
@@ -59,7 +87,6 @@ def _apply_transaction(
         stripe_checkout_session_id=stripe_checkout_session_id,
         stripe_payment_intent_id=stripe_payment_intent_id,
         note=note,
-        created_at=dt.datetime.now(dt.UTC),
     )
     db.add(txn)
     return txn
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
-import datetime as dt
+from types import ModuleType
+from typing import TYPE_CHECKING
 
-import stripe
+import requests
+from requests.adapters import HTTPAdapter
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
@@ -10,21 +12,56 @@ from server.miscite.core.cache import Cache
 from server.miscite.core.config import Settings
 from server.miscite.core.models import BillingAccount, User
 
+if TYPE_CHECKING:
+    import stripe
 
-def ensure_customer(db: Session, *, user: User, settings: Settings) -> BillingAccount:
-    account = db.scalar(select(BillingAccount).where(BillingAccount.user_id == user.id))
+_STRIPE_TIMEOUT_SECONDS = 30
+_PAYMENT_METHOD_FOUND_TTL_SECONDS = 300
+_PAYMENT_METHOD_MISSING_TTL_SECONDS = 30
+
+
+def stripe_sdk(settings: Settings | None = None) -> ModuleType:
+    """Return the Stripe SDK, importing it on first use; sets the API key when `settings` is given."""
+    # The SDK takes ~50ms to import, which deployments with billing disabled never need to pay.
+    import stripe
+
+    # The key is process-wide and set once (at startup, or on first use in the worker); only a changed
+    # key rewrites the global, so concurrent request threads never race on it.
+    if settings is not None and stripe.api_key != settings.stripe_secret_key:
+        stripe.api_key = settings.stripe_secret_key
+    return stripe
+
+
+def install_http_client(*, pool_maxsize: int) -> None:
+    """Route all Stripe SDK calls through one keep-alive pool shared by every worker thread."""
+    # The SDK's default client opens a separate session per thread, so each threadpool worker pays
+    # its own TLS handshake; a shared session lets any thread reuse an already-warm connection.
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_maxsize), max_retries=0))
+    stripe = stripe_sdk()
+    stripe.default_http_client = stripe.RequestsClient(timeout=_STRIPE_TIMEOUT_SECONDS, session=session)
+
+
+def ensure_customer(
+    db: Session,
+    *,
+    user: User,
+    settings: Settings,
+    account: BillingAccount | None = None,
+) -> BillingAccount:
+    if account is None:
+        account = db.scalar(select(BillingAccount).where(BillingAccount.user_id == user.id))
     if account is None:
-        account = BillingAccount(user_id=user.id, subscription_status="inactive", updated_at=dt.datetime.now(dt.UTC))
+        account = BillingAccount(user_id=user.id, subscription_status="inactive")
         db.add(account)
         db.flush()
 
     if account.stripe_customer_id:
         return account
 
-    stripe.api_key = settings.stripe_secret_key
+    stripe = stripe_sdk(settings)
     customer = stripe.Customer.create(email=user.email, metadata={"user_id": user.id})
     account.stripe_customer_id = customer["id"]
-    account.updated_at = dt.datetime.now(dt.UTC)
     return account
 
 
@@ -35,7 +72,7 @@ def create_topup_checkout(
     user_id: str,
     amount_cents: int,
 ) -> stripe.checkout.Session:
-    stripe.api_key = settings.stripe_secret_key
+    stripe = stripe_sdk(settings)
     return stripe.checkout.Session.create(
         mode="payment",
         customer=account.stripe_customer_id,
@@ -67,7 +104,7 @@ def _resolve_auto_charge_payment_method_id(*, customer: dict, customer_id: str)
     if payment_method:
         return str(payment_method)
     try:
-        methods = stripe.PaymentMethod.list(customer=customer_id, type="card", limit=1)
+        methods = stripe_sdk().PaymentMethod.list(customer=customer_id, type="card", limit=1)
         data = methods.get("data") if hasattr(methods, "get") else getattr(methods, "data", None)
         if not data:
             return None
@@ -95,7 +132,7 @@ def auto_charge_payment_method_available(
             if isinstance(cached, bool):
                 return cached
 
-    stripe.api_key = settings.stripe_secret_key
+    stripe = stripe_sdk(settings)
     try:
         customer = stripe.Customer.retrieve(customer_id)
         resolved = _resolve_auto_charge_payment_method_id(customer=customer, customer_id=customer_id)
@@ -108,7 +145,8 @@ def auto_charge_payment_method_available(
             "stripe",
             [customer_id, "auto_charge_payment_method_available"],
             {"has_payment_method": has_payment_method},
-            ttl_seconds=120,
+            # A card added in the portal should unblock auto-charge quickly; a card on file rarely disappears.
+            ttl_seconds=_PAYMENT_METHOD_FOUND_TTL_SECONDS if has_payment_method else _PAYMENT_METHOD_MISSING_TTL_SECONDS,
         )
     return has_payment_method
 
@@ -120,7 +158,7 @@ def create_auto_charge_payment_intent(
     amount_cents: int,
     idempotency_key: str | None = None,
 ) -> stripe.PaymentIntent:
-    stripe.api_key = settings.stripe_secret_key
+    stripe = stripe_sdk(settings)
     customer = stripe.Customer.retrieve(account.stripe_customer_id)
     payment_method = _resolve_auto_charge_payment_method_id(customer=customer, customer_id=account.stripe_customer_id)
     if not payment_method:
@@ -0,0 +1,45 @@
+import tempfile
+import unittest
+from dataclasses import replace
+from pathlib import Path
+
+from sqlalchemy import func, select
+
+from server.miscite.billing.ledger import upsert_account
+from server.miscite.core.config import Settings
+from server.miscite.core.db import get_sessionmaker
+from server.miscite.core.migrations import upgrade_to_head
+from server.miscite.core.models import BillingAccount, User
+
+
+class TestUpsertAccount(unittest.TestCase):
+    def test_creates_once_and_keeps_first_customer(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = replace(Settings.from_env(), db_url=f"sqlite:///{Path(tmp) / 'ledger.db'}")
+            upgrade_to_head(settings)
+            db = get_sessionmaker(settings)()
+            try:
+                user = User(email="x@example.com", password_hash="!")
+                db.add(user)
+                db.commit()
+
+                account = upsert_account(db, user_id=user.id, currency="usd")
+                self.assertIsNone(account.stripe_customer_id)
+                account.balance_cents = 500
+                db.commit()
+
+                again = upsert_account(db, user_id=user.id, currency="eur", stripe_customer_id="cus_1")
+                db.commit()
+                self.assertIs(again, account)
+                self.assertEqual((again.stripe_customer_id, again.currency, again.balance_cents), ("cus_1", "usd", 500))
+
+                upsert_account(db, user_id=user.id, currency="usd", stripe_customer_id="cus_2")
+                db.commit()
+                self.assertEqual(db.scalar(select(func.count()).select_from(BillingAccount)), 1)
+                self.assertEqual(db.scalar(select(BillingAccount.stripe_customer_id)), "cus_1")
+            finally:
+                db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
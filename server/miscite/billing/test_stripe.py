@@ -0,0 +1,40 @@
+import sys
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import stripe
+
+from server.miscite.billing.stripe import install_http_client, stripe_sdk
+
+
+class TestInstallHttpClient(unittest.TestCase):
+    def test_threads_share_one_pooled_session(self) -> None:
+        with mock.patch.object(stripe, "default_http_client", None):
+            install_http_client(pool_maxsize=8)
+            client = stripe.default_http_client
+            self.assertIsInstance(client, stripe.RequestsClient)
+            adapter = client._session.get_adapter("https://api.stripe.com")
+            self.assertEqual(adapter._pool_maxsize, 8)
+
+
+class _RecordingSdk(SimpleNamespace):
+    def __setattr__(self, name, value) -> None:
+        self.__dict__.setdefault("writes", []).append(name)
+        super().__setattr__(name, value)
+
+
+class TestStripeSdk(unittest.TestCase):
+    def test_sets_api_key_only_when_it_changes(self) -> None:
+        sdk = _RecordingSdk(api_key=None)
+        with mock.patch.dict(sys.modules, {"stripe": sdk}):
+            self.assertIs(stripe_sdk(SimpleNamespace(stripe_secret_key="sk_test_one")), sdk)
+            stripe_sdk(SimpleNamespace(stripe_secret_key="sk_test_one"))
+            stripe_sdk()
+            stripe_sdk(SimpleNamespace(stripe_secret_key="sk_test_two"))
+        self.assertEqual(sdk.api_key, "sk_test_two")
+        self.assertEqual(sdk.writes, ["api_key", "api_key"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,8 +6,10 @@ import json
 import logging
 import os
 import threading
+import weakref
 from collections import Counter
 from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Sequence
 
@@ -33,41 +35,86 @@ def _as_utc(value: dt.datetime | None) -> dt.datetime | None:
     return value.astimezone(dt.UTC)
 
 
-def _sha256_hex(parts: Sequence[str]) -> str:
-    h = hashlib.sha256()
+def _sha256_hex(parts: Sequence[str], *, prefix: hashlib._Hash | None = None) -> str:
+    h = prefix.copy() if prefix is not None else hashlib.sha256()
     for part in parts:
         h.update(part.encode("utf-8"))
         h.update(b"\0")
     return h.hexdigest()
 
 
+@lru_cache(maxsize=1024)
+def _key_prefix(scope: str, namespace: str) -> hashlib._Hash:
+    # Every key in a (scope, namespace) starts with the same parts; hash them once and `.copy()` the state.
+    h = hashlib.sha256()
+    for part in (str(_CACHE_SCHEMA_VERSION), scope, namespace):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h
+
+
+class _ThreadCounts:
+    """One thread's counters; it lives in that thread's locals, so it is collected when the thread exits."""
+
+    __slots__ = ("counts", "__weakref__")
+
+    def __init__(self) -> None:
+        self.counts: dict[tuple[str, str], int] = {}
+
+
+def _retire_thread_counts(stats_ref: weakref.ref[CacheDebugStats], counts: dict[tuple[str, str], int]) -> None:
+    stats = stats_ref()
+    if stats is not None:
+        stats._retire(counts)
+
+
 @dataclass
 class CacheDebugStats:
-    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
-    _totals: Counter[str] = field(default_factory=Counter, init=False, repr=False)
-    _by_namespace: dict[str, Counter[str]] = field(default_factory=dict, init=False, repr=False)
+    # Each thread counts into its own dict, so fan-out workers never contend on increments;
+    # the registry lock is only taken when a thread first counts or exits, and when taking a snapshot.
+    _local: threading.local = field(default_factory=threading.local, init=False, repr=False)
+    _registry_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _thread_counts: dict[int, dict[tuple[str, str], int]] = field(default_factory=dict, init=False, repr=False)
+    # Counts from threads that have exited; long-lived caches would otherwise keep one dict per thread ever seen.
+    _retired_counts: Counter[tuple[str, str]] = field(default_factory=Counter, init=False, repr=False)
 
     def increment(self, namespace: str, metric: str) -> None:
         namespace = (namespace or "").strip() or "unknown"
         metric = (metric or "").strip()
         if not metric:
             return
-        with self._lock:
-            self._totals[metric] += 1
-            ns = self._by_namespace.get(namespace)
-            if ns is None:
-                ns = Counter()
-                self._by_namespace[namespace] = ns
-            ns[metric] += 1
+        holder = getattr(self._local, "holder", None)
+        if holder is None:
+            holder = _ThreadCounts()
+            self._local.holder = holder
+            with self._registry_lock:
+                self._thread_counts[id(holder.counts)] = holder.counts
+            # A weak reference, so threads that outlive this object don't keep it alive.
+            weakref.finalize(holder, _retire_thread_counts, weakref.ref(self), holder.counts)
+        counts = holder.counts
+        key = (namespace, metric)
+        counts[key] = counts.get(key, 0) + 1
+
+    def _retire(self, counts: dict[tuple[str, str], int]) -> None:
+        with self._registry_lock:
+            self._retired_counts.update(counts)
+            self._thread_counts.pop(id(counts), None)
 
     def snapshot(self) -> dict[str, Any]:
-        with self._lock:
-            totals = dict(sorted(self._totals.items()))
-            namespaces = {
-                namespace: dict(sorted(counter.items()))
-                for namespace, counter in sorted(self._by_namespace.items())
-            }
-        return {"totals": totals, "namespaces": namespaces}
+        with self._registry_lock:
+            per_thread = [dict(self._retired_counts), *(dict(counts) for counts in self._thread_counts.values())]
+        totals: Counter[str] = Counter()
+        by_namespace: dict[str, Counter[str]] = {}
+        for counts in per_thread:
+            for (namespace, metric), value in counts.items():
+                totals[metric] += value
+                by_namespace.setdefault(namespace, Counter())[metric] += value
+        return {
+            "totals": dict(sorted(totals.items())),
+            "namespaces": {
+                namespace: dict(sorted(counter.items())) for namespace, counter in sorted(by_namespace.items())
+            },
+        }
 
 
 @dataclass(frozen=True)
@@ -83,7 +130,7 @@ class Cache:
         return Cache(settings=self.settings, scope=scope, debug_stats=self.debug_stats)
 
     def _key(self, namespace: str, parts: Sequence[str]) -> str:
-        return _sha256_hex([str(_CACHE_SCHEMA_VERSION), self.scope, namespace, *[str(p) for p in parts]])
+        return _sha256_hex([str(p) for p in parts], prefix=_key_prefix(self.scope, namespace))
 
     def _debug_log_each(self) -> bool:
         return bool(
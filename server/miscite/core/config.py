@@ -4,6 +4,7 @@ import multiprocessing as mp
 import os
 import sys
 from dataclasses import dataclass
+from functools import cached_property
 from pathlib import Path
 
 
@@ -237,6 +238,7 @@ class Settings:
 
     worker_poll_seconds: float
     worker_processes: int
+    web_threadpool_size: int
 
     cookie_secure: bool
     trust_proxy: bool
@@ -265,6 +267,15 @@ class Settings:
     upload_scan_command: str
     upload_scan_timeout_seconds: float
 
+    # Settings never change after load, so these are evaluated once per instance.
+    @cached_property
+    def mailgun_ready(self) -> bool:
+        return bool(self.mailgun_api_key and self.mailgun_domain and self.mailgun_sender)
+
+    @cached_property
+    def turnstile_ready(self) -> bool:
+        return bool(self.turnstile_site_key and self.turnstile_secret_key)
+
     @classmethod
     def from_env(cls) -> "Settings":
         db_url = _env_str("MISCITE_DB_URL", "sqlite:///./data/miscite.db")
@@ -489,6 +500,7 @@ class Settings:
         worker_poll_seconds = _env_float("MISCITE_WORKER_POLL_SECONDS", 1.5, min_value=0.1, max_value=10.0)
         cpu_count = os.cpu_count() or 1
         worker_processes = _env_int("MISCITE_WORKER_PROCESSES", 1, min_value=1, max_value=max(1, cpu_count * 8))
+        web_threadpool_size = _env_int("MISCITE_WEB_THREADPOOL_SIZE", 40, min_value=1, max_value=1000)
 
         cookie_secure = _env_bool("MISCITE_COOKIE_SECURE", False)
         trust_proxy = _env_bool("MISCITE_TRUST_PROXY", False)
@@ -666,6 +678,7 @@ class Settings:
             openrouter_pricing_refresh_minutes=openrouter_pricing_refresh_minutes,
             worker_poll_seconds=worker_poll_seconds,
             worker_processes=worker_processes,
+            web_threadpool_size=web_threadpool_size,
             cookie_secure=cookie_secure,
             trust_proxy=trust_proxy,
             maintenance_mode=maintenance_mode,
@@ -5,9 +5,11 @@ from contextlib import contextmanager
 from functools import lru_cache
 
 from fastapi import Request
-from sqlalchemy import create_engine, event
+from sqlalchemy import DateTime, create_engine, event
 from sqlalchemy.engine.url import make_url
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
+from sqlalchemy.sql.functions import FunctionElement
 
 from server.miscite.core.config import Settings
 
@@ -16,6 +18,41 @@ class Base(DeclarativeBase):
     pass
 
 
+class utcnow(FunctionElement):
+    """Database-side current UTC time, as a naive timestamp matching our `DateTime` columns."""
+
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _utcnow_default(_element, _compiler, **_kw) -> str:
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(utcnow, "postgresql")
+def _utcnow_postgresql(_element, _compiler, **_kw) -> str:
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
+
+@compiles(utcnow, "sqlite")
+def _utcnow_sqlite(_element, _compiler, **_kw) -> str:
+    # CURRENT_TIMESTAMP is second-granular on SQLite; keep milliseconds for stable ordering.
+    return "(STRFTIME('%Y-%m-%d %H:%M:%f', 'now'))"
+
+
+def dialect_insert(db: Session, table):
+    """Dialect-specific INSERT for `db`'s backend, exposing `on_conflict_do_update`."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Upserts are not supported on {dialect!r}.")
+    return insert(table)
+
+
 @lru_cache(maxsize=8)
 def _engine_for(db_url: str):
     connect_args = {}
@@ -82,9 +119,13 @@ def _configure_sqlite(engine, db_url: str) -> None:
         try:
             cursor.execute("PRAGMA foreign_keys=ON")
             cursor.execute("PRAGMA busy_timeout=30000")
+            # 16 MiB page cache (negative = KiB) instead of the ~2 MiB default; keep temp b-trees off disk.
+            cursor.execute("PRAGMA cache_size=-16384")
+            cursor.execute("PRAGMA temp_store=MEMORY")
             if file_based:
                 cursor.execute("PRAGMA journal_mode=WAL")
                 cursor.execute("PRAGMA synchronous=NORMAL")
+                cursor.execute("PRAGMA mmap_size=268435456")
         finally:
             cursor.close()
 
@@ -115,3 +156,18 @@ def db_session(request: Request) -> Generator[Session, None, None]:
         raise
     finally:
         db.close()
+
+
+@contextmanager
+def count_statements(engine) -> Generator[list[str], None, None]:
+    """Collect the SQL `engine` sends while the block runs, for query-count checks."""
+    statements: list[str] = []
+
+    def _record(_conn, _cursor, statement, *_args) -> None:
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 import datetime as dt
-from dataclasses import dataclass
+import threading
+from dataclasses import dataclass, field
+from urllib.parse import urlencode
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from server.miscite.core.config import Settings
 
@@ -12,6 +15,23 @@ _TEXT_COLOR = "#072332"
 _MUTED_COLOR = "#5f6b72"
 _SURFACE_COLOR = "#ffffff"
 _BG_COLOR = "#f8efe2"
+_FORM_HEADERS = {
+    "Content-Type": "application/x-www-form-urlencoded",
+    # Mailgun replies with a tiny JSON body; skip negotiating compression for it.
+    "Accept-Encoding": "identity",
+}
+_MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+# Clients are built per email, so the keep-alive pool lives at module scope (one per thread).
+_session_local = threading.local()
+
+
+def _mailgun_session() -> requests.Session:
+    session = getattr(_session_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=0))
+        _session_local.session = session
+    return session
 
 
 def _public_origin(settings: Settings) -> str:
@@ -25,6 +45,15 @@ def _join_public_url(settings: Settings, path: str) -> str:
     return f"{origin}/{path.lstrip('/')}"
 
 
+def _format_utc_label(value: dt.datetime) -> str:
+    # Fixed English month names: avoids strftime's locale lookups and keeps emails locale-independent.
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=dt.UTC)
+    else:
+        value = value.astimezone(dt.UTC)
+    return f"{_MONTHS[value.month - 1]} {value.day}, {value.year} at {value.hour:02d}:{value.minute:02d} UTC"
+
+
 def _format_money(amount_cents: int, currency: str) -> str:
     sign = "-" if amount_cents < 0 else ""
     value = abs(int(amount_cents)) / 100.0
@@ -98,23 +127,32 @@ class MailgunClient:
     sender: str
     base_url: str
     timeout_seconds: float
+    _url: str = field(init=False, repr=False)
+    _auth: tuple[str, str] = field(init=False, repr=False)
+    _from: str = field(init=False, repr=False)
 
-    def send_message(self, *, to_email: str, subject: str, text: str, html: str | None = None) -> None:
+    def __post_init__(self) -> None:
         if not self.api_key or not self.domain or not self.sender:
             raise ValueError("Mailgun settings are missing.")
-        url = f"{self.base_url.rstrip('/')}/{self.domain}/messages"
+        self._url = f"{self.base_url.rstrip('/')}/{self.domain}/messages"
+        self._auth = ("api", self.api_key)
+        self._from = _format_sender(self.sender)
+
+    def send_message(self, *, to_email: str, subject: str, text: str, html: str | None = None) -> None:
         data = {
-            "from": _format_sender(self.sender),
+            "from": self._from,
             "to": to_email,
             "subject": subject,
             "text": text,
         }
         if html:
             data["html"] = html
-        resp = requests.post(
-            url,
-            auth=("api", self.api_key),
-            data=data,
+        body = urlencode(data).encode("utf-8")
+        resp = _mailgun_session().post(
+            self._url,
+            auth=self._auth,
+            data=body,
+            headers=_FORM_HEADERS,
             timeout=self.timeout_seconds,
         )
         resp.raise_for_status()
@@ -161,11 +199,7 @@ def send_access_token_email(
 ) -> None:
     expires_label = "No expiration"
     if expires_at:
-        if expires_at.tzinfo is None:
-            expires_at = expires_at.replace(tzinfo=dt.UTC)
-        expires_label = (
-            f"{expires_at.strftime('%b')} {expires_at.day}, {expires_at.year} at {expires_at.strftime('%H:%M')} UTC"
-        )
+        expires_label = _format_utc_label(expires_at)
     subject = "Your Miscite.Review report is ready"
     report_url = _join_public_url(settings, f"/reports/{token}")
     access_url = _join_public_url(settings, "/reports/access")
@@ -226,9 +260,7 @@ def send_billing_receipt_email(
     subject = f"Receipt for your Miscite.Review {flow_label.lower()}"
     when_label = ""
     if occurred_at:
-        if occurred_at.tzinfo is None:
-            occurred_at = occurred_at.replace(tzinfo=dt.UTC)
-        when_label = f"{occurred_at.strftime('%b')} {occurred_at.day}, {occurred_at.year} at {occurred_at.strftime('%H:%M')} UTC"
+        when_label = _format_utc_label(occurred_at)
     billing_url = _join_public_url(settings, "/billing")
 
     lines = [
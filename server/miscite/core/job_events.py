@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+
+from sqlalchemy.engine.url import make_url
+
+from server.miscite.core.config import Settings
+
+# Postgres triggers (migration 20261017_0008) NOTIFY this channel with the job id whenever a job
+# event is inserted or a job's status changes, from whichever process made the write.
+JOB_EVENTS_CHANNEL = "job_events"
+
+_RECONNECT_DELAY_SECONDS = 5.0
+
+log = logging.getLogger(__name__)
+
+
+class JobEventListener:
+    """Fans job notifications out to the progress streams waiting on them in this process."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._waiters: dict[str, set[tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = {}
+        self._started = False
+        self._running = False
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        """True only while a LISTEN connection is up; streams poll whenever it is not."""
+        return self._running
+
+    def subscribe(self, job_id: str) -> asyncio.Event:
+        """Return an event set whenever `job_id` is notified; call from the stream's event loop."""
+        wakeup = asyncio.Event()
+        with self._lock:
+            self._waiters.setdefault(job_id, set()).add((asyncio.get_running_loop(), wakeup))
+        return wakeup
+
+    def unsubscribe(self, job_id: str, wakeup: asyncio.Event) -> None:
+        with self._lock:
+            waiters = self._waiters.get(job_id)
+            if not waiters:
+                return
+            waiters.difference_update({w for w in waiters if w[1] is wakeup})
+            if not waiters:
+                del self._waiters[job_id]
+
+    def dispatch(self, job_id: str) -> None:
+        """Wake every stream subscribed to `job_id`; safe to call from any thread."""
+        with self._lock:
+            waiters = tuple(self._waiters.get(job_id, ()))
+        for loop, wakeup in waiters:
+            try:
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:
+                # The stream's loop already shut down; its unsubscribe is on the way.
+                pass
+
+    def start(self, db_url: str) -> None:
+        """Listen on a dedicated connection in a daemon thread; a no-op off Postgres."""
+        url = make_url(db_url)
+        if url.get_backend_name() != "postgresql" or self._started:
+            return
+        # psycopg wants a libpq URI, not SQLAlchemy's `postgresql+psycopg://` form.
+        conninfo = url.set(drivername="postgresql").render_as_string(hide_password=False)
+        self._stop.clear()
+        self._started = True
+        threading.Thread(target=self._listen_forever, args=(conninfo,), name="job-events", daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._started = False
+        self._running = False
+
+    def _listen_forever(self, conninfo: str) -> None:
+        import psycopg
+
+        while not self._stop.is_set():
+            try:
+                with psycopg.connect(conninfo, autocommit=True) as conn:
+                    conn.execute(f"LISTEN {JOB_EVENTS_CHANNEL}")
+                    self._running = not self._stop.is_set()
+                    for notify in conn.notifies():
+                        if self._stop.is_set():
+                            return
+                        self.dispatch(notify.payload)
+            except Exception:
+                log.warning("Job event listener disconnected; retrying.", exc_info=True)
+                time.sleep(_RECONNECT_DELAY_SECONDS)
+            finally:
+                # Notifications sent while disconnected are lost, so streams go back to
+                # backoff polling until LISTEN is re-established.
+                self._running = False
+
+
+_listener = JobEventListener()
+
+
+def start_job_event_listener(settings: Settings) -> None:
+    _listener.start(settings.db_url)
+
+
+def stop_job_event_listener() -> None:
+    _listener.stop()
+
+
+def job_event_listener() -> JobEventListener | None:
+    """The process-wide listener, or None when streams must fall back to polling."""
+    return _listener if _listener.running else None
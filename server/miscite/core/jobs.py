@@ -1,10 +1,15 @@
 from __future__ import annotations
 
+from collections.abc import Iterable
+
 from sqlalchemy import delete, select, update
 from sqlalchemy.orm import Session
 
 from server.miscite.core.models import AnalysisJob, AnalysisJobEvent, BillingTransaction, Document
 
+# Plain Core-level DML: callers never rely on the identity map reflecting these deletes.
+_BULK_DML = {"synchronize_session": False}
+
 
 def delete_job_and_document(db: Session, *, job_id: str, document_id: str) -> bool:
     """Delete a job and related rows; return True if the document row was deleted."""
@@ -12,14 +17,54 @@ def delete_job_and_document(db: Session, *, job_id: str, document_id: str) -> bo
         update(BillingTransaction)
         .where(BillingTransaction.job_id == job_id)
         .values(job_id=None)
+        .execution_options(**_BULK_DML)
+    )
+    db.execute(
+        delete(AnalysisJobEvent)
+        .where(AnalysisJobEvent.job_id == job_id)
+        .execution_options(**_BULK_DML)
     )
-    db.execute(delete(AnalysisJobEvent).where(AnalysisJobEvent.job_id == job_id))
-    db.execute(delete(AnalysisJob).where(AnalysisJob.id == job_id))
+    db.execute(delete(AnalysisJob).where(AnalysisJob.id == job_id).execution_options(**_BULK_DML))
 
     remaining = db.scalar(
         select(AnalysisJob.id).where(AnalysisJob.document_id == document_id).limit(1)
     )
     if remaining is None:
-        db.execute(delete(Document).where(Document.id == document_id))
+        db.execute(delete(Document).where(Document.id == document_id).execution_options(**_BULK_DML))
         return True
     return False
+
+
+def delete_jobs_bulk(db: Session, *, job_ids: Iterable[str]) -> set[str]:
+    """Delete many jobs with one statement per table; return IDs of documents that were deleted."""
+    ids = sorted({job_id for job_id in job_ids if job_id})
+    if not ids:
+        return set()
+
+    document_ids = set(db.scalars(select(AnalysisJob.document_id).where(AnalysisJob.id.in_(ids))))
+    db.execute(
+        update(BillingTransaction)
+        .where(BillingTransaction.job_id.in_(ids))
+        .values(job_id=None)
+        .execution_options(**_BULK_DML)
+    )
+    db.execute(
+        delete(AnalysisJobEvent)
+        .where(AnalysisJobEvent.job_id.in_(ids))
+        .execution_options(**_BULK_DML)
+    )
+    db.execute(delete(AnalysisJob).where(AnalysisJob.id.in_(ids)).execution_options(**_BULK_DML))
+    if not document_ids:
+        return set()
+
+    still_used = set(
+        db.scalars(
+            select(AnalysisJob.document_id)
+            .where(AnalysisJob.document_id.in_(document_ids))
+            .distinct()
+        )
+    )
+    orphaned = document_ids - still_used
+    if orphaned:
+        db.execute(delete(Document).where(Document.id.in_(orphaned)).execution_options(**_BULK_DML))
+    return orphaned
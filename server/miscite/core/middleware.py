@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-import secrets
+import base64
+import os
+import threading
 from collections.abc import Iterable
 
 from fastapi import Request
@@ -9,20 +11,31 @@ from starlette.middleware.base import BaseHTTPMiddleware
 
 from server.miscite.core.config import Settings
 
+_NONCE_BYTES = 16
+_NONCE_BATCH = 1024
+_nonce_lock = threading.Lock()
+_nonce_pool: list[str] = []
+
+
+def _next_csp_nonce() -> str:
+    """Return a single-use CSP nonce, drawing entropy from one urandom call per batch."""
+    with _nonce_lock:
+        if not _nonce_pool:
+            raw = os.urandom(_NONCE_BYTES * _NONCE_BATCH)
+            _nonce_pool.extend(
+                base64.urlsafe_b64encode(raw[i : i + _NONCE_BYTES]).rstrip(b"=").decode("ascii")
+                for i in range(0, len(raw), _NONCE_BYTES)
+            )
+        return _nonce_pool.pop()
+
 
 class SecurityHeadersMiddleware(BaseHTTPMiddleware):
     def __init__(self, app, *, settings: Settings) -> None:
         super().__init__(app)
         self._settings = settings
-
-    async def dispatch(self, request: Request, call_next):
-        request.state.csp_nonce = secrets.token_urlsafe(16)
-        response = await call_next(request)
-
-        nonce = getattr(request.state, "csp_nonce", "")
-        csp_parts = [
-            "default-src 'self'",
-            f"script-src 'self' 'nonce-{nonce}' https://challenges.cloudflare.com",
+        csp_head = "default-src 'self'; script-src 'self' 'nonce-"
+        csp_tail_parts = [
+            "' https://challenges.cloudflare.com",
             "style-src 'self' 'unsafe-inline' https://fonts.googleapis.com",
             "font-src 'self' https://fonts.gstatic.com",
             "connect-src 'self' https://challenges.cloudflare.com",
@@ -33,21 +46,34 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
             # Browsers enforce CSP `form-action` on redirect chains, so allow Stripe here.
             "form-action 'self' https://checkout.stripe.com https://billing.stripe.com https://api.stripe.com",
         ]
-        if self._settings.cookie_secure:
-            csp_parts.append("upgrade-insecure-requests")
+        if settings.cookie_secure:
+            csp_tail_parts.append("upgrade-insecure-requests")
+        # The nonce is the only per-request part of the policy.
+        self._csp_head = csp_head
+        self._csp_tail = "; ".join(csp_tail_parts)
 
-        response.headers.setdefault("Content-Security-Policy", "; ".join(csp_parts))
-        response.headers.setdefault("X-Frame-Options", "DENY")
-        response.headers.setdefault("X-Content-Type-Options", "nosniff")
-        response.headers.setdefault("Referrer-Policy", "same-origin")
-        response.headers.setdefault(
-            "Permissions-Policy",
-            "camera=(), microphone=(), geolocation=(), payment=(), usb=(), display-capture=()",
-        )
-        if self._settings.cookie_secure:
-            response.headers.setdefault(
-                "Strict-Transport-Security", "max-age=31536000; includeSubDomains"
-            )
+        static_headers = [
+            ("X-Frame-Options", "DENY"),
+            ("X-Content-Type-Options", "nosniff"),
+            ("Referrer-Policy", "same-origin"),
+            (
+                "Permissions-Policy",
+                "camera=(), microphone=(), geolocation=(), payment=(), usb=(), display-capture=()",
+            ),
+        ]
+        if settings.cookie_secure:
+            static_headers.append(("Strict-Transport-Security", "max-age=31536000; includeSubDomains"))
+        self._static_headers: tuple[tuple[str, str], ...] = tuple(static_headers)
+
+    async def dispatch(self, request: Request, call_next):
+        request.state.csp_nonce = _next_csp_nonce()
+        response = await call_next(request)
+
+        nonce = getattr(request.state, "csp_nonce", "")
+        headers = response.headers
+        headers.setdefault("Content-Security-Policy", f"{self._csp_head}{nonce}{self._csp_tail}")
+        for name, value in self._static_headers:
+            headers.setdefault(name, value)
         return response
 
 
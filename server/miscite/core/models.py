@@ -4,10 +4,10 @@ import datetime as dt
 import uuid
 from enum import Enum
 
-from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import DDL, Boolean, DateTime, Float, ForeignKey, Index, Integer, LargeBinary, String, Text, event, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from server.miscite.core.db import Base
+from server.miscite.core.db import Base, utcnow
 
 
 def _uuid() -> str:
@@ -28,12 +28,15 @@ class User(Base):
     id: Mapped[str] = mapped_column(String(32), primary_key=True, default=_uuid)
     email: Mapped[str] = mapped_column(String(320), unique=True, index=True)
     password_hash: Mapped[str] = mapped_column(Text)
-    created_at: Mapped[dt.datetime] = mapped_column(DateTime, default=lambda: dt.datetime.now(dt.UTC))
+    created_at: Mapped[dt.datetime] = mapped_column(DateTime, server_default=utcnow())
 
-    sessions: Mapped[list["UserSession"]] = relationship(back_populates="user")
-    jobs: Mapped[list["AnalysisJob"]] = relationship(back_populates="user")
-    billing: Mapped["BillingAccount | None"] = relationship(back_populates="user")
-    billing_transactions: Mapped[list["BillingTransaction"]] = relationship(back_populates="user")
+    # Related rows are never lazy-loaded: query them explicitly (or via `selectinload`) to avoid N+1.
+    sessions: Mapped[list["UserSession"]] = relationship(back_populates="user", lazy="raise_on_sql")
+    jobs: Mapped[list["AnalysisJob"]] = relationship(back_populates="user", lazy="raise_on_sql")
+    billing: Mapped["BillingAccount | None"] = relationship(back_populates="user", lazy="raise_on_sql")
+    billing_transactions: Mapped[list["BillingTransaction"]] = relationship(
+        back_populates="user", lazy="raise_on_sql"
+    )
 
 
 class UserSession(Base):
@@ -41,21 +44,23 @@ class UserSession(Base):
 
     id: Mapped[str] = mapped_column(String(32), primary_key=True, default=_uuid)
     user_id: Mapped[str] = mapped_column(String(32), ForeignKey("users.id"), index=True)
-    token_hash: Mapped[str] = mapped_column(String(64), index=True)
-    csrf_hash: Mapped[str] = mapped_column(String(64))
-    created_at: Mapped[dt.datetime] = mapped_column(DateTime, default=lambda: dt.datetime.now(dt.UTC))
+    token_hash: Mapped[bytes] = mapped_column(LargeBinary(32), index=True)
+    csrf_hash: Mapped[bytes] = mapped_column(LargeBinary(32))
+    created_at: Mapped[dt.datetime] = mapped_column(DateTime, server_default=utcnow())
     expires_at: Mapped[dt.datetime] = mapped_column(DateTime, index=True)
 
-    user: Mapped["User"] = relationship(back_populates="sessions")
+    # Session lookups always need the user; load it in the same round trip.
+    user: Mapped["User"] = relationship(back_populates="sessions", lazy="joined", innerjoin=True)
 
 
 class LoginCode(Base):
     __tablename__ = "login_codes"
 
     id: Mapped[str] = mapped_column(String(32), primary_key=True, default=_uuid)
-    email: Mapped[str] = mapped_column(String(320), index=True)
-    code_hash: Mapped[str] = mapped_column(String(64))
-    created_at: Mapped[dt.datetime] = mapped_column(DateTime, default=lambda: dt.datetime.now(dt.UTC))
+    # One live code per address: requesting a new code upserts over the previous one.
+    email: Mapped[str] = mapped_column(String(320), unique=True, index=True)
+    code_hash: Mapped[bytes] = mapped_column(LargeBinary(32))
+    created_at: Mapped[dt.datetime] = mapped_column(DateTime, server_default=utcnow())
     expires_at: Mapped[dt.datetime] = mapped_column(DateTime, index=True)
 
 
@@ -67,36 +72,56 @@ class Document(Base):
     original_filename: Mapped[str] = mapped_column(Text)
     content_type: Mapped[str] = mapped_column(String(127))
     storage_path: Mapped[str] = mapped_column(Text)
-    sha256: Mapped[str] = mapped_column(String(64), index=True)
-    created_at: Mapped[dt.datetime] = mapped_column(DateTime, default=lambda: dt.datetime.now(dt.UTC))
+    sha256: Mapped[bytes] = mapped_column(LargeBinary(32), index=True)
+    created_at: Mapped[dt.datetime] = mapped_column(DateTime, server_default=utcnow())
+
+    __table_args__ = (
+        # The dashboard's filename search is ILIKE '%q%', which a B-tree can't serve; a trigram GIN index can.
+        Index(
+            "ix_documents_original_filename_trgm",
+            "original_filename",
+            postgresql_using="gin",
+            postgresql_ops={"original_filename": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
+
+
+# gin_trgm_ops comes from pg_trgm, which must exist before create_all builds the index above.
+event.listen(
+    Document.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
 
 
 class AnalysisJob(Base):
     __tablename__ = "analysis_jobs"
 
     id: Mapped[str] = mapped_column(String(32), primary_key=True, default=_uuid)
-    user_id: Mapped[str] = mapped_column(String(32), ForeignKey("users.id"), index=True)
+    user_id: Mapped[str] = mapped_column(String(32), ForeignKey("users.id"))
     document_id: Mapped[str] = mapped_column(String(32), ForeignKey("documents.id"), index=True)
     status: Mapped[str] = mapped_column(String(16), default=JobStatus.pending.value, index=True)
 
-    created_at: Mapped[dt.datetime] = mapped_column(DateTime, default=lambda: dt.datetime.now(dt.UTC))
+    created_at: Mapped[dt.datetime] = mapped_column(DateTime, server_default=utcnow())
     started_at: Mapped[dt.datetime | None] = mapped_column(DateTime, nullable=True)
     finished_at: Mapped[dt.datetime | None] = mapped_column(DateTime, nullable=True)
     last_heartbeat_at: Mapped[dt.datetime | None] = mapped_column(DateTime, nullable=True, index=True)
     attempts: Mapped[int] = mapped_column(Integer, default=0)
 
     error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
-    report_json: Mapped[str | None] = mapped_column(Text, nullable=True)
-    sources_json: Mapped[str | None] = mapped_column(Text, nullable=True)
-    methodology_md: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # The report payload columns can run to hundreds of KB; they load only when accessed (or undeferred as
+    # the "report" group), so status polls, listings and access checks don't drag them along.
+    report_json: Mapped[str | None] = mapped_column(Text, nullable=True, deferred=True, deferred_group="report")
+    sources_json: Mapped[str | None] = mapped_column(Text, nullable=True, deferred=True, deferred_group="report")
+    methodology_md: Mapped[str | None] = mapped_column(Text, nullable=True, deferred=True, deferred_group="report")
     worker_version: Mapped[str] = mapped_column(String(32), default="0.1")
-    access_token_hash: Mapped[str | None] = mapped_column(String(64), nullable=True, index=True)
+    access_token_hash: Mapped[bytes | None] = mapped_column(LargeBinary(32), nullable=True, index=True)
     access_token_hint: Mapped[str | None] = mapped_column(String(16), nullable=True)
     access_token_value: Mapped[str | None] = mapped_column(Text, nullable=True)
     access_token_expires_at: Mapped[dt.datetime | None] = mapped_column(DateTime, nullable=True)
 
-    llm_usage_json: Mapped[str | None] = mapped_column(Text, nullable=True)
-    llm_cost_json: Mapped[str | None] = mapped_column(Text, nullable=True)
+    llm_usage_json: Mapped[str | None] = mapped_column(Text, nullable=True, deferred=True, deferred_group="report")
+    llm_cost_json: Mapped[str | None] = mapped_column(Text, nullable=True, deferred=True, deferred_group="report")
     llm_cost_currency: Mapped[str | None] = mapped_column(String(8), nullable=True)
     llm_cost_raw_cents: Mapped[int | None] = mapped_column(Integer, nullable=True)
     llm_cost_cents: Mapped[int | None] = mapped_column(Integer, nullable=True)
@@ -105,19 +130,41 @@ class AnalysisJob(Base):
     billing_error: Mapped[str | None] = mapped_column(Text, nullable=True)
     billing_debited_at: Mapped[dt.datetime | None] = mapped_column(DateTime, nullable=True)
 
-    user: Mapped["User"] = relationship(back_populates="jobs")
+    user: Mapped["User"] = relationship(back_populates="jobs", lazy="raise_on_sql")
+    document: Mapped["Document"] = relationship(lazy="raise_on_sql")
+
+    __table_args__ = (
+        # The dashboard lists a user's jobs newest first; the leading column also serves user_id lookups.
+        Index("ix_analysis_jobs_user_created_at", "user_id", "created_at"),
+        # Partial indexes cover only the live queue; terminal rows (the vast majority) stay out of them.
+        Index(
+            "ix_analysis_jobs_pending_created_at",
+            "created_at",
+            postgresql_where=text("status = 'PENDING'"),
+            sqlite_where=text("status = 'PENDING'"),
+        ),
+        Index(
+            "ix_analysis_jobs_running_heartbeat",
+            "last_heartbeat_at",
+            postgresql_where=text("status = 'RUNNING'"),
+            sqlite_where=text("status = 'RUNNING'"),
+        ),
+    )
 
 
 class AnalysisJobEvent(Base):
     __tablename__ = "analysis_job_events"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    job_id: Mapped[str] = mapped_column(String(32), ForeignKey("analysis_jobs.id"), index=True)
-    created_at: Mapped[dt.datetime] = mapped_column(DateTime, default=lambda: dt.datetime.now(dt.UTC), index=True)
+    job_id: Mapped[str] = mapped_column(String(32), ForeignKey("analysis_jobs.id"))
+    created_at: Mapped[dt.datetime] = mapped_column(DateTime, server_default=utcnow(), index=True)
     stage: Mapped[str] = mapped_column(String(64))
     message: Mapped[str | None] = mapped_column(Text, nullable=True)
     progress: Mapped[float | None] = mapped_column(Float, nullable=True)
 
+    # Progress polls read "events after id N for a job" in id order straight off this index.
+    __table_args__ = (Index("ix_analysis_job_events_job_id_id", "job_id", "id"),)
+
 
 class BillingAccount(Base):
     __tablename__ = "billing_accounts"
@@ -140,16 +187,16 @@ class BillingAccount(Base):
     auto_charge_in_flight_amount_cents: Mapped[int] = mapped_column(Integer, default=0)
     auto_charge_in_flight_idempotency_key: Mapped[str | None] = mapped_column(String(64), nullable=True)
     auto_charge_in_flight_payment_intent_id: Mapped[str | None] = mapped_column(String(128), nullable=True)
-    updated_at: Mapped[dt.datetime] = mapped_column(DateTime, default=lambda: dt.datetime.now(dt.UTC))
+    updated_at: Mapped[dt.datetime] = mapped_column(DateTime, server_default=utcnow(), onupdate=utcnow())
 
-    user: Mapped["User"] = relationship(back_populates="billing")
+    user: Mapped["User"] = relationship(back_populates="billing", lazy="raise_on_sql")
 
 
 class BillingTransaction(Base):
     __tablename__ = "billing_transactions"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    user_id: Mapped[str] = mapped_column(String(32), ForeignKey("users.id"), index=True)
+    user_id: Mapped[str] = mapped_column(String(32), ForeignKey("users.id"))
     job_id: Mapped[str | None] = mapped_column(String(32), ForeignKey("analysis_jobs.id"), nullable=True, index=True)
 
     kind: Mapped[str] = mapped_column(String(32), index=True)
@@ -161,9 +208,12 @@ class BillingTransaction(Base):
     stripe_payment_intent_id: Mapped[str | None] = mapped_column(String(128), nullable=True, unique=True)
     note: Mapped[str | None] = mapped_column(Text, nullable=True)
 
-    created_at: Mapped[dt.datetime] = mapped_column(DateTime, default=lambda: dt.datetime.now(dt.UTC), index=True)
+    created_at: Mapped[dt.datetime] = mapped_column(DateTime, server_default=utcnow(), index=True)
+
+    user: Mapped["User"] = relationship(back_populates="billing_transactions", lazy="raise_on_sql")
 
-    user: Mapped["User"] = relationship(back_populates="billing_transactions")
+    # "Latest N for a user" is an index range scan; the leading column also serves plain user_id lookups.
+    __table_args__ = (Index("ix_billing_transactions_user_created_at", "user_id", "created_at"),)
 
 
 class CacheEntry(Base):
@@ -173,7 +223,7 @@ class CacheEntry(Base):
     namespace: Mapped[str] = mapped_column(String(96), index=True)
     scope: Mapped[str] = mapped_column(String(96), index=True, default="global")
 
-    created_at: Mapped[dt.datetime] = mapped_column(DateTime, default=lambda: dt.datetime.now(dt.UTC))
+    created_at: Mapped[dt.datetime] = mapped_column(DateTime, server_default=utcnow())
     expires_at: Mapped[dt.datetime] = mapped_column(DateTime, index=True)
 
     value_json: Mapped[str | None] = mapped_column(Text, nullable=True)
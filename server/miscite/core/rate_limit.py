@@ -9,34 +9,110 @@ from fastapi import HTTPException, Request
 from server.miscite.core.config import Settings
 
 
-@dataclass
+_NS_PER_SECOND = 1_000_000_000
+_GC_MAX_BUCKETS = 100_000
+_GC_INTERVAL_NS = 60 * _NS_PER_SECOND
+
+
+@dataclass(slots=True)
 class _Bucket:
-    tokens: float
-    updated_at: float
+    # Token balance scaled by the window length in ns (one token == window_ns credit),
+    # so refills of `limit` credit per elapsed ns stay exact integer arithmetic.
+    credit: int
+    updated_ns: int
+    refill_per_ns: int
+    capacity: int
+
+    def is_full(self, now_ns: int) -> bool:
+        return self.credit + (now_ns - self.updated_ns) * self.refill_per_ns >= self.capacity
+
+
+@dataclass(slots=True)
+class _WindowCounter:
+    # Sliding-window counter: hits in the current fixed window plus the previous one, weighted
+    # by how much of the previous window still overlaps the trailing `window` interval.
+    window_ns: int
+    window_index: int
+    current: int
+    previous: int
+
+    def is_idle(self, now_ns: int) -> bool:
+        # Two windows on, neither counted window overlaps the trailing interval any more.
+        return now_ns // self.window_ns - self.window_index >= 2
 
 
 class RateLimiter:
-    def __init__(self) -> None:
+    def __init__(self, *, max_buckets: int = _GC_MAX_BUCKETS, gc_interval_ns: int = _GC_INTERVAL_NS) -> None:
         self._lock = threading.Lock()
         self._buckets: dict[str, _Bucket] = {}
+        self._windows: dict[str, _WindowCounter] = {}
         self._active: dict[str, int] = {}
+        self._max_buckets = max_buckets
+        self._gc_interval_ns = gc_interval_ns
+        self._last_gc_ns = time.monotonic_ns()
+
+    def _collect_idle_buckets(self, now_ns: int) -> None:
+        # A fully replenished bucket behaves exactly like a missing one, so dropping it is lossless.
+        self._last_gc_ns = now_ns
+        idle = [key for key, bucket in self._buckets.items() if bucket.is_full(now_ns)]
+        for key in idle:
+            del self._buckets[key]
+        stale = [key for key, counter in self._windows.items() if counter.is_idle(now_ns)]
+        for key in stale:
+            del self._windows[key]
 
     def allow(self, key: str, *, limit: int, window_seconds: int) -> bool:
-        now = time.monotonic()
-        rate = limit / max(1.0, float(window_seconds))
+        now_ns = time.monotonic_ns()
+        window_ns = max(1, int(window_seconds)) * _NS_PER_SECOND
+        capacity = limit * window_ns
         with self._lock:
+            if (
+                len(self._buckets) + len(self._windows) > self._max_buckets
+                and now_ns - self._last_gc_ns > self._gc_interval_ns
+            ):
+                self._collect_idle_buckets(now_ns)
             bucket = self._buckets.get(key)
             if bucket is None:
-                bucket = _Bucket(tokens=float(limit), updated_at=now)
+                bucket = _Bucket(credit=capacity, updated_ns=now_ns, refill_per_ns=limit, capacity=capacity)
                 self._buckets[key] = bucket
             else:
-                elapsed = max(0.0, now - bucket.updated_at)
-                bucket.tokens = min(float(limit), bucket.tokens + elapsed * rate)
-                bucket.updated_at = now
+                bucket.refill_per_ns = limit
+                bucket.capacity = capacity
+                elapsed_ns = now_ns - bucket.updated_ns
+                if elapsed_ns > 0:
+                    bucket.credit = min(capacity, bucket.credit + elapsed_ns * limit)
+                    bucket.updated_ns = now_ns
+
+            if bucket.credit < window_ns:
+                return False
+            bucket.credit -= window_ns
+            return True
 
-            if bucket.tokens < 1.0:
+    def allow_sliding_window(self, key: str, *, limit: int, window_seconds: int) -> bool:
+        now_ns = time.monotonic_ns()
+        window_ns = max(1, int(window_seconds)) * _NS_PER_SECOND
+        window_index, elapsed_ns = divmod(now_ns, window_ns)
+        with self._lock:
+            if (
+                len(self._buckets) + len(self._windows) > self._max_buckets
+                and now_ns - self._last_gc_ns > self._gc_interval_ns
+            ):
+                self._collect_idle_buckets(now_ns)
+            counter = self._windows.get(key)
+            if counter is None or counter.window_ns != window_ns:
+                counter = _WindowCounter(window_ns=window_ns, window_index=window_index, current=0, previous=0)
+                self._windows[key] = counter
+            elif counter.window_index != window_index:
+                rolled = counter.current if counter.window_index == window_index - 1 else 0
+                counter.window_index = window_index
+                counter.previous = rolled
+                counter.current = 0
+
+            # previous * (1 - elapsed/window) + current < limit, scaled by window_ns to stay in integers.
+            weighted = counter.previous * (window_ns - elapsed_ns) + counter.current * window_ns
+            if weighted >= limit * window_ns:
                 return False
-            bucket.tokens -= 1.0
+            counter.current += 1
             return True
 
     def acquire_slot(self, key: str, *, max_active: int) -> bool:
@@ -61,9 +137,10 @@ _limiter = RateLimiter()
 
 def _client_ip(request: Request, settings: Settings) -> str:
     if settings.trust_proxy:
-        forwarded = request.headers.get("x-forwarded-for", "")
-        if forwarded:
-            return forwarded.split(",")[0].strip()
+        # Only the first hop matters; partition avoids splitting the whole proxy chain.
+        first_hop = request.headers.get("x-forwarded-for", "").partition(",")[0].strip()
+        if first_hop:
+            return first_hop
     client = request.client
     return client.host if client else "unknown"
 
@@ -75,6 +152,7 @@ def enforce_rate_limit(
     key: str,
     limit: int,
     window_seconds: int,
+    sliding_window: bool = False,
 ) -> None:
     if not settings.rate_limit_enabled:
         return
@@ -82,7 +160,10 @@ def enforce_rate_limit(
         raise HTTPException(status_code=429, detail="Rate limit exceeded.")
     client_id = _client_ip(request, settings)
     bucket_key = f"{key}:{client_id}"
-    if not _limiter.allow(bucket_key, limit=limit, window_seconds=window_seconds):
+    # The token bucket refills continuously, so a drained client can still spend up to ~2x `limit`
+    # within one window; the sliding-window counter holds any trailing window to about `limit`.
+    allow = _limiter.allow_sliding_window if sliding_window else _limiter.allow
+    if not allow(bucket_key, limit=limit, window_seconds=window_seconds):
         raise HTTPException(status_code=429, detail="Rate limit exceeded.")
 
 
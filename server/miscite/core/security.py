@@ -6,10 +6,13 @@ import hashlib
 import hmac
 import os
 import secrets
+import threading
+import time
+from collections import OrderedDict
 
 from fastapi import Depends, HTTPException, Request
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, make_transient_to_detached
 
 from server.miscite.core.config import Settings
 from server.miscite.core.db import db_session
@@ -19,18 +22,27 @@ from server.miscite.core.models import User, UserSession
 _COOKIE_NAME = "miscite_session"
 _CSRF_COOKIE_NAME = "miscite_csrf"
 _DEFAULT_MAX_AGE = object()
+_SECONDS_PER_DAY = 86_400
 
+_SESSION_CACHE_TTL_SECONDS = 60.0
+_SESSION_CACHE_MAX_ENTRIES = 50_000
+# token hash -> (monotonic deadline, user column values, csrf hash). Users are never updated in place
+# and logout evicts here, so within the TTL the cached row matches what the DB lookup would return.
+_session_cache: OrderedDict[bytes, tuple[float, dict[str, object], bytes]] = OrderedDict()
+_session_cache_lock = threading.Lock()
+_USER_COLUMNS = tuple(column.key for column in User.__table__.columns)
 
-def _sha256_hex(value: str) -> str:
-    return hashlib.sha256(value.encode("utf-8")).hexdigest()
 
+def _sha256_digest(value: str) -> bytes:
+    return hashlib.sha256(value.encode("utf-8")).digest()
 
-def hash_token(value: str) -> str:
-    return _sha256_hex(value)
 
+def hash_token(value: str) -> bytes:
+    return _sha256_digest(value)
 
-def hash_login_code(value: str) -> str:
-    return _sha256_hex(value)
+
+def hash_login_code(value: str) -> bytes:
+    return _sha256_digest(value)
 
 
 def generate_access_token() -> str:
@@ -60,6 +72,12 @@ def hash_password(password: str) -> str:
     )
 
 
+def unusable_password_hash() -> str:
+    # Sign-in is by emailed code, so new accounts get a marker no password can match
+    # instead of a PBKDF2 hash of a random secret (~260k rounds of CPU per signup).
+    return "!"
+
+
 def verify_password(password: str, stored: str) -> bool:
     try:
         scheme, iterations_str, salt_b64, digest_b64 = stored.split("$", 3)
@@ -84,8 +102,8 @@ def create_session(db: Session, *, user: User, session_days: int) -> tuple[str,
     db.add(
         UserSession(
             user_id=user.id,
-            token_hash=_sha256_hex(token),
-            csrf_hash=_sha256_hex(csrf),
+            token_hash=_sha256_digest(token),
+            csrf_hash=_sha256_digest(csrf),
             created_at=now,
             expires_at=expires_at,
         )
@@ -94,8 +112,67 @@ def create_session(db: Session, *, user: User, session_days: int) -> tuple[str,
     return token, csrf
 
 
+def _cached_session(token_hash: bytes) -> tuple[dict[str, object], bytes] | None:
+    now = time.monotonic()
+    with _session_cache_lock:
+        entry = _session_cache.get(token_hash)
+        if entry is None:
+            return None
+        deadline, user_values, csrf_hash = entry
+        if deadline <= now:
+            del _session_cache[token_hash]
+            return None
+        return user_values, csrf_hash
+
+
+def _remember_session(token_hash: bytes, session: UserSession) -> None:
+    # Never cache past the session's own expiry, so expired sessions still fall through to the DB.
+    remaining = (_as_utc(session.expires_at) - dt.datetime.now(dt.UTC)).total_seconds()
+    ttl = min(_SESSION_CACHE_TTL_SECONDS, remaining)
+    if ttl <= 0:
+        return
+    user_values = {key: getattr(session.user, key) for key in _USER_COLUMNS}
+    now = time.monotonic()
+    with _session_cache_lock:
+        _session_cache[token_hash] = (now + ttl, user_values, session.csrf_hash)
+        _session_cache.move_to_end(token_hash)
+        while len(_session_cache) > _SESSION_CACHE_MAX_ENTRIES:
+            _session_cache.popitem(last=False)
+
+
+def _forget_session(token_hash: bytes) -> None:
+    with _session_cache_lock:
+        _session_cache.pop(token_hash, None)
+
+
+def _session_user(db: Session, token: str, *, delete_expired: bool) -> tuple[User, bytes] | None:
+    token_hash = _sha256_digest(token)
+    cached = _cached_session(token_hash)
+    if cached is not None:
+        user_values, csrf_hash = cached
+        user = User(**user_values)
+        # Mark the copy as already persisted so merge() attaches it without a SELECT.
+        make_transient_to_detached(user)
+        return db.merge(user, load=False), csrf_hash
+
+    session = db.scalar(select(UserSession).where(UserSession.token_hash == token_hash))
+    if session is None:
+        return None
+    if _as_utc(session.expires_at) < dt.datetime.now(dt.UTC):
+        if delete_expired:
+            db.delete(session)
+            db.commit()
+        return None
+    user = session.user
+    if user is None:
+        return None
+    _remember_session(token_hash, session)
+    return user, session.csrf_hash
+
+
 def delete_session(db: Session, *, token: str) -> None:
-    token_hash = _sha256_hex(token)
+    token_hash = _sha256_digest(token)
+    _forget_session(token_hash)
     session = db.scalar(select(UserSession).where(UserSession.token_hash == token_hash))
     if session is None:
         return
@@ -121,7 +198,7 @@ def set_session_cookie(
     max_age_seconds: int | None | object = _DEFAULT_MAX_AGE,
 ) -> None:
     if max_age_seconds is _DEFAULT_MAX_AGE:
-        max_age_seconds = int(dt.timedelta(days=settings.session_days).total_seconds())
+        max_age_seconds = settings.session_days * _SECONDS_PER_DAY
     response.set_cookie(
         _COOKIE_NAME,
         token,
@@ -141,7 +218,7 @@ def set_csrf_cookie(
     max_age_seconds: int | None | object = _DEFAULT_MAX_AGE,
 ) -> None:
     if max_age_seconds is _DEFAULT_MAX_AGE:
-        max_age_seconds = int(dt.timedelta(days=settings.session_days).total_seconds())
+        max_age_seconds = settings.session_days * _SECONDS_PER_DAY
     response.set_cookie(
         _CSRF_COOKIE_NAME,
         token,
@@ -166,19 +243,10 @@ def require_user(request: Request, db: Session = Depends(db_session)) -> User:
     if not token:
         raise HTTPException(status_code=401)
 
-    token_hash = _sha256_hex(token)
-    session = db.scalar(select(UserSession).where(UserSession.token_hash == token_hash))
-    if session is None:
-        raise HTTPException(status_code=401)
-    if _as_utc(session.expires_at) < dt.datetime.now(dt.UTC):
-        db.delete(session)
-        db.commit()
-        raise HTTPException(status_code=401)
-
-    user = db.scalar(select(User).where(User.id == session.user_id))
-    if user is None:
+    resolved = _session_user(db, token, delete_expired=True)
+    if resolved is None:
         raise HTTPException(status_code=401)
-    request.state._csrf_hash = session.csrf_hash
+    user, request.state._csrf_hash = resolved
     return user
 
 
@@ -186,14 +254,10 @@ def get_user_optional(request: Request, db: Session = Depends(db_session)) -> Us
     token = get_session_cookie(request)
     if not token:
         return None
-    token_hash = _sha256_hex(token)
-    session = db.scalar(select(UserSession).where(UserSession.token_hash == token_hash))
-    if session is None or _as_utc(session.expires_at) < dt.datetime.now(dt.UTC):
-        return None
-    user = db.scalar(select(User).where(User.id == session.user_id))
-    if user is None:
+    resolved = _session_user(db, token, delete_expired=False)
+    if resolved is None:
         return None
-    request.state._csrf_hash = session.csrf_hash
+    user, request.state._csrf_hash = resolved
     return user
 
 
@@ -201,7 +265,7 @@ def require_csrf(request: Request, csrf_token: str) -> None:
     csrf_hash = getattr(request.state, "_csrf_hash", None)
     if not csrf_hash:
         raise HTTPException(status_code=403, detail="Missing CSRF context")
-    if _sha256_hex(csrf_token) != csrf_hash:
+    if not hmac.compare_digest(_sha256_digest(csrf_token), csrf_hash):
         raise HTTPException(status_code=403, detail="Invalid CSRF token")
 
 
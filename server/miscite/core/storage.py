@@ -17,7 +17,7 @@ from server.miscite.core.config import Settings
 @dataclass(frozen=True)
 class StoredUpload:
     storage_path: str
-    sha256: str
+    sha256: bytes
     bytes_written: int
 
 
@@ -98,4 +98,4 @@ def save_upload(settings: Settings, upload: UploadFile) -> StoredUpload:
             pass
         raise
 
-    return StoredUpload(storage_path=str(dest), sha256=digest.hexdigest(), bytes_written=bytes_written)
+    return StoredUpload(storage_path=str(dest), sha256=digest.digest(), bytes_written=bytes_written)
@@ -1,9 +1,11 @@
+import gc
 import tempfile
+import threading
 import unittest
 from dataclasses import replace
 from pathlib import Path
 
-from server.miscite.core.cache import Cache
+from server.miscite.core.cache import Cache, CacheDebugStats
 from server.miscite.core.config import Settings
 from server.miscite.core.migrations import upgrade_to_head
 
@@ -58,6 +60,36 @@ class TestCacheDebug(unittest.TestCase):
             namespace_stats = (snap.get("namespaces") or {}).get("scoped.ns") or {}
             self.assertEqual(namespace_stats.get("json_get_miss"), 1)
 
+    def test_snapshot_merges_counts_from_all_threads(self) -> None:
+        stats = CacheDebugStats()
+        stats.increment("main", "json_get_hit")
+
+        def _work() -> None:
+            for _ in range(500):
+                stats.increment("worker", "http_request")
+
+        threads = [threading.Thread(target=_work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        snap = stats.snapshot()
+        self.assertEqual(snap["totals"], {"http_request": 2000, "json_get_hit": 1})
+        self.assertEqual(snap["namespaces"]["worker"], {"http_request": 2000})
+
+    def test_exited_threads_fold_into_totals(self) -> None:
+        stats = CacheDebugStats()
+        stats.increment("main", "json_get_hit")
+        for _ in range(3):
+            thread = threading.Thread(target=stats.increment, args=("worker", "http_request"))
+            thread.start()
+            thread.join()
+        gc.collect()
+
+        self.assertEqual(len(stats._thread_counts), 1)
+        self.assertEqual(stats.snapshot()["totals"], {"http_request": 3, "json_get_hit": 1})
+
 
 if __name__ == "__main__":
     unittest.main()
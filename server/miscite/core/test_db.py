@@ -0,0 +1,116 @@
+import datetime as dt
+import tempfile
+import unittest
+from dataclasses import replace
+from pathlib import Path
+
+from sqlalchemy import create_mock_engine, desc, func, inspect, select, text
+
+from server.miscite.core.config import Settings
+from server.miscite.core.db import Base, _engine_for, dialect_insert, get_sessionmaker
+from server.miscite.core.migrations import upgrade_to_head
+from server.miscite.core.models import AnalysisJob, AnalysisJobEvent, LoginCode
+
+
+class TestSqlitePragmas(unittest.TestCase):
+    def test_file_database_connections_are_tuned(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = _engine_for(f"sqlite:///{Path(tmp) / 'pragmas.db'}")
+            try:
+                with engine.connect() as conn:
+                    self.assertEqual(conn.execute(text("PRAGMA journal_mode")).scalar(), "wal")
+                    self.assertEqual(conn.execute(text("PRAGMA cache_size")).scalar(), -16384)
+                    self.assertEqual(conn.execute(text("PRAGMA temp_store")).scalar(), 2)
+                    self.assertEqual(conn.execute(text("PRAGMA mmap_size")).scalar(), 268435456)
+            finally:
+                engine.dispose()
+
+
+class TestDialectInsert(unittest.TestCase):
+    def test_login_code_upsert_replaces_outstanding_code(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = replace(Settings.from_env(), db_url=f"sqlite:///{Path(tmp) / 'upsert.db'}")
+            upgrade_to_head(settings)
+            db = get_sessionmaker(settings)()
+            try:
+                now = dt.datetime.now(dt.UTC)
+                for code_hash in (b"a" * 32, b"b" * 32):
+                    stmt = dialect_insert(db, LoginCode).values(
+                        email="x@example.com", code_hash=code_hash, created_at=now, expires_at=now
+                    )
+                    db.execute(
+                        stmt.on_conflict_do_update(
+                            index_elements=[LoginCode.email],
+                            set_={"code_hash": stmt.excluded.code_hash},
+                        )
+                    )
+                db.commit()
+                self.assertEqual(db.scalar(select(func.count()).select_from(LoginCode)), 1)
+                self.assertEqual(db.scalar(select(LoginCode.code_hash)), b"b" * 32)
+            finally:
+                db.close()
+
+
+class TestJobIndexes(unittest.TestCase):
+    def _plan(self, settings: Settings, stmt) -> str:
+        engine = _engine_for(settings.db_url)
+        try:
+            sql = str(stmt.compile(engine, compile_kwargs={"literal_binds": True}))
+            with engine.connect() as conn:
+                return " ".join(row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+        finally:
+            engine.dispose()
+
+    def test_dashboard_and_progress_reads_need_no_sort(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = replace(Settings.from_env(), db_url=f"sqlite:///{Path(tmp) / 'jobs.db'}")
+            upgrade_to_head(settings)
+            newest = self._plan(
+                settings,
+                select(AnalysisJob.id).where(AnalysisJob.user_id == "u1").order_by(desc(AnalysisJob.created_at)).limit(25),
+            )
+            self.assertIn("ix_analysis_jobs_user_created_at", newest)
+            self.assertNotIn("TEMP B-TREE", newest)
+
+            events = self._plan(
+                settings,
+                select(AnalysisJobEvent.stage)
+                .where(AnalysisJobEvent.job_id == "j1", AnalysisJobEvent.id > 7)
+                .order_by(AnalysisJobEvent.id),
+            )
+            self.assertIn("ix_analysis_job_events_job_id_id", events)
+            self.assertNotIn("TEMP B-TREE", events)
+
+
+class TestFilenameTrigramIndex(unittest.TestCase):
+    def test_only_postgres_builds_it_after_loading_pg_trgm(self) -> None:
+        statements: list[str] = []
+
+        def _record(sql, *_args, **_kwargs) -> None:
+            statements.append(str(sql.compile(dialect=engine.dialect)).strip())
+
+        engine = create_mock_engine("postgresql+psycopg://", _record)
+        Base.metadata.create_all(engine, checkfirst=False)
+        expected = (
+            "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+            "CREATE TABLE documents",
+            "CREATE INDEX ix_documents_original_filename_trgm ON documents USING gin (original_filename gin_trgm_ops)",
+        )
+        order = [next(i for i, sql in enumerate(statements) if sql.startswith(prefix)) for prefix in expected]
+        self.assertEqual(order, sorted(order))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = replace(Settings.from_env(), db_url=f"sqlite:///{Path(tmp) / 'docs.db'}")
+            upgrade_to_head(settings)
+            engine = _engine_for(settings.db_url)
+            try:
+                self.assertNotIn(
+                    "ix_documents_original_filename_trgm",
+                    {ix["name"] for ix in inspect(engine).get_indexes("documents")},
+                )
+            finally:
+                engine.dispose()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import asyncio
+import sys
+import threading
+import types
+import unittest
+from unittest import mock
+
+from server.miscite.core.job_events import JobEventListener
+
+
+class TestJobEventListener(unittest.TestCase):
+    def test_dispatch_from_another_thread_wakes_only_that_job(self) -> None:
+        listener = JobEventListener()
+
+        async def _run() -> tuple[bool, bool]:
+            wanted = listener.subscribe("a")
+            other = listener.subscribe("b")
+            thread = threading.Thread(target=listener.dispatch, args=("a",))
+            thread.start()
+            await asyncio.wait_for(wanted.wait(), 5)
+            thread.join()
+            listener.unsubscribe("a", wanted)
+            listener.unsubscribe("b", other)
+            return wanted.is_set(), other.is_set()
+
+        self.assertEqual(asyncio.run(_run()), (True, False))
+        self.assertEqual(listener._waiters, {})
+
+    def test_start_is_a_no_op_off_postgres(self) -> None:
+        listener = JobEventListener()
+        listener.start("sqlite:///./data/miscite.db")
+        self.assertFalse(listener.running)
+
+    def test_running_only_while_listen_connection_is_up(self) -> None:
+        listener = JobEventListener()
+        seen: list[bool] = []
+
+        class _Conn:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc) -> None:
+                return None
+
+            def execute(self, sql: str) -> None:
+                seen.append(listener.running)
+
+            def notifies(self):
+                seen.append(listener.running)
+                listener._stop.set()
+                raise OSError("server closed the connection")
+
+        psycopg = types.SimpleNamespace(connect=lambda *args, **kwargs: _Conn())
+        with mock.patch.dict(sys.modules, {"psycopg": psycopg}), mock.patch("time.sleep"):
+            listener._listen_forever("postgresql://localhost/miscite")
+
+        self.assertEqual(seen, [False, True])
+        self.assertFalse(listener.running)
+
+
+if __name__ == "__main__":
+    unittest.main()
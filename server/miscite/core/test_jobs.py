@@ -0,0 +1,86 @@
+import tempfile
+import unittest
+from dataclasses import replace
+from pathlib import Path
+
+from sqlalchemy import select, text
+
+from server.miscite.core.config import Settings
+from server.miscite.core.db import get_sessionmaker
+from server.miscite.core.jobs import delete_jobs_bulk
+from server.miscite.core.migrations import upgrade_to_head
+from server.miscite.core.models import AnalysisJob, AnalysisJobEvent, Document, User
+
+
+class TestDeleteJobsBulk(unittest.TestCase):
+    def _settings(self, root: Path) -> Settings:
+        settings = replace(Settings.from_env(), db_url=f"sqlite:///{root / 'jobs.db'}")
+        upgrade_to_head(settings)
+        return settings
+
+    def test_deletes_jobs_events_and_orphaned_documents(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = self._settings(Path(tmp))
+            db = get_sessionmaker(settings)()
+            try:
+                db.add(User(id="u1", email="u1@example.com", password_hash=""))
+                db.flush()
+                for doc_id in ("d1", "d2"):
+                    db.add(
+                        Document(
+                            id=doc_id,
+                            user_id="u1",
+                            original_filename=f"{doc_id}.pdf",
+                            content_type="application/pdf",
+                            storage_path=f"/tmp/{doc_id}.pdf",
+                            sha256=bytes(32),
+                        )
+                    )
+                db.flush()
+                db.add_all(
+                    [
+                        AnalysisJob(id="j1", user_id="u1", document_id="d1"),
+                        AnalysisJob(id="j2", user_id="u1", document_id="d2"),
+                        AnalysisJob(id="j3", user_id="u1", document_id="d2"),
+                    ]
+                )
+                db.flush()
+                db.add_all(
+                    [
+                        AnalysisJobEvent(job_id="j1", stage="queued"),
+                        AnalysisJobEvent(job_id="j2", stage="queued"),
+                        AnalysisJobEvent(job_id="j3", stage="queued"),
+                    ]
+                )
+                db.commit()
+
+                deleted = delete_jobs_bulk(db, job_ids=["j1", "j2", "j1", ""])
+                db.commit()
+
+                self.assertEqual(deleted, {"d1"})
+                self.assertEqual(set(db.scalars(select(AnalysisJob.id))), {"j3"})
+                self.assertEqual(set(db.scalars(select(AnalysisJobEvent.job_id))), {"j3"})
+                self.assertEqual(set(db.scalars(select(Document.id))), {"d2"})
+                self.assertEqual(delete_jobs_bulk(db, job_ids=[]), set())
+            finally:
+                db.close()
+
+    def test_event_delete_uses_job_id_index(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = self._settings(Path(tmp))
+            db = get_sessionmaker(settings)()
+            try:
+                plan = db.execute(
+                    text(
+                        "EXPLAIN QUERY PLAN DELETE FROM analysis_job_events "
+                        "WHERE job_id IN ('a', 'b')"
+                    )
+                ).all()
+                details = " ".join(str(row[-1]) for row in plan)
+                self.assertIn("ix_analysis_job_events_job_id", details)
+            finally:
+                db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
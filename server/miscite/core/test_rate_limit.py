@@ -0,0 +1,99 @@
+import unittest
+from dataclasses import replace
+from types import SimpleNamespace
+from unittest import mock
+
+from server.miscite.core import rate_limit
+from server.miscite.core.config import Settings
+from server.miscite.core.rate_limit import RateLimiter
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now_ns = 1_000_000_000
+
+    def __call__(self) -> int:
+        return self.now_ns
+
+    def advance(self, seconds: float) -> None:
+        self.now_ns += int(seconds * 1_000_000_000)
+
+
+class TestRateLimiter(unittest.TestCase):
+    def setUp(self) -> None:
+        self.clock = _Clock()
+        patcher = mock.patch.object(rate_limit.time, "monotonic_ns", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_allows_burst_up_to_limit_then_refills(self) -> None:
+        limiter = RateLimiter()
+        results = [limiter.allow("k", limit=3, window_seconds=60) for _ in range(4)]
+        self.assertEqual(results, [True, True, True, False])
+
+        self.clock.advance(19.9)
+        self.assertFalse(limiter.allow("k", limit=3, window_seconds=60))
+        self.clock.advance(0.1)
+        self.assertTrue(limiter.allow("k", limit=3, window_seconds=60))
+
+    def test_frequent_calls_do_not_lose_fractional_refill(self) -> None:
+        limiter = RateLimiter()
+        self.assertTrue(limiter.allow("k", limit=1, window_seconds=1))
+        allowed = 0
+        for _ in range(1000):
+            self.clock.advance(0.001)
+            allowed += limiter.allow("k", limit=1, window_seconds=1)
+        self.assertEqual(allowed, 1)
+
+    def test_idle_full_buckets_are_collected_once_over_threshold(self) -> None:
+        limiter = RateLimiter(max_buckets=2, gc_interval_ns=1_000_000_000)
+        for key in ("a", "b", "c"):
+            self.assertTrue(limiter.allow(key, limit=2, window_seconds=10))
+        self.assertEqual(len(limiter._buckets), 3)
+
+        self.clock.advance(6)
+        self.assertTrue(limiter.allow("c", limit=2, window_seconds=10))
+        self.assertEqual(set(limiter._buckets), {"c"})
+
+    def test_sliding_window_weights_previous_window(self) -> None:
+        limiter = RateLimiter()
+        self.clock.now_ns = 100 * 1_000_000_000
+        results = [limiter.allow_sliding_window("k", limit=4, window_seconds=10) for _ in range(5)]
+        self.assertEqual(results, [True, True, True, True, False])
+
+        # 2.5s into the next window, 75% of the previous 4 hits still count: 3 + 0 < 4 allows one more.
+        self.clock.advance(12.5)
+        self.assertTrue(limiter.allow_sliding_window("k", limit=4, window_seconds=10))
+        self.assertFalse(limiter.allow_sliding_window("k", limit=4, window_seconds=10))
+
+        self.clock.advance(5)
+        self.assertTrue(limiter.allow_sliding_window("k", limit=4, window_seconds=10))
+
+        self.clock.advance(20)
+        results = [limiter.allow_sliding_window("k", limit=4, window_seconds=10) for _ in range(5)]
+        self.assertEqual(results, [True, True, True, True, False])
+
+    def test_idle_window_counters_are_collected(self) -> None:
+        limiter = RateLimiter(max_buckets=1, gc_interval_ns=1_000_000_000)
+        self.assertTrue(limiter.allow_sliding_window("a", limit=1, window_seconds=10))
+        self.assertTrue(limiter.allow_sliding_window("b", limit=1, window_seconds=10))
+        self.clock.advance(25)
+        self.assertTrue(limiter.allow_sliding_window("c", limit=1, window_seconds=10))
+        self.assertEqual(set(limiter._windows), {"c"})
+
+
+class TestClientIp(unittest.TestCase):
+    def test_uses_first_forwarded_hop_only_when_trusted(self) -> None:
+        request = SimpleNamespace(
+            headers={"x-forwarded-for": " 203.0.113.7 , 10.0.0.1, 10.0.0.2"},
+            client=SimpleNamespace(host="10.0.0.9"),
+        )
+        settings = Settings.from_env()
+        self.assertEqual(rate_limit._client_ip(request, replace(settings, trust_proxy=True)), "203.0.113.7")
+        self.assertEqual(rate_limit._client_ip(request, replace(settings, trust_proxy=False)), "10.0.0.9")
+        request.headers = {"x-forwarded-for": ", 10.0.0.1"}
+        self.assertEqual(rate_limit._client_ip(request, replace(settings, trust_proxy=True)), "10.0.0.9")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import tempfile
+import unittest
+from dataclasses import replace
+from pathlib import Path
+
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from server.miscite.core.config import Settings
+from server.miscite.core.db import count_statements, get_engine, get_sessionmaker
+from server.miscite.core.migrations import upgrade_to_head
+from server.miscite.core.models import User
+from server.miscite.core.security import (
+    create_session,
+    delete_session,
+    hash_password,
+    require_user,
+    unusable_password_hash,
+    verify_password,
+)
+
+
+def _request_with_cookie(token: str) -> Request:
+    cookie = f"miscite_session={token}".encode("latin-1")
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": [(b"cookie", cookie)]})
+
+
+class TestRequireUser(unittest.TestCase):
+    def test_session_and_user_load_in_one_query(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = replace(Settings.from_env(), db_url=f"sqlite:///{Path(tmp) / 'auth.db'}")
+            upgrade_to_head(settings)
+            db = get_sessionmaker(settings)()
+            try:
+                user = User(id="u1", email="u1@example.com", password_hash="")
+                db.add(user)
+                db.commit()
+                token, _csrf = create_session(db, user=user, session_days=1)
+                db.expunge_all()
+
+                engine = get_engine(settings)
+                with count_statements(engine) as statements:
+                    loaded = require_user(_request_with_cookie(token), db)
+
+                self.assertEqual(loaded.id, "u1")
+                self.assertEqual(len(statements), 1)
+
+                db.expunge_all()
+                with count_statements(engine) as statements:
+                    cached = require_user(_request_with_cookie(token), db)
+                self.assertEqual((cached.id, cached.email), ("u1", "u1@example.com"))
+                self.assertIs(db.get(User, "u1"), cached)
+                self.assertEqual(statements, [])
+
+                delete_session(db, token=token)
+                with self.assertRaises(HTTPException):
+                    require_user(_request_with_cookie(token), db)
+            finally:
+                db.close()
+
+
+class TestPasswordHashes(unittest.TestCase):
+    def test_unusable_hash_never_verifies(self) -> None:
+        self.assertFalse(verify_password("", unusable_password_hash()))
+        self.assertFalse(verify_password(unusable_password_hash(), unusable_password_hash()))
+        self.assertTrue(verify_password("correct horse", hash_password("correct horse")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+from dataclasses import replace
+from unittest import mock
+
+from server.miscite.core import turnstile
+from server.miscite.core.config import Settings
+
+
+class _Response:
+    def __init__(self, payload: dict) -> None:
+        self._payload = payload
+
+    def raise_for_status(self) -> None:
+        return None
+
+    def json(self) -> dict:
+        return self._payload
+
+
+class TestVerifyTurnstile(unittest.TestCase):
+    def setUp(self) -> None:
+        self.settings = replace(Settings.from_env(), turnstile_site_key="site", turnstile_secret_key="secret")
+        turnstile._rejected.clear()
+        self.addCleanup(turnstile._rejected.clear)
+
+    def test_rejected_token_is_not_reverified(self) -> None:
+        with mock.patch.object(turnstile.requests, "post", return_value=_Response({"success": False})) as post:
+            for _ in range(3):
+                ok, _err = turnstile.verify_turnstile(self.settings, token="t1", remote_ip="1.2.3.4")
+                self.assertFalse(ok)
+            self.assertEqual(post.call_count, 1)
+
+            turnstile.verify_turnstile(self.settings, token="t1", remote_ip="5.6.7.8")
+            self.assertEqual(post.call_count, 2)
+
+    def test_successes_and_transport_errors_are_not_cached(self) -> None:
+        with mock.patch.object(turnstile.requests, "post", return_value=_Response({"success": True})) as post:
+            self.assertEqual(turnstile.verify_turnstile(self.settings, token="t2"), (True, None))
+            self.assertEqual(turnstile.verify_turnstile(self.settings, token="t2"), (True, None))
+            self.assertEqual(post.call_count, 2)
+
+        with mock.patch.object(turnstile.requests, "post", side_effect=turnstile.requests.ConnectionError) as post:
+            turnstile.verify_turnstile(self.settings, token="t3")
+            turnstile.verify_turnstile(self.settings, token="t3")
+            self.assertEqual(post.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
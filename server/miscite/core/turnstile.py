@@ -1,9 +1,47 @@
 from __future__ import annotations
 
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
 import requests
 
 from server.miscite.core.config import Settings
 
+_REJECTION_TTL_SECONDS = 60.0
+_REJECTION_MAX_ENTRIES = 10_000
+# Tokens Cloudflare already rejected, keyed by digest of (token, ip) -> monotonic expiry. Tokens are
+# single-use, so a rejected one can never pass later; successes are never cached (that would allow replay).
+_rejected: OrderedDict[bytes, float] = OrderedDict()
+_rejected_lock = threading.Lock()
+
+
+def _rejection_key(token: str, remote_ip: str | None) -> bytes:
+    return hashlib.sha256(f"{remote_ip or ''}\0{token}".encode("utf-8")).digest()
+
+
+def _recently_rejected(key: bytes) -> bool:
+    now = time.monotonic()
+    with _rejected_lock:
+        expires_at = _rejected.get(key)
+        if expires_at is None:
+            return False
+        if expires_at <= now:
+            del _rejected[key]
+            return False
+        return True
+
+
+def _remember_rejection(key: bytes) -> None:
+    now = time.monotonic()
+    with _rejected_lock:
+        _rejected[key] = now + _REJECTION_TTL_SECONDS
+        _rejected.move_to_end(key)
+        # Entries share one TTL, so the oldest insertions expire first.
+        while _rejected and (len(_rejected) > _REJECTION_MAX_ENTRIES or next(iter(_rejected.values())) <= now):
+            _rejected.popitem(last=False)
+
 
 def verify_turnstile(
     settings: Settings,
@@ -11,11 +49,15 @@ def verify_turnstile(
     token: str,
     remote_ip: str | None = None,
 ) -> tuple[bool, str | None]:
-    if not settings.turnstile_site_key or not settings.turnstile_secret_key:
+    if not settings.turnstile_ready:
         return False, "Turnstile is not configured."
     if not token:
         return False, "Turnstile token missing."
 
+    key = _rejection_key(token, remote_ip)
+    if _recently_rejected(key):
+        return False, "Turnstile verification failed."
+
     data = {
         "secret": settings.turnstile_secret_key,
         "response": token,
@@ -32,4 +74,5 @@ def verify_turnstile(
 
     if payload.get("success") is True:
         return True, None
+    _remember_rejection(key)
     return False, "Turnstile verification failed."
@@ -1,18 +1,78 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import re
 import threading
+from collections import OrderedDict
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass, field
+from functools import lru_cache
 
 import json_repair
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from server.miscite.billing.usage import UsageTracker
 from server.miscite.core.cache import Cache
 from server.miscite.sources.concurrency import acquire_api_slot
 from server.miscite.sources.http import backoff_sleep, record_http_request
 
+# A JSON string literal, tolerating an unterminated literal (or a dangling backslash) at EOF.
+_JSON_STRING_RE = re.compile(r'"(?:[^"\\]|\\.)*(?:"|\\?\Z)', re.S)
+_STRING_CONTROL_RE = re.compile(r"(\\.)|[\n\r\t]", re.S)
+_CONTROL_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+# String literals (skipped whole) and braces, for locating an object that does not parse.
+_BRACE_SCAN_RE = re.compile(r'"(?:[^"\\]|\\.)*(?:"|\\?\Z)|[{}]', re.S)
+_JSON_OBJECT_DECODER = json.JSONDecoder(strict=False)
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+# Either a string literal (kept as-is) or whitespace between the end of a value and the
+# start of the next one; a preceding `{[,:` (or start of text) means no comma is missing.
+_MISSING_COMMA_RE = re.compile(
+    r'"(?:[^"\\]|\\.)*(?:"|\\?\Z)|(?<=[^\s{\[,:])(?P<gap>\s+)(?=["{\[\-0-9tfn])',
+    re.S,
+)
+
+# Retries happen inside the connection pool, so a retry reuses the kept-alive connection.
+_OPENROUTER_RETRY = Retry(
+    total=3,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset({"POST"}),
+    respect_retry_after_header=True,
+)
+
+# Where providers put the completion text within `choices[0]`, most common first; the first
+# non-empty string wins. Content given as a list of parts is joined as a last resort.
+_CONTENT_PATHS: tuple[tuple[str, ...], ...] = (
+    ("message", "content"),
+    ("message",),
+    ("message", "content", "text"),
+    ("message", "content", "content"),
+    ("message", "output_text"),
+    ("message", "text"),
+    ("text",),
+    ("delta", "content"),
+)
+_CONTENT_PARTS_PATHS: tuple[tuple[str, ...], ...] = (("message", "content"), ("delta", "content"))
+
+# Prompts above this size are hashed directly rather than memoized, to keep the memo bounded in bytes.
+_PROMPT_DIGEST_MEMO_MAX_CHARS = 64 * 1024
+
+
+@lru_cache(maxsize=4096)
+def _memo_prompt_digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _prompt_digest(text: str) -> str:
+    if len(text) <= _PROMPT_DIGEST_MEMO_MAX_CHARS:
+        return _memo_prompt_digest(text)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
 
 @dataclass
 class OpenRouterClient:
@@ -23,15 +83,47 @@ class OpenRouterClient:
     usage_tracker: UsageTracker | None = None
     job_limiter: threading.Semaphore | None = None
     source_global_limit: int = 4
+    max_parallel: int = 8
+    mem_cache_max: int = 1024
     _session_local: threading.local = field(default_factory=threading.local, init=False, repr=False)
+    _sessions: list[requests.Session] = field(default_factory=list, init=False, repr=False)
+    # Created on the first batch and kept, so its threads (and their sessions) are reused across batches.
+    _executor: ThreadPoolExecutor | None = field(default=None, init=False, repr=False)
+    _executor_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    # Serialized payloads keyed by cache parts; repeat prompts skip the SQLite/file lookup entirely.
+    _mem_cache: OrderedDict[tuple[str, ...], bytes] = field(default_factory=OrderedDict, init=False, repr=False)
+    _mem_cache_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
 
     def _client(self) -> requests.Session:
         session = getattr(self._session_local, "session", None)
         if session is None:
             session = requests.Session()
+            session.mount(
+                "https://",
+                HTTPAdapter(pool_connections=8, pool_maxsize=16, max_retries=_OPENROUTER_RETRY),
+            )
+            session.headers.update(
+                {
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json",
+                }
+            )
             self._session_local.session = session
+            with self._executor_lock:
+                self._sessions.append(session)
         return session
 
+    def close(self) -> None:
+        """Shut down the batch pool and close every session this client opened."""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+            sessions, self._sessions = self._sessions, []
+            self._session_local = threading.local()
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        for session in sessions:
+            session.close()
+
     def _request_slot(self):
         return acquire_api_slot(
             source="openrouter",
@@ -46,12 +138,18 @@ class OpenRouterClient:
         cache = self.cache
         cache_ttl_days = cache.settings.cache_llm_ttl_days if cache and cache.settings.cache_enabled else 0
         temperature = 0.2
-        cache_parts: list[str] | None = None
+        cache_parts: list[str] = []
         if cache and cache_ttl_days > 0:
             cache = cache.scoped("global")
-            cache_parts = [self.model, f"temp:{temperature}", system, user]
+            # Key on prompt digests so the (often large) prompts are hashed once per call, not per lookup.
+            cache_parts = [self.model, f"temp:{temperature}", _prompt_digest(system), _prompt_digest(user)]
+            mem_hit = self._mem_cache_get(cache_parts)
+            if mem_hit is not None:
+                cache.debug_stats.increment("openrouter.chat_json", "mem_get_hit")
+                return mem_hit
             hit, cached = cache.get_json("openrouter.chat_json", cache_parts)
             if hit and isinstance(cached, dict):
+                self._mem_cache_put(cache_parts, cached)
                 return cached
             # Fallback to file cache to avoid SQLite lock contention.
             hit, cached_text = cache.get_text_file(
@@ -59,17 +157,14 @@ class OpenRouterClient:
             )
             if hit:
                 try:
-                    cached_file = json.loads(cached_text)
+                    cached_file = orjson.loads(cached_text)
                 except Exception:
                     cached_file = None
                 if isinstance(cached_file, dict):
+                    self._mem_cache_put(cache_parts, cached_file)
                     return cached_file
 
         url = "https://openrouter.ai/api/v1/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
         payload = {
             "model": self.model,
             "messages": [
@@ -80,85 +175,151 @@ class OpenRouterClient:
         }
 
         last_err: Exception | None = None
+        # Transport failures and 429/5xx responses are retried by the session adapter (which honors
+        # Retry-After); this loop only re-asks when OpenRouter reports a retryable error in a 200 body.
         for attempt in range(3):
+            record_http_request(cache, "openrouter.chat_json")
             try:
-                record_http_request(cache, "openrouter.chat_json")
                 with self._request_slot():
                     resp = self._client().post(
                         url,
-                        headers=headers,
                         json=payload,
                         timeout=self.timeout_seconds,
                     )
                 resp.raise_for_status()
-                data = resp.json() or {}
-                self._record_usage(data)
-                content = _extract_message_content(data)
-                if not content:
-                    err_payload = data.get("error")
-                    err = ""
-                    err_code = None
-                    err_provider = None
-                    if isinstance(err_payload, dict):
-                        err = str(err_payload.get("message") or "").strip()
-                        err_code = err_payload.get("code")
-                        err_provider = err_payload.get("provider")
-                    elif isinstance(err_payload, str):
-                        err = err_payload.strip()
-                    if err:
-                        extras: list[str] = []
-                        if err_code:
-                            extras.append(f"code={err_code}")
-                        if err_provider:
-                            extras.append(f"provider={err_provider}")
-                        request_id = (
-                            resp.headers.get("x-request-id")
-                            or resp.headers.get("x-openrouter-request-id")
-                            or resp.headers.get("x-req-id")
-                        )
-                        if request_id:
-                            extras.append(f"request_id={request_id}")
-                        detail = err
-                        if extras:
-                            detail = f"{detail} ({', '.join(extras)})"
-                        if _is_retryable_openrouter_error(err, err_code):
-                            last_err = RuntimeError(f"OpenRouter error response: {detail}")
-                            backoff_sleep(attempt)
-                            continue
-                        raise RuntimeError(f"OpenRouter error response: {detail}")
-                    snippet = json.dumps(data, ensure_ascii=True)[:1000]
-                    raise RuntimeError(
-                        "OpenRouter response missing message content. "
-                        f"First 1000 chars: {snippet}"
-                    )
-                try:
-                    payload = _load_json_payload(content)
-                    if cache and cache_ttl_days > 0:
-                        cache.set_json(
-                            "openrouter.chat_json",
-                            cache_parts or [self.model, f"temp:{temperature}", system, user],
-                            payload,
-                            ttl_seconds=float(cache_ttl_days) * 86400.0,
-                        )
-                        try:
-                            cache.set_text_file(
-                                "openrouter.chat_json",
-                                cache_parts or [self.model, f"temp:{temperature}", system, user],
-                                json.dumps(payload, ensure_ascii=False),
-                            )
-                        except Exception:
-                            pass
-                    return payload
-                except json.JSONDecodeError as e:
-                    snippet = content[:500].replace("\n", "\\n")
-                    raise LlmOutputError(
-                        f"Model did not return valid JSON. First 500 chars: {snippet}"
-                    ) from e
             except requests.RequestException as e:
+                raise RuntimeError("OpenRouter request failed after retries") from e
+            try:
+                data = orjson.loads(resp.content) if resp.content else {}
+            except orjson.JSONDecodeError as e:
+                # A 200 that isn't JSON (e.g. a gateway error page) is transient; ask again.
                 last_err = e
                 backoff_sleep(attempt)
+                continue
+            self._record_usage(data)
+            content = _extract_message_content(data)
+            if not content:
+                err_payload = data.get("error")
+                err = ""
+                err_code = None
+                err_provider = None
+                if isinstance(err_payload, dict):
+                    err = str(err_payload.get("message") or "").strip()
+                    err_code = err_payload.get("code")
+                    err_provider = err_payload.get("provider")
+                elif isinstance(err_payload, str):
+                    err = err_payload.strip()
+                if err:
+                    extras: list[str] = []
+                    if err_code:
+                        extras.append(f"code={err_code}")
+                    if err_provider:
+                        extras.append(f"provider={err_provider}")
+                    request_id = (
+                        resp.headers.get("x-request-id")
+                        or resp.headers.get("x-openrouter-request-id")
+                        or resp.headers.get("x-req-id")
+                    )
+                    if request_id:
+                        extras.append(f"request_id={request_id}")
+                    detail = err
+                    if extras:
+                        detail = f"{detail} ({', '.join(extras)})"
+                    if _is_retryable_openrouter_error(err, err_code):
+                        last_err = RuntimeError(f"OpenRouter error response: {detail}")
+                        backoff_sleep(attempt)
+                        continue
+                    raise RuntimeError(f"OpenRouter error response: {detail}")
+                snippet = orjson.dumps(data).decode("utf-8")[:1000]
+                raise RuntimeError(
+                    "OpenRouter response missing message content. "
+                    f"First 1000 chars: {snippet}"
+                )
+            # Billing needs `usage`, which trails `choices` in the body, so the response is
+            # parsed whole; release it (and the raw body) before the slower JSON repair and cache writes.
+            del data, resp
+            try:
+                payload = _load_json_payload(content)
+                if cache and cache_ttl_days > 0:
+                    cache.set_json(
+                        "openrouter.chat_json",
+                        cache_parts,
+                        payload,
+                        ttl_seconds=float(cache_ttl_days) * 86400.0,
+                    )
+                    try:
+                        cache.set_text_file(
+                            "openrouter.chat_json",
+                            cache_parts,
+                            json.dumps(payload, ensure_ascii=False),
+                        )
+                    except Exception:
+                        pass
+                    self._mem_cache_put(cache_parts, payload)
+                return payload
+            except json.JSONDecodeError as e:
+                snippet = content[:500].replace("\n", "\\n")
+                raise LlmOutputError(
+                    f"Model did not return valid JSON. First 500 chars: {snippet}"
+                ) from e
         raise RuntimeError("OpenRouter request failed after retries") from last_err
 
+    def _mem_cache_get(self, parts: Sequence[str]) -> dict | None:
+        key = tuple(parts)
+        with self._mem_cache_lock:
+            blob = self._mem_cache.get(key)
+            if blob is None:
+                return None
+            self._mem_cache.move_to_end(key)
+        # Each hit gets a fresh dict so callers can mutate results without poisoning the cache.
+        return orjson.loads(blob)
+
+    def _mem_cache_put(self, parts: Sequence[str], payload: dict) -> None:
+        if self.mem_cache_max <= 0:
+            return
+        try:
+            blob = orjson.dumps(payload)
+        except TypeError:
+            return
+        key = tuple(parts)
+        with self._mem_cache_lock:
+            self._mem_cache[key] = blob
+            self._mem_cache.move_to_end(key)
+            while len(self._mem_cache) > self.mem_cache_max:
+                self._mem_cache.popitem(last=False)
+
+    def chat_json_batch(self, prompts: Sequence[tuple[str, str]]) -> list[dict]:
+        """Run `chat_json` for each (system, user) pair concurrently; results keep input order.
+
+        Requests still pass through the job/source API slots, so this only overlaps calls
+        the global caps already allow. Cache hits return without waiting on a slot.
+        """
+        if not prompts:
+            return []
+        if min(max(1, int(self.max_parallel)), len(prompts)) == 1:
+            return [self.chat_json(system=system, user=user) for system, user in prompts]
+
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max(1, int(self.max_parallel)),
+                    thread_name_prefix="openrouter-batch",
+                )
+            ex = self._executor
+        results: list[dict] = [{} for _ in prompts]
+        futures = {
+            ex.submit(self.chat_json, system=system, user=user): idx
+            for idx, (system, user) in enumerate(prompts)
+        }
+        try:
+            for fut in as_completed(futures):
+                results[futures[fut]] = fut.result()
+        except Exception:
+            for fut in futures:
+                fut.cancel()
+            raise
+        return results
+
     def _record_usage(self, data: dict) -> None:
         if not self.usage_tracker:
             return
@@ -247,62 +408,38 @@ def _is_retryable_openrouter_error(message: str | None, code: object | None) ->
 
 
 def _extract_message_content(data: dict) -> str | None:
-    choices = data.get("choices") or []
-    if not choices:
+    choices = data.get("choices")
+    if not isinstance(choices, list) or not choices:
         return None
-
-    choice = choices[0] or {}
-    message = choice.get("message")
-    if isinstance(message, str):
-        return message
-    if isinstance(message, dict):
-        content = message.get("content")
-        if isinstance(content, str):
-            return content
-        if isinstance(content, dict):
-            text = content.get("text") or content.get("content")
-            if isinstance(text, str):
-                return text
-        if isinstance(content, list):
-            parts: list[str] = []
-            for part in content:
-                if isinstance(part, str):
-                    parts.append(part)
-                    continue
-                if isinstance(part, dict):
-                    text = part.get("text") or part.get("content")
-                    if isinstance(text, str) and text:
-                        parts.append(text)
+    choice = choices[0]
+    for path in _CONTENT_PATHS:
+        value = _walk_path(choice, path)
+        if isinstance(value, str) and value:
+            return value
+    for path in _CONTENT_PARTS_PATHS:
+        value = _walk_path(choice, path)
+        if isinstance(value, list):
+            parts = [text for text in map(_content_part_text, value) if text is not None]
             if parts:
                 return "\n".join(parts)
-        output_text = message.get("output_text")
-        if isinstance(output_text, str):
-            return output_text
-        text = message.get("text")
-        if isinstance(text, str):
-            return text
+    return None
 
-    text = choice.get("text")
-    if isinstance(text, str):
-        return text
 
-    delta = choice.get("delta")
-    if isinstance(delta, dict):
-        content = delta.get("content")
-        if isinstance(content, str):
-            return content
-        if isinstance(content, list):
-            parts: list[str] = []
-            for part in content:
-                if isinstance(part, str):
-                    parts.append(part)
-                    continue
-                if isinstance(part, dict):
-                    text = part.get("text") or part.get("content")
-                    if isinstance(text, str) and text:
-                        parts.append(text)
-            if parts:
-                return "\n".join(parts)
+def _walk_path(node: object, path: tuple[str, ...]) -> object:
+    for key in path:
+        if not isinstance(node, dict):
+            return None
+        node = node.get(key)
+    return node
+
+
+def _content_part_text(part: object) -> str | None:
+    if isinstance(part, str):
+        return part
+    if isinstance(part, dict):
+        text = part.get("text") or part.get("content")
+        if isinstance(text, str) and text:
+            return text
     return None
 
 
@@ -325,43 +462,30 @@ def _escape_control_chars_in_json_strings(text: str) -> str:
     Best-effort repair for JSON-ish output that contains raw control characters
     (e.g., newlines) inside quoted strings. JSON requires these to be escaped.
     """
-    out: list[str] = []
-    in_string = False
-    escaped = False
-    for ch in text:
-        if in_string:
-            if escaped:
-                escaped = False
-                out.append(ch)
-                continue
-            if ch == "\\":
-                escaped = True
-                out.append(ch)
-                continue
-            if ch == '"':
-                in_string = False
-                out.append(ch)
-                continue
-            if ch == "\n":
-                out.append("\\n")
-                continue
-            if ch == "\r":
-                out.append("\\r")
-                continue
-            if ch == "\t":
-                out.append("\\t")
-                continue
-            out.append(ch)
-            continue
+    if "\n" not in text and "\r" not in text and "\t" not in text:
+        return text
+    return _JSON_STRING_RE.sub(_escape_string_controls, text)
 
-        if ch == '"':
-            in_string = True
-        out.append(ch)
 
-    return "".join(out)
+def _escape_string_controls(match: re.Match[str]) -> str:
+    literal = match.group(0)
+    if "\n" not in literal and "\r" not in literal and "\t" not in literal:
+        return literal
+    # Escaped pairs (`\\x`) are kept verbatim, exactly like a backslash-aware scan would.
+    return _STRING_CONTROL_RE.sub(lambda m: m.group(1) or _CONTROL_ESCAPES[m.group(0)], literal)
 
 
 def _load_json_payload(content: str) -> dict:
+    # Well-formed output (the common case) only pays for the C parser; the pure-Python
+    # repair pipeline runs only when both the raw and unfenced content fail to parse.
+    for text in (content, _strip_code_fence(content)):
+        try:
+            parsed = orjson.loads(text)
+        except ValueError:
+            continue
+        if isinstance(parsed, dict):
+            return parsed
+
     try:
         repaired_obj = json_repair.loads(content, strict=False)
         if isinstance(repaired_obj, dict):
@@ -369,9 +493,8 @@ def _load_json_payload(content: str) -> dict:
     except Exception:
         pass
 
-    candidates = _json_candidates(content)
     last_err: json.JSONDecodeError | None = None
-    for candidate in candidates:
+    for candidate in _json_candidates(content):
         parsed, err = _json_loads_flexible(candidate)
         if parsed is not None:
             return parsed
@@ -384,8 +507,9 @@ def _load_json_payload(content: str) -> dict:
 
 def _json_loads_flexible(text: str) -> tuple[dict | None, json.JSONDecodeError | None]:
     try:
-        parsed = json.loads(text)
-    except json.JSONDecodeError as e:
+        parsed = orjson.loads(text)
+    except orjson.JSONDecodeError:
+        # orjson is strict; the stdlib parser still accepts raw control characters in strings.
         try:
             parsed = json.loads(text, strict=False)
         except json.JSONDecodeError as e2:
@@ -396,64 +520,54 @@ def _json_loads_flexible(text: str) -> tuple[dict | None, json.JSONDecodeError |
     return None, json.JSONDecodeError("Expected JSON object", text, 0)
 
 
-def _json_candidates(content: str) -> list[str]:
+def _json_candidates(content: str) -> Iterator[str]:
+    # Cheapest candidates first; each repair pass only runs if everything before it failed to parse.
     seen: set[str] = set()
-    candidates: list[str] = []
 
-    def add(text: str) -> None:
-        if not text:
-            return
-        if text in seen:
-            return
+    def fresh(text: str) -> bool:
+        if not text or text in seen:
+            return False
         seen.add(text)
-        candidates.append(text)
+        return True
 
-    add(content)
     cleaned = _strip_code_fence(content)
-    add(cleaned)
     extracted = _extract_json_object(cleaned)
-    add(extracted)
+    for text in (content, cleaned, extracted):
+        if fresh(text):
+            yield text
 
     escaped = _escape_control_chars_in_json_strings(cleaned)
-    add(escaped)
-    repaired = _repair_json_loose(cleaned)
-    add(repaired)
-    add(_escape_control_chars_in_json_strings(repaired))
-
-    repaired_extracted = _repair_json_loose(extracted)
-    add(repaired_extracted)
-    add(_escape_control_chars_in_json_strings(repaired_extracted))
-
-    return candidates
+    if fresh(escaped):
+        yield escaped
+    for base in (cleaned, extracted):
+        repaired = _repair_json_loose(base)
+        if fresh(repaired):
+            yield repaired
+        repaired_escaped = _escape_control_chars_in_json_strings(repaired)
+        if fresh(repaired_escaped):
+            yield repaired_escaped
 
 
 def _extract_json_object(text: str) -> str:
-    in_string = False
-    escaped = False
     depth = 0
-    start: int | None = None
-    for i, ch in enumerate(text):
-        if in_string:
-            if escaped:
-                escaped = False
-            elif ch == "\\":
-                escaped = True
-            elif ch == '"':
-                in_string = False
-            continue
-        if ch == '"':
-            in_string = True
-            continue
-        if ch == "{":
+    start = 0
+    for match in _BRACE_SCAN_RE.finditer(text):
+        token = match.group()
+        if token == "{":
             if depth == 0:
-                start = i
+                start = match.start()
+                # A well-formed object is located by the C decoder in one pass.
+                try:
+                    _obj, end = _JSON_OBJECT_DECODER.raw_decode(text, start)
+                except ValueError:
+                    pass
+                else:
+                    return text[start:end]
             depth += 1
-            continue
-        if ch == "}":
-            if depth > 0:
-                depth -= 1
-                if depth == 0 and start is not None:
-                    return text[start : i + 1]
+        elif token == "}" and depth > 0:
+            depth -= 1
+            if depth == 0:
+                return text[start : match.end()]
     return text
 
 
@@ -467,68 +581,18 @@ def _repair_json_loose(text: str) -> str:
 
 
 def _insert_missing_commas(text: str) -> str:
-    out: list[str] = []
-    in_string = False
-    escaped = False
-    last_sig = ""
-    saw_ws = False
-
-    def should_insert() -> bool:
-        if not saw_ws:
-            return False
-        return last_sig and last_sig not in "{[,:"
-
-    for ch in text:
-        if in_string:
-            out.append(ch)
-            if escaped:
-                escaped = False
-            elif ch == "\\":
-                escaped = True
-            elif ch == '"':
-                in_string = False
-                last_sig = '"'
-                saw_ws = False
-            continue
-
-        if ch.isspace():
-            out.append(ch)
-            saw_ws = True
-            continue
-
-        if ch == '"':
-            if should_insert():
-                out.append(",")
-            out.append(ch)
-            in_string = True
-            saw_ws = False
-            continue
-
-        if ch in "{[":
-            if should_insert():
-                out.append(",")
-            out.append(ch)
-            last_sig = ch
-            saw_ws = False
-            continue
-
-        if ch in "-0123456789tfn":
-            if should_insert():
-                out.append(",")
-            out.append(ch)
-            last_sig = ch
-            saw_ws = False
-            continue
+    return _MISSING_COMMA_RE.sub(_comma_after_value, text)
 
-        out.append(ch)
-        last_sig = ch
-        saw_ws = False
 
-    return "".join(out)
+def _comma_after_value(match: re.Match[str]) -> str:
+    gap = match.group("gap")
+    if gap is None:
+        return match.group(0)
+    return gap + ","
 
 
 def _remove_trailing_commas(text: str) -> str:
-    return re.sub(r",\s*([}\]])", r"\1", text)
+    return _TRAILING_COMMA_RE.sub(r"\1", text)
 
 
 def _balance_brackets(text: str) -> str:
@@ -1,7 +1,9 @@
+import json
 import tempfile
 import unittest
 from dataclasses import replace
 from pathlib import Path
+from unittest import mock
 
 from server.miscite.core.cache import Cache
 from server.miscite.core.config import Settings
@@ -16,8 +18,9 @@ class _StubResponse:
     def raise_for_status(self) -> None:
         return None
 
-    def json(self):  # type: ignore[no-untyped-def]
-        return self._payload
+    @property
+    def content(self) -> bytes:
+        return json.dumps(self._payload).encode("utf-8")
 
 
 class _StubSession:
@@ -62,6 +65,63 @@ class TestOpenRouterCacheDebug(unittest.TestCase):
             ns = (snap.get("namespaces") or {}).get("openrouter.chat_json") or {}
             self.assertEqual(ns.get("http_request"), 1)
 
+            out["ok"] = 2
+            again = client.chat_json(system="s", user="u")
+            self.assertEqual(again, {"ok": 1})
+            self.assertEqual(session.calls, 1)
+            ns = (cache.debug_snapshot().get("namespaces") or {}).get("openrouter.chat_json") or {}
+            self.assertEqual(ns.get("mem_get_hit"), 1)
+            self.assertIsNone(ns.get("json_get_hit"))
+
+    def test_non_json_body_is_retried_then_raises(self) -> None:
+        response = mock.Mock(content=b"<html>Bad gateway</html>")
+        session = mock.Mock()
+        session.post.return_value = response
+        client = OpenRouterClient(api_key="test-key", model="test/model")
+        client._session_local.session = session
+
+        with mock.patch("server.miscite.llm.openrouter.backoff_sleep"):
+            with self.assertRaisesRegex(RuntimeError, "failed after retries"):
+                client.chat_json(system="s", user="u")
+        self.assertEqual(session.post.call_count, 3)
+
+    def test_chat_json_batch_preserves_order(self) -> None:
+        class _EchoSession:
+            def post(self, *args, **kwargs):  # type: ignore[no-untyped-def]
+                user = kwargs["json"]["messages"][1]["content"]
+                return _StubResponse({"choices": [{"message": {"content": f'{{"user": "{user}"}}'}}]})
+
+        client = OpenRouterClient(api_key="test-key", model="test/model", max_parallel=4)
+        prompts = [("s", f"u{i}") for i in range(10)]
+        with mock.patch.object(client, "_client", return_value=_EchoSession()):
+            out = client.chat_json_batch(prompts)
+        self.assertEqual(out, [{"user": f"u{i}"} for i in range(10)])
+        self.assertEqual(client.chat_json_batch([]), [])
+
+    def test_chat_json_batch_reuses_pool_sessions_until_closed(self) -> None:
+        def _session() -> mock.MagicMock:
+            session = mock.MagicMock()
+            session.post.return_value = _StubResponse({"choices": [{"message": {"content": '{"ok": true}'}}]})
+            return session
+
+        client = OpenRouterClient(api_key="test-key", model="test/model", max_parallel=2)
+        prompts = [("s", f"u{i}") for i in range(6)]
+        with mock.patch("server.miscite.llm.openrouter.requests.Session", side_effect=_session):
+            client.chat_json_batch(prompts)
+            client.chat_json_batch(prompts)
+            executor = client._executor
+            self.assertIsNotNone(executor)
+            # Two pool threads, one session each, kept across both batches.
+            self.assertLessEqual(len(client._sessions), 2)
+            sessions = list(client._sessions)
+
+            client.close()
+
+        self.assertIsNone(client._executor)
+        self.assertEqual(client._sessions, [])
+        for session in sessions:
+            session.close.assert_called_once()
+
 
 if __name__ == "__main__":
     unittest.main()
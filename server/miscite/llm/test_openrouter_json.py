@@ -0,0 +1,52 @@
+import unittest
+
+from server.miscite.llm import openrouter
+
+
+class TestOpenRouterJsonRepair(unittest.TestCase):
+    def test_escape_control_chars_only_inside_strings(self) -> None:
+        text = '{\n\t"a": "line one\nline\ttwo",\r\n "b": "kept \\\n raw"}'
+        self.assertEqual(
+            openrouter._escape_control_chars_in_json_strings(text),
+            '{\n\t"a": "line one\\nline\\ttwo",\r\n "b": "kept \\\n raw"}',
+        )
+        self.assertEqual(openrouter._escape_control_chars_in_json_strings('"open\nend'), '"open\\nend')
+
+    def test_insert_missing_commas_between_values(self) -> None:
+        self.assertEqual(
+            openrouter._insert_missing_commas('{"a": 1 "b": [true false] "c": "x y"}'),
+            '{"a": 1 ,"b": [true ,false] ,"c": "x y"}',
+        )
+        self.assertEqual(openrouter._insert_missing_commas('{ "a": [ 1, 2 ] }'), '{ "a": [ 1, 2 ] }')
+        self.assertEqual(openrouter._insert_missing_commas('"s" "t'), '"s" ,"t')
+
+    def test_extract_json_object_skips_braces_in_strings(self) -> None:
+        self.assertEqual(
+            openrouter._extract_json_object('Result: {"a": "}{", "b": {"c": 1}} trailing }'),
+            '{"a": "}{", "b": {"c": 1}}',
+        )
+        self.assertEqual(openrouter._extract_json_object('x {"a": 1 "b": {"c": 2}} y'), '{"a": 1 "b": {"c": 2}}')
+        self.assertEqual(openrouter._extract_json_object('{"a": "open'), '{"a": "open')
+
+    def test_extract_message_content_shapes(self) -> None:
+        extract = openrouter._extract_message_content
+        self.assertEqual(extract({"choices": [{"message": {"content": "{}"}}]}), "{}")
+        self.assertEqual(extract({"choices": [{"message": "plain"}]}), "plain")
+        self.assertEqual(extract({"choices": [{"message": {"content": {"text": "t"}}}]}), "t")
+        self.assertEqual(extract({"choices": [{"message": {"content": None, "output_text": "o"}}]}), "o")
+        self.assertEqual(extract({"choices": [{"text": "legacy"}]}), "legacy")
+        self.assertEqual(
+            extract({"choices": [{"message": {"content": ["a", {"type": "text", "text": "b"}, {"x": 1}]}}]}),
+            "a\nb",
+        )
+        self.assertEqual(extract({"choices": [{"delta": {"content": [{"content": "d"}]}}]}), "d")
+        self.assertIsNone(extract({"choices": []}))
+        self.assertIsNone(extract({"error": {"message": "boom"}}))
+
+    def test_load_json_payload_repairs_loose_output(self) -> None:
+        content = '```json\n{"a": "x\ny" "b": [1 2],}\n```'
+        self.assertEqual(openrouter._load_json_payload(content), {"a": "x\ny", "b": [1, 2]})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import mmap
+import os
 from functools import lru_cache
 from pathlib import Path
 from string import Template
@@ -13,16 +15,26 @@ def get_prompt(name: str) -> str:
     path = _PROMPTS_DIR / filename
     if not path.exists():
         raise FileNotFoundError(f"Prompt file not found: {path}")
-    return path.read_text(encoding="utf-8")
+    with path.open("rb") as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            return ""
+        # Decode straight from the page-cache mapping; lru_cache keeps the resulting str.
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return str(mapped[:], "utf-8")
+
+
+@lru_cache(maxsize=None)
+def _get_template(name: str) -> Template:
+    return Template(get_prompt(name))
 
 
 def render_prompt(name: str, **values: object) -> str:
     raw = get_prompt(name)
-    if not values:
+    if not values or "$" not in raw:
         return raw
     normalized = {key: "" if value is None else str(value) for key, value in values.items()}
     try:
-        return Template(raw).substitute(normalized)
+        return _get_template(name).substitute(normalized)
     except KeyError as exc:
         missing = exc.args[0]
         raise KeyError(f"Missing prompt variable '{missing}' for prompt '{name}'.") from exc
@@ -1,16 +1,21 @@
 from __future__ import annotations
 
 import datetime as dt
+import hmac
+import logging
 import re
 import secrets
+import time
+from collections.abc import Mapping
+from types import MappingProxyType
 
-from fastapi import APIRouter, Depends, Form, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, Form, Request
 from fastapi.responses import RedirectResponse
-from sqlalchemy import delete, select
+from sqlalchemy import delete, exists, select
 from sqlalchemy.orm import Session
 
 from server.miscite.core.config import Settings
-from server.miscite.core.db import db_session
+from server.miscite.core.db import db_session, dialect_insert
 from server.miscite.core.email import send_login_code_email
 from server.miscite.core.models import LoginCode, User
 from server.miscite.core.rate_limit import enforce_rate_limit
@@ -21,25 +26,32 @@ from server.miscite.core.security import (
     delete_session,
     get_session_cookie,
     hash_login_code,
-    hash_password,
     require_csrf,
     require_user,
     set_csrf_cookie,
     set_session_cookie,
+    unusable_password_hash,
 )
 from server.miscite.core.turnstile import verify_turnstile
 from server.miscite.web import template_context, templates
 
 router = APIRouter()
+log = logging.getLogger(__name__)
 
 
-_SESSION_CHOICES = {
-    "session": {"label": "This session", "days": None},
-    "7": {"label": "7 days", "days": 7},
-    "30": {"label": "30 days", "days": 30},
-}
+_SESSION_CHOICES: Mapping[str, tuple[str, int | None]] = MappingProxyType(
+    {
+        "session": ("This session", None),
+        "7": ("7 days", 7),
+        "30": ("30 days", 30),
+    }
+)
 
+_SECONDS_PER_DAY = 86_400
+_LOGIN_EMAIL_ATTEMPTS = 3
 _EMAIL_RE = re.compile(r"^[^\s@]+@[^\s@]+\.[^\s@]+$")
+_BYTE_TO_DIGIT = bytes(ord("0") + value % 10 for value in range(256))
+_BIASED_BYTES = bytes(range(250, 256))
 
 
 def _normalize_email(value: str) -> str:
@@ -52,59 +64,103 @@ def _is_valid_email(value: str) -> bool:
 
 def _session_choice(raw: str | None, settings: Settings) -> tuple[str, int, bool]:
     key = (raw or "").strip().lower()
-    if key not in _SESSION_CHOICES:
-        key = "session"
-    days = _SESSION_CHOICES[key]["days"]
+    choice = _SESSION_CHOICES.get(key)
+    if choice is None:
+        key, choice = "session", _SESSION_CHOICES["session"]
+    _label, days = choice
     if days is None:
         return key, settings.session_days, False
-    return key, int(days), True
+    return key, days, True
 
 
 def _generate_login_code(length: int) -> str:
-    value = secrets.randbelow(10**length)
-    return str(value).zfill(length)
-
-
-def _mailgun_ready(settings: Settings) -> bool:
-    return bool(settings.mailgun_api_key and settings.mailgun_domain and settings.mailgun_sender)
-
-
-def _turnstile_ready(settings: Settings) -> bool:
-    return bool(settings.turnstile_site_key and settings.turnstile_secret_key)
+    digits = b""
+    while len(digits) < length:
+        # Drop bytes 250-255 so `byte % 10` stays uniform, then map the rest straight to ASCII digits.
+        digits += secrets.token_bytes(length + 2).translate(_BYTE_TO_DIGIT, _BIASED_BYTES)
+    return digits[:length].decode("ascii")
+
+
+def _send_login_code(settings: Settings, *, to_email: str, code: str) -> None:
+    # Runs after the response is sent, so a failed send can only be retried and logged;
+    # the user can still ask for a new code from the verify step.
+    for attempt in range(1, _LOGIN_EMAIL_ATTEMPTS + 1):
+        try:
+            send_login_code_email(settings, to_email=to_email, code=code)
+            return
+        except Exception as e:
+            if attempt == _LOGIN_EMAIL_ATTEMPTS:
+                log.warning("Failed to send login code email after %d attempts: %s", attempt, e)
+                return
+            time.sleep(attempt)
 
 
 def _client_ip(request: Request, settings: Settings) -> str | None:
     if settings.trust_proxy:
-        forwarded = request.headers.get("x-forwarded-for", "")
-        if forwarded:
-            return forwarded.split(",")[0].strip()
+        first_hop = request.headers.get("x-forwarded-for", "").partition(",")[0].strip()
+        if first_hop:
+            return first_hop
     client = request.client
     return client.host if client else None
 
 
-@router.get("/login")
-def login_page(request: Request, email: str | None = None, session_length: str | None = None):
-    settings: Settings = request.app.state.settings
-    session_choice, _, _ = _session_choice(session_length, settings)
+def _issue_session(
+    db: Session,
+    settings: Settings,
+    *,
+    user: User,
+    session_days: int,
+    persistent: bool,
+) -> RedirectResponse:
+    token, csrf = create_session(db, user=user, session_days=session_days)
+    response = RedirectResponse("/dashboard", status_code=303)
+    # Non-persistent choices get browser-session cookies (no Max-Age).
+    max_age_seconds = session_days * _SECONDS_PER_DAY if persistent else None
+    set_session_cookie(response, token=token, settings=settings, max_age_seconds=max_age_seconds)
+    set_csrf_cookie(response, token=csrf, settings=settings, max_age_seconds=max_age_seconds)
+    return response
+
+
+def _login_response(
+    request: Request,
+    settings: Settings,
+    *,
+    email: str,
+    session_choice: str,
+    step: str = "request",
+    code_sent: bool = False,
+    flash: dict[str, str] | None = None,
+    status_code: int = 200,
+):
     return templates.TemplateResponse(
         "login.html",
         template_context(
             request,
             title="Sign in",
-            login_email=email or "",
+            login_email=email,
             session_choice=session_choice,
-            login_step="request",
-            code_sent=False,
+            login_step=step,
+            code_sent=code_sent,
             login_code_length=settings.login_code_length,
             login_code_ttl_minutes=settings.login_code_ttl_minutes,
             turnstile_site_key=settings.turnstile_site_key,
+            flash=flash,
         ),
+        status_code=status_code,
     )
 
 
+@router.get("/login")
+def login_page(request: Request, email: str | None = None, session_length: str | None = None):
+    settings: Settings = request.app.state.settings
+    session_choice, _, _ = _session_choice(session_length, settings)
+    return _login_response(request, settings, email=email or "", session_choice=session_choice)
+
+
 @router.post("/login/request")
 def login_request(
     request: Request,
+    background_tasks: BackgroundTasks,
     email: str = Form(...),
     session_length: str = Form("session"),
     turnstile_response: str = Form("", alias="cf-turnstile-response"),
@@ -117,42 +173,27 @@ def login_request(
         key="login_request",
         limit=settings.rate_limit_login_request,
         window_seconds=settings.rate_limit_window_seconds,
+        sliding_window=True,
     )
     normalized_email = _normalize_email(email)
     session_choice, _, _ = _session_choice(session_length, settings)
     if not _is_valid_email(normalized_email):
-        return templates.TemplateResponse(
-            "login.html",
-            template_context(
-                request,
-                title="Sign in",
-                login_email="",
-                session_choice=session_choice,
-                login_step="request",
-                code_sent=False,
-                login_code_length=settings.login_code_length,
-                login_code_ttl_minutes=settings.login_code_ttl_minutes,
-                turnstile_site_key=settings.turnstile_site_key,
-                flash={"level": "red", "message": "Enter a valid email address."},
-            ),
+        return _login_response(
+            request,
+            settings,
+            email="",
+            session_choice=session_choice,
+            flash={"level": "red", "message": "Enter a valid email address."},
             status_code=400,
         )
 
-    if not _turnstile_ready(settings):
-        return templates.TemplateResponse(
-            "login.html",
-            template_context(
-                request,
-                title="Sign in",
-                login_email=normalized_email,
-                session_choice=session_choice,
-                login_step="request",
-                code_sent=False,
-                login_code_length=settings.login_code_length,
-                login_code_ttl_minutes=settings.login_code_ttl_minutes,
-                turnstile_site_key=settings.turnstile_site_key,
-                flash={"level": "red", "message": "Turnstile is not configured. Contact support."},
-            ),
+    if not settings.turnstile_ready:
+        return _login_response(
+            request,
+            settings,
+            email=normalized_email,
+            session_choice=session_choice,
+            flash={"level": "red", "message": "Turnstile is not configured. Contact support."},
             status_code=503,
         )
 
@@ -162,90 +203,56 @@ def login_request(
         remote_ip=_client_ip(request, settings),
     )
     if not ok:
-        return templates.TemplateResponse(
-            "login.html",
-            template_context(
-                request,
-                title="Sign in",
-                login_email=normalized_email,
-                session_choice=session_choice,
-                login_step="request",
-                code_sent=False,
-                login_code_length=settings.login_code_length,
-                login_code_ttl_minutes=settings.login_code_ttl_minutes,
-                turnstile_site_key=settings.turnstile_site_key,
-                flash={"level": "red", "message": error or "Turnstile verification failed."},
-            ),
+        return _login_response(
+            request,
+            settings,
+            email=normalized_email,
+            session_choice=session_choice,
+            flash={"level": "red", "message": error or "Turnstile verification failed."},
             status_code=403,
         )
 
-    if not _mailgun_ready(settings):
-        return templates.TemplateResponse(
-            "login.html",
-            template_context(
-                request,
-                title="Sign in",
-                login_email=normalized_email,
-                session_choice=session_choice,
-                login_step="request",
-                code_sent=False,
-                login_code_length=settings.login_code_length,
-                login_code_ttl_minutes=settings.login_code_ttl_minutes,
-                turnstile_site_key=settings.turnstile_site_key,
-                flash={"level": "red", "message": "Email delivery is not configured. Contact support."},
-            ),
+    if not settings.mailgun_ready:
+        return _login_response(
+            request,
+            settings,
+            email=normalized_email,
+            session_choice=session_choice,
+            flash={"level": "red", "message": "Email delivery is not configured. Contact support."},
             status_code=503,
         )
 
     now = dt.datetime.now(dt.UTC)
-    db.execute(delete(LoginCode).where(LoginCode.expires_at < now))
-    db.execute(delete(LoginCode).where(LoginCode.email == normalized_email))
-
     code = _generate_login_code(settings.login_code_length)
-    db.add(
-        LoginCode(
-            email=normalized_email,
-            code_hash=hash_login_code(code),
-            created_at=now,
-            expires_at=now + dt.timedelta(minutes=settings.login_code_ttl_minutes),
-        )
+    # Replaces any outstanding code for this address in one statement; expired codes are swept by the worker.
+    upsert = dialect_insert(db, LoginCode).values(
+        email=normalized_email,
+        code_hash=hash_login_code(code),
+        created_at=now,
+        expires_at=now + dt.timedelta(minutes=settings.login_code_ttl_minutes),
     )
-    try:
-        send_login_code_email(settings, to_email=normalized_email, code=code)
-    except Exception:
-        db.rollback()
-        return templates.TemplateResponse(
-            "login.html",
-            template_context(
-                request,
-                title="Sign in",
-                login_email=normalized_email,
-                session_choice=session_choice,
-                login_step="request",
-                code_sent=False,
-                login_code_length=settings.login_code_length,
-                login_code_ttl_minutes=settings.login_code_ttl_minutes,
-                turnstile_site_key=settings.turnstile_site_key,
-                flash={"level": "red", "message": "We could not send your code. Please try again."},
-            ),
-            status_code=502,
+    db.execute(
+        upsert.on_conflict_do_update(
+            index_elements=[LoginCode.email],
+            set_={
+                "code_hash": upsert.excluded.code_hash,
+                "created_at": upsert.excluded.created_at,
+                "expires_at": upsert.excluded.expires_at,
+            },
         )
+    )
+    # Commit before responding so the code verifies immediately; Mailgun is called after the response is sent.
     db.commit()
+    background_tasks.add_task(_send_login_code, settings, to_email=normalized_email, code=code)
 
-    return templates.TemplateResponse(
-        "login.html",
-        template_context(
-            request,
-            title="Sign in",
-            login_email=normalized_email,
-            session_choice=session_choice,
-            login_step="verify",
-            code_sent=True,
-            login_code_length=settings.login_code_length,
-            login_code_ttl_minutes=settings.login_code_ttl_minutes,
-            turnstile_site_key=settings.turnstile_site_key,
-            flash={"level": "green", "message": "Check your inbox for your sign-in code."},
-        ),
+    return _login_response(
+        request,
+        settings,
+        email=normalized_email,
+        session_choice=session_choice,
+        step="verify",
+        code_sent=True,
+        flash={"level": "green", "message": "Check your inbox for your sign-in code."},
     )
 
 
@@ -264,104 +271,70 @@ def login_verify(
         key="login_verify",
         limit=settings.rate_limit_login_verify,
         window_seconds=settings.rate_limit_window_seconds,
+        sliding_window=True,
     )
     normalized_email = _normalize_email(email)
     code_value = "".join(code.split())
     session_choice, session_days, persistent = _session_choice(session_length, settings)
     if not _is_valid_email(normalized_email):
-        return templates.TemplateResponse(
-            "login.html",
-            template_context(
-                request,
-                title="Sign in",
-                login_email=normalized_email,
-                session_choice=session_choice,
-                login_step="request",
-                code_sent=False,
-                login_code_length=settings.login_code_length,
-                login_code_ttl_minutes=settings.login_code_ttl_minutes,
-                turnstile_site_key=settings.turnstile_site_key,
-                flash={"level": "red", "message": "Enter a valid email address."},
-            ),
+        return _login_response(
+            request,
+            settings,
+            email=normalized_email,
+            session_choice=session_choice,
+            flash={"level": "red", "message": "Enter a valid email address."},
             status_code=400,
         )
     if not code_value:
-        return templates.TemplateResponse(
-            "login.html",
-            template_context(
-                request,
-                title="Sign in",
-                login_email=normalized_email,
-                session_choice=session_choice,
-                login_step="verify",
-                code_sent=False,
-                login_code_length=settings.login_code_length,
-                login_code_ttl_minutes=settings.login_code_ttl_minutes,
-                turnstile_site_key=settings.turnstile_site_key,
-                flash={"level": "red", "message": "Enter your sign-in code."},
-            ),
+        return _login_response(
+            request,
+            settings,
+            email=normalized_email,
+            session_choice=session_choice,
+            step="verify",
+            flash={"level": "red", "message": "Enter your sign-in code."},
             status_code=400,
         )
 
     now = dt.datetime.now(dt.UTC)
-    db.execute(delete(LoginCode).where(LoginCode.expires_at < now))
     login_code = db.scalar(
-        select(LoginCode)
-        .where(LoginCode.email == normalized_email)
-        .where(LoginCode.expires_at > now)
-        .order_by(LoginCode.created_at.desc())
+        select(LoginCode).where(LoginCode.email == normalized_email, LoginCode.expires_at > now)
     )
-    if not login_code or hash_login_code(code_value) != login_code.code_hash:
-        return templates.TemplateResponse(
-            "login.html",
-            template_context(
-                request,
-                title="Sign in",
-                login_email=normalized_email,
-                session_choice=session_choice,
-                login_step="verify",
-                code_sent=False,
-                login_code_length=settings.login_code_length,
-                login_code_ttl_minutes=settings.login_code_ttl_minutes,
-                turnstile_site_key=settings.turnstile_site_key,
-                flash={"level": "red", "message": "Invalid or expired code."},
-            ),
+    if not login_code or not hmac.compare_digest(hash_login_code(code_value), login_code.code_hash):
+        return _login_response(
+            request,
+            settings,
+            email=normalized_email,
+            session_choice=session_choice,
+            step="verify",
+            flash={"level": "red", "message": "Invalid or expired code."},
             status_code=401,
         )
 
     if settings.maintenance_mode:
-        existing = db.scalar(select(User).where(User.email == normalized_email))
-        if existing is None:
-            return templates.TemplateResponse(
-                "login.html",
-                template_context(
-                    request,
-                    title="Sign in",
-                    login_email=normalized_email,
-                    session_choice=session_choice,
-                    login_step="verify",
-                    code_sent=False,
-                    login_code_length=settings.login_code_length,
-                    login_code_ttl_minutes=settings.login_code_ttl_minutes,
-                    turnstile_site_key=settings.turnstile_site_key,
-                    flash={"level": "amber", "message": settings.maintenance_message},
-                ),
+        if not db.scalar(select(exists().where(User.email == normalized_email))):
+            return _login_response(
+                request,
+                settings,
+                email=normalized_email,
+                session_choice=session_choice,
+                step="verify",
+                flash={"level": "amber", "message": settings.maintenance_message},
                 status_code=503,
             )
 
     db.execute(delete(LoginCode).where(LoginCode.email == normalized_email))
-    user = db.scalar(select(User).where(User.email == normalized_email))
-    if user is None:
-        user = User(email=normalized_email, password_hash=hash_password(secrets.token_urlsafe(16)))
-        db.add(user)
-        db.flush()
+    # Get-or-create in one race-free statement: the no-op update makes RETURNING yield the existing row.
+    upsert = dialect_insert(db, User).values(email=normalized_email, password_hash=unusable_password_hash())
+    user = db.scalar(
+        upsert.on_conflict_do_update(
+            index_elements=[User.email],
+            set_={"email": upsert.excluded.email},
+        ).returning(User),
+        execution_options={"populate_existing": True},
+    )
 
-    token, csrf = create_session(db, user=user, session_days=session_days)
-    response = RedirectResponse("/dashboard", status_code=303)
-    max_age_seconds = int(dt.timedelta(days=session_days).total_seconds()) if persistent else None
-    set_session_cookie(response, token=token, settings=settings, max_age_seconds=max_age_seconds)
-    set_csrf_cookie(response, token=csrf, settings=settings, max_age_seconds=max_age_seconds)
-    return response
+    return _issue_session(db, settings, user=user, session_days=session_days, persistent=persistent)
 
 
 @router.get("/register")
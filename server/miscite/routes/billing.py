@@ -2,63 +2,63 @@ from __future__ import annotations
 
 import datetime as dt
 import logging
+import re
 from decimal import Decimal, ROUND_HALF_UP
+from functools import lru_cache, partial
 
-import stripe
-from fastapi import APIRouter, Depends, Form, HTTPException, Request
+import orjson
+from anyio import to_thread
+from fastapi import APIRouter, BackgroundTasks, Depends, Form, HTTPException, Request
 from fastapi.responses import RedirectResponse
-from sqlalchemy import desc, select
+from sqlalchemy import Row, desc, literal, or_, select
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
-
-from server.miscite.billing.ledger import credit_balance, get_or_create_account
-from server.miscite.billing.stripe import auto_charge_payment_method_available, create_topup_checkout, ensure_customer
-from server.miscite.core.cache import Cache
+from sqlalchemy.orm import Session, load_only
+
+from server.miscite.billing.ledger import credit_balance, get_or_create_account, upsert_account
+from server.miscite.billing.stripe import (
+    auto_charge_payment_method_available,
+    create_topup_checkout,
+    ensure_customer,
+    stripe_sdk,
+)
 from server.miscite.core.config import Settings
 from server.miscite.core.db import db_session
 from server.miscite.core.email import send_billing_receipt_email
 from server.miscite.core.models import BillingAccount, BillingTransaction, User
 from server.miscite.core.rate_limit import enforce_rate_limit
 from server.miscite.core.security import require_csrf, require_user
-from server.miscite.web import template_context, templates
+from server.miscite.web import format_currency, template_context, templates
 
 router = APIRouter()
 log = logging.getLogger(__name__)
 
 
-def _success_message(raw: str | None) -> tuple[str | None, str | None]:
-    key = (raw or "").strip().lower()
-    if not key:
-        return None, None
-    if key in {"auto_charge_enabled", "auto-charge-enabled"}:
-        return "Auto-charge enabled.", "auto_charge"
-    if key in {"auto_charge_disabled", "auto-charge-disabled"}:
-        return "Auto-charge turned off.", "auto_charge"
-    if key in {"auto_charge_saved_off", "auto-charge-saved-off"}:
-        return "Saved auto-charge settings (auto-charge is off).", "auto_charge"
-    if key in {"auto_charge_saved", "auto-charge-saved"}:
-        return "Saved auto-charge settings.", "auto_charge"
-    return None, None
-
+# Stripe events are a few KB; the cap leaves room for large metadata while bounding hostile bodies.
+_WEBHOOK_MAX_BODY_BYTES = 256 * 1024
+_HANDLED_WEBHOOK_EVENTS = frozenset(
+    {"checkout.session.completed", "payment_intent.succeeded", "payment_intent.payment_failed"}
+)
+_LOCAL_DEV_HOSTS = frozenset({"localhost", "127.0.0.1"})
+_PLAIN_AMOUNT_RE = re.compile(r"([0-9]*)(?:\.([0-9]*))?(?<=[0-9])\Z")
+_SUCCESS_MESSAGES: dict[str, tuple[str, str]] = {
+    "auto_charge_enabled": ("Auto-charge enabled.", "auto_charge"),
+    "auto_charge_disabled": ("Auto-charge turned off.", "auto_charge"),
+    "auto_charge_saved_off": ("Saved auto-charge settings (auto-charge is off).", "auto_charge"),
+    "auto_charge_saved": ("Saved auto-charge settings.", "auto_charge"),
+}
 
-def _format_currency(cents: int) -> str:
-    sign = "-" if cents < 0 else ""
-    value = abs(int(cents)) / 100.0
-    return f"{sign}${value:.2f}"
 
-
-def _format_amount(cents: int) -> str:
-    sign = "-" if cents < 0 else "+"
-    value = abs(int(cents)) / 100.0
-    return f"{sign}${value:.2f}"
+def _success_message(raw: str | None) -> tuple[str | None, str | None]:
+    # Keys are accepted with either "_" or "-" separators.
+    key = (raw or "").strip().lower().replace("-", "_")
+    return _SUCCESS_MESSAGES.get(key, (None, None))
 
 
-def _human_datetime(ts: dt.datetime | None) -> str:
-    if ts is None:
-        return ""
-    if ts.tzinfo is None:
-        ts = ts.replace(tzinfo=dt.UTC)
-    return f"{ts.strftime('%b')} {ts.day}, {ts.year} at {ts.strftime('%H:%M')} UTC"
+@lru_cache(maxsize=64)
+def _is_local_dev_host(hostname: str | None) -> bool:
+    # A deployment sees a handful of Host values, so the classification is computed once per host.
+    hostname = (hostname or "").strip().lower()
+    return hostname in _LOCAL_DEV_HOSTS or hostname.endswith(".local")
 
 
 def _event_created_at(payload: dict) -> dt.datetime | None:
@@ -92,19 +92,30 @@ def _receipt_url_from_intent(intent: object) -> str | None:
     return _receipt_url_from_charge(charge)
 
 
-def _retrieve_payment_intent_with_receipt(payment_intent_id: str) -> object | None:
+def _retrieve_payment_intent_with_receipt(settings: Settings, payment_intent_id: str | None) -> object | None:
     if not payment_intent_id:
         return None
     try:
-        return stripe.PaymentIntent.retrieve(payment_intent_id, expand=["charges.data"])
+        return stripe_sdk(settings).PaymentIntent.retrieve(payment_intent_id, expand=["charges.data"])
     except Exception:
         return None
 
 
 def _parse_amount_to_cents(raw: str) -> tuple[int | None, str | None]:
-    value = (raw or "").strip().replace("$", "")
+    # Strip after dropping "$" so "$ 12.50" still takes the integer fast path below.
+    value = (raw or "").replace("$", "").strip()
     if not value:
         return None, "Enter a top-up amount."
+    match = _PLAIN_AMOUNT_RE.match(value)
+    if match:
+        # Plain "12", "12.3", ".5": integer cents with the same half-up rounding as the Decimal path.
+        whole, frac = match.group(1), match.group(2) or ""
+        cents = int(whole or "0") * 100 + int(frac[:2].ljust(2, "0"))
+        if len(frac) > 2 and frac[2] >= "5":
+            cents += 1
+        if cents <= 0:
+            return None, "Amount must be greater than zero."
+        return cents, None
     try:
         dec = Decimal(value)
     except Exception:
@@ -117,25 +128,120 @@ def _parse_amount_to_cents(raw: str) -> tuple[int | None, str | None]:
     return cents, None
 
 
-def _load_billing_context(
+def _billing_account(request: Request, db: Session, *, user: User, settings: Settings) -> BillingAccount | None:
+    # Memoized on the request so error re-renders and Stripe helpers reuse the row already loaded.
+    account = getattr(request.state, "billing_account", None)
+    if account is None:
+        account = db.scalar(select(BillingAccount).where(BillingAccount.user_id == user.id))
+        if account is None and settings.billing_enabled:
+            account = get_or_create_account(db, user_id=user.id, currency=settings.billing_currency)
+        request.state.billing_account = account
+    return account
+
+
+def _payment_method_available(request: Request, *, settings: Settings, customer_id: str) -> bool:
+    # Memoized per request on top of the shared cache, so one request makes at most one Stripe lookup per customer.
+    checked = getattr(request.state, "payment_method_available", None)
+    if checked is None:
+        checked = request.state.payment_method_available = {}
+    if customer_id not in checked:
+        checked[customer_id] = auto_charge_payment_method_available(
+            settings=settings,
+            customer_id=customer_id,
+            cache=request.app.state.billing_cache,
+        )
+    return checked[customer_id]
+
+
+# What the billing page reads; anything else (in-flight auto-charge bookkeeping) loads on access.
+_CONTEXT_ACCOUNT_COLUMNS = load_only(
+    BillingAccount.user_id,
+    BillingAccount.stripe_customer_id,
+    BillingAccount.balance_cents,
+    BillingAccount.currency,
+    BillingAccount.auto_charge_enabled,
+    BillingAccount.auto_charge_threshold_cents,
+    BillingAccount.auto_charge_amount_cents,
+    BillingAccount.auto_charge_last_error,
+)
+
+
+def _recent_transactions_query(user_id: str, *, limit: int):
+    # Only the columns the activity table renders: plain rows skip ORM identity-map bookkeeping.
+    return (
+        select(
+            BillingTransaction.user_id,
+            BillingTransaction.kind,
+            BillingTransaction.amount_cents,
+            BillingTransaction.balance_after_cents,
+            BillingTransaction.created_at,
+        )
+        .where(BillingTransaction.user_id == user_id)
+        .order_by(desc(BillingTransaction.created_at))
+        .limit(limit)
+    )
+
+
+def _billing_account_and_transactions(
     request: Request,
+    db: Session,
     *,
     user: User,
-    db: Session,
     settings: Settings,
-    error: str | None = None,
-    success: str | None = None,
-) -> dict:
-    hostname = (request.url.hostname or "").strip().lower()
-    is_local_dev = hostname in {"localhost", "127.0.0.1"} or hostname.endswith(".local")
+    limit: int = 10,
+) -> tuple[BillingAccount | None, list[Row]]:
+    if not settings.billing_enabled:
+        # The page hides recent activity while billing is off; only the balance header is shown.
+        return _billing_account(request, db, user=user, settings=settings), []
+    if getattr(request.state, "billing_account", None) is not None:
+        account = _billing_account(request, db, user=user, settings=settings)
+        return account, list(db.execute(_recent_transactions_query(user.id, limit=limit)))
+
+    # One round trip: the account LEFT JOINed to its latest transactions (one row per transaction).
+    recent = _recent_transactions_query(user.id, limit=limit).subquery()
+    rows = db.execute(
+        select(BillingAccount, recent.c.kind, recent.c.amount_cents, recent.c.balance_after_cents, recent.c.created_at)
+        .options(_CONTEXT_ACCOUNT_COLUMNS)
+        .outerjoin(recent, recent.c.user_id == BillingAccount.user_id)
+        .where(BillingAccount.user_id == user.id)
+        .order_by(desc(recent.c.created_at))
+    ).all()
+    if rows:
+        account = rows[0][0]
+        request.state.billing_account = account
+        # kind is NOT NULL, so a NULL marks the outer join's "no transactions" row.
+        return account, [row for row in rows if row.kind is not None]
+    # Transactions are only written through an account, so a missing account means no history. The
+    # join already showed there is no row, so create it with one upsert rather than select-then-insert.
+    account = upsert_account(db, user_id=user.id, currency=settings.billing_currency)
+    request.state.billing_account = account
+    return account, []
+
+
+def _billing_settings_context(request: Request, *, settings: Settings) -> dict:
+    # Derived from Settings alone, which is fixed for the life of the app, so it's built once and shared.
+    context = getattr(request.app.state, "billing_settings_context", None)
+    if context is None:
+        stripe_configured = bool(settings.stripe_secret_key)
+        stripe_webhook_configured = bool(settings.stripe_webhook_secret)
+        context = {
+            "billing_enabled": settings.billing_enabled,
+            "min_charge_cents": settings.billing_min_charge_cents,
+            "min_charge_display": format_currency(settings.billing_min_charge_cents),
+            "can_open_portal": stripe_configured,
+            "stripe_configured": stripe_configured,
+            "stripe_webhook_configured": stripe_webhook_configured,
+            "stripe_ready": stripe_configured and stripe_webhook_configured,
+        }
+        request.app.state.billing_settings_context = context
+    return context
+
 
-    stripe_configured = bool(settings.stripe_secret_key)
-    stripe_webhook_configured = bool(settings.stripe_webhook_secret)
-    stripe_ready = stripe_configured and stripe_webhook_configured
+def _build_billing_context(request: Request, *, user: User, db: Session, settings: Settings) -> dict:
+    is_local_dev = _is_local_dev_host(request.url.hostname)
+    settings_context = _billing_settings_context(request, settings=settings)
 
-    account = db.scalar(select(BillingAccount).where(BillingAccount.user_id == user.id))
-    if account is None and settings.billing_enabled:
-        account = get_or_create_account(db, user_id=user.id, currency=settings.billing_currency)
+    account, transactions = _billing_account_and_transactions(request, db, user=user, settings=settings)
 
     balance_cents = account.balance_cents if account else 0
     currency = account.currency if account else settings.billing_currency
@@ -150,64 +256,67 @@ def _load_billing_context(
 
     billing_profile_ready = bool(account and account.stripe_customer_id)
     has_payment_method = False
-    if settings.billing_enabled and stripe_configured and billing_profile_ready and account and account.stripe_customer_id:
-        has_payment_method = auto_charge_payment_method_available(
+    if settings.billing_enabled and settings_context["stripe_configured"] and billing_profile_ready and account and account.stripe_customer_id:
+        has_payment_method = _payment_method_available(
+            request,
             settings=settings,
             customer_id=account.stripe_customer_id,
-            cache=Cache(settings=settings),
         )
 
-    transactions = (
-        db.execute(
-            select(BillingTransaction)
-            .where(BillingTransaction.user_id == user.id)
-            .order_by(desc(BillingTransaction.created_at))
-            .limit(10)
-        )
-        .scalars()
-        .all()
-    )
-    transactions_payload = [
-        {
-            "kind": txn.kind,
-            "amount_cents": txn.amount_cents,
-            "amount_display": _format_amount(txn.amount_cents),
-            "balance_after_cents": txn.balance_after_cents,
-            "balance_after_display": _format_currency(txn.balance_after_cents),
-            "created_at": txn.created_at.isoformat(),
-            "created_at_human": _human_datetime(txn.created_at),
-        }
-        for txn in transactions
-    ]
-
     return {
-        "billing_enabled": settings.billing_enabled,
+        **settings_context,
         "balance_cents": balance_cents,
-        "balance_display": _format_currency(balance_cents),
+        "balance_display": format_currency(balance_cents),
         "currency": currency,
-        "min_charge_cents": settings.billing_min_charge_cents,
-        "min_charge_display": _format_currency(settings.billing_min_charge_cents),
         "auto_charge_enabled": auto_charge_enabled,
         "auto_charge_threshold_cents": auto_charge_threshold_cents,
-        "auto_charge_threshold_display": _format_currency(auto_charge_threshold_cents),
+        "auto_charge_threshold_display": format_currency(auto_charge_threshold_cents),
         "auto_charge_threshold_value": f"{auto_charge_threshold_cents / 100:.2f}",
         "auto_charge_amount_cents": auto_charge_amount_cents,
-        "auto_charge_amount_display": _format_currency(auto_charge_amount_cents),
+        "auto_charge_amount_display": format_currency(auto_charge_amount_cents),
         "auto_charge_amount_value": f"{auto_charge_amount_cents / 100:.2f}",
         "auto_charge_last_error": account.auto_charge_last_error if account else None,
-        "can_open_portal": bool(settings.stripe_secret_key),
-        "stripe_configured": stripe_configured,
-        "stripe_webhook_configured": stripe_webhook_configured,
-        "stripe_ready": stripe_ready,
         "billing_profile_ready": billing_profile_ready,
         "has_payment_method": has_payment_method,
         "is_local_dev": is_local_dev,
-        "transactions": transactions_payload,
-        "billing_error": error,
-        "billing_success": success,
+        # Plain rows; billing.html formats the amounts and timestamps with the shared filters.
+        "transactions": transactions,
     }
 
 
+def _load_billing_context(
+    request: Request,
+    *,
+    user: User,
+    db: Session,
+    settings: Settings,
+    error: str | None = None,
+    success: str | None = None,
+) -> dict:
+    # Built at most once per request (DB rows plus a possible Stripe lookup); callers get a copy
+    # carrying their own error/success message.
+    context = getattr(request.state, "billing_context", None)
+    if context is None:
+        context = _build_billing_context(request, user=user, db=db, settings=settings)
+        request.state.billing_context = context
+    return {**context, "billing_error": error, "billing_success": success}
+
+
+def _render_billing_error(
+    request: Request,
+    *,
+    user: User,
+    db: Session,
+    settings: Settings,
+    error: str,
+    auto_charge: bool = False,
+):
+    context = _load_billing_context(request, user=user, db=db, settings=settings, error=error)
+    if auto_charge:
+        context["auto_charge_error"] = error
+    return templates.TemplateResponse("billing.html", template_context(request, title="Billing", **context))
+
+
 @router.get("/billing")
 def billing_page(
     request: Request,
@@ -250,70 +359,33 @@ def billing_topup(
     require_csrf(request, csrf_token)
 
     if not settings.billing_enabled:
-        return templates.TemplateResponse(
-            "billing.html",
-            template_context(
-                request,
-                title="Billing",
-                **_load_billing_context(request, user=user, db=db, settings=settings, error="Billing disabled"),
-            ),
-        )
+        return _render_billing_error(request, user=user, db=db, settings=settings, error="Billing disabled")
     if settings.maintenance_mode:
-        return templates.TemplateResponse(
-            "billing.html",
-            template_context(
-                request,
-                title="Billing",
-                **_load_billing_context(request, user=user, db=db, settings=settings, error=settings.maintenance_message),
-            ),
-        )
+        return _render_billing_error(request, user=user, db=db, settings=settings, error=settings.maintenance_message)
     if not settings.stripe_secret_key:
-        return templates.TemplateResponse(
-            "billing.html",
-            template_context(
-                request,
-                title="Billing",
-                **_load_billing_context(request, user=user, db=db, settings=settings, error="Stripe is not configured."),
-            ),
-        )
+        return _render_billing_error(request, user=user, db=db, settings=settings, error="Stripe is not configured.")
     if not settings.stripe_webhook_secret:
-        return templates.TemplateResponse(
-            "billing.html",
-            template_context(
-                request,
-                title="Billing",
-                **_load_billing_context(
-                    request,
-                    user=user,
-                    db=db,
-                    settings=settings,
-                    error="Stripe webhook is not configured; top-ups cannot be credited.",
-                ),
-            ),
+        return _render_billing_error(
+            request,
+            user=user,
+            db=db,
+            settings=settings,
+            error="Stripe webhook is not configured; top-ups cannot be credited.",
         )
 
     amount_cents, error = _parse_amount_to_cents(amount)
     if error:
-        return templates.TemplateResponse(
-            "billing.html",
-            template_context(
-                request,
-                title="Billing",
-                **_load_billing_context(request, user=user, db=db, settings=settings, error=error),
-            ),
-        )
+        return _render_billing_error(request, user=user, db=db, settings=settings, error=error)
     if amount_cents is None or amount_cents < settings.billing_min_charge_cents:
-        error = f"Minimum top-up is {_format_currency(settings.billing_min_charge_cents)}."
-        return templates.TemplateResponse(
-            "billing.html",
-            template_context(
-                request,
-                title="Billing",
-                **_load_billing_context(request, user=user, db=db, settings=settings, error=error),
-            ),
-        )
+        error = f"Minimum top-up is {format_currency(settings.billing_min_charge_cents)}."
+        return _render_billing_error(request, user=user, db=db, settings=settings, error=error)
 
-    account = ensure_customer(db, user=user, settings=settings)
+    account = ensure_customer(
+        db,
+        user=user,
+        settings=settings,
+        account=_billing_account(request, db, user=user, settings=settings),
+    )
     db.add(account)
     db.commit()
     checkout = create_topup_checkout(
@@ -347,25 +419,12 @@ def billing_auto_charge(
     require_csrf(request, csrf_token)
 
     if not settings.billing_enabled:
-        return templates.TemplateResponse(
-            "billing.html",
-            template_context(
-                request,
-                title="Billing",
-                **_load_billing_context(request, user=user, db=db, settings=settings, error="Billing disabled"),
-            ),
-        )
+        return _render_billing_error(request, user=user, db=db, settings=settings, error="Billing disabled")
     if settings.maintenance_mode:
-        return templates.TemplateResponse(
-            "billing.html",
-            template_context(
-                request,
-                title="Billing",
-                **_load_billing_context(request, user=user, db=db, settings=settings, error=settings.maintenance_message),
-            ),
-        )
+        return _render_billing_error(request, user=user, db=db, settings=settings, error=settings.maintenance_message)
 
     account = get_or_create_account(db, user_id=user.id, currency=settings.billing_currency)
+    request.state.billing_account = account
 
     was_enabled = bool(account.auto_charge_enabled)
     enable = (enabled or "").strip().lower() in {"true", "1", "yes", "on"}
@@ -374,35 +433,18 @@ def billing_auto_charge(
     amount_cents, amount_err = _parse_amount_to_cents(amount)
     if threshold_err or amount_err:
         error = threshold_err or amount_err or "Enter valid auto-charge values."
-        return templates.TemplateResponse(
-            "billing.html",
-            template_context(
-                request,
-                title="Billing",
-                **_load_billing_context(request, user=user, db=db, settings=settings, error=error),
-                auto_charge_error=error,
-            ),
-        )
+        return _render_billing_error(request, user=user, db=db, settings=settings, error=error, auto_charge=True)
 
     resolved_threshold_cents = threshold_cents or settings.billing_auto_charge_default_threshold_cents
     resolved_amount_cents = amount_cents or settings.billing_auto_charge_default_amount_cents
     if resolved_amount_cents < settings.billing_min_charge_cents:
-        error = f"Auto-charge amount must be at least {_format_currency(settings.billing_min_charge_cents)}."
-        return templates.TemplateResponse(
-            "billing.html",
-            template_context(
-                request,
-                title="Billing",
-                **_load_billing_context(request, user=user, db=db, settings=settings, error=error),
-                auto_charge_error=error,
-            ),
-        )
+        error = f"Auto-charge amount must be at least {format_currency(settings.billing_min_charge_cents)}."
+        return _render_billing_error(request, user=user, db=db, settings=settings, error=error, auto_charge=True)
 
+    # Thresholds are saved whatever happens next; each branch below folds them into its own single commit.
     account.auto_charge_threshold_cents = int(resolved_threshold_cents)
     account.auto_charge_amount_cents = int(resolved_amount_cents)
-    account.updated_at = dt.datetime.now(dt.UTC)
     db.add(account)
-    db.commit()
 
     if not enable:
         account.auto_charge_enabled = False
@@ -412,78 +454,44 @@ def billing_auto_charge(
         account.auto_charge_in_flight_amount_cents = 0
         account.auto_charge_in_flight_idempotency_key = None
         account.auto_charge_in_flight_payment_intent_id = None
-        account.updated_at = dt.datetime.now(dt.UTC)
         db.commit()
         success = "auto_charge_disabled" if was_enabled else "auto_charge_saved_off"
         return RedirectResponse(f"/billing?success={success}#auto-charge", status_code=303)
 
     if not settings.stripe_secret_key:
+        db.commit()
         error = "Stripe is not configured in this environment."
-        return templates.TemplateResponse(
-            "billing.html",
-            template_context(
-                request,
-                title="Billing",
-                **_load_billing_context(request, user=user, db=db, settings=settings, error=error),
-                auto_charge_error=error,
-            ),
-        )
+        return _render_billing_error(request, user=user, db=db, settings=settings, error=error, auto_charge=True)
     if not settings.stripe_webhook_secret:
+        db.commit()
         error = "Stripe webhook is not configured in this environment."
-        return templates.TemplateResponse(
-            "billing.html",
-            template_context(
-                request,
-                title="Billing",
-                **_load_billing_context(request, user=user, db=db, settings=settings, error=error),
-                auto_charge_error=error,
-            ),
-        )
+        return _render_billing_error(request, user=user, db=db, settings=settings, error=error, auto_charge=True)
 
     if was_enabled:
         account.auto_charge_enabled = True
         account.auto_charge_last_error = None
-        account.updated_at = dt.datetime.now(dt.UTC)
         db.commit()
         return RedirectResponse("/billing?success=auto_charge_saved#auto-charge", status_code=303)
 
+    # Stripe calls follow: persist the thresholds first so a Stripe failure (and rollback) keeps them,
+    # and no write transaction stays open across the network round trips.
+    db.commit()
     if not account.stripe_customer_id:
         try:
-            account = ensure_customer(db, user=user, settings=settings)
+            account = ensure_customer(db, user=user, settings=settings, account=account)
             db.add(account)
             db.commit()
         except Exception:
             db.rollback()
             error = "Unable to create a Stripe customer for this account."
-            return templates.TemplateResponse(
-                "billing.html",
-                template_context(
-                    request,
-                    title="Billing",
-                    **_load_billing_context(request, user=user, db=db, settings=settings, error=error),
-                    auto_charge_error=error,
-                ),
-            )
+            return _render_billing_error(request, user=user, db=db, settings=settings, error=error, auto_charge=True)
 
-    if not auto_charge_payment_method_available(
-        settings=settings,
-        customer_id=account.stripe_customer_id,
-        cache=Cache(settings=settings),
-    ):
+    if not _payment_method_available(request, settings=settings, customer_id=account.stripe_customer_id):
         error = "Add a payment method (complete a top-up or use the portal) before enabling auto-charge."
-        return templates.TemplateResponse(
-            "billing.html",
-            template_context(
-                request,
-                title="Billing",
-                **_load_billing_context(request, user=user, db=db, settings=settings, error=error),
-                auto_charge_error=error,
-            ),
-        )
+        return _render_billing_error(request, user=user, db=db, settings=settings, error=error, auto_charge=True)
 
     account.auto_charge_enabled = True
     account.auto_charge_last_error = None
-    account.updated_at = dt.datetime.now(dt.UTC)
     db.commit()
     success = "auto_charge_saved" if was_enabled else "auto_charge_enabled"
     return RedirectResponse(f"/billing?success={success}#auto-charge", status_code=303)
@@ -508,38 +516,22 @@ def billing_portal(
     require_csrf(request, csrf_token)
 
     if not settings.billing_enabled:
-        return templates.TemplateResponse(
-            "billing.html",
-            template_context(
-                request,
-                title="Billing",
-                **_load_billing_context(request, user=user, db=db, settings=settings, error="Billing disabled"),
-            ),
-        )
+        return _render_billing_error(request, user=user, db=db, settings=settings, error="Billing disabled")
     if settings.maintenance_mode:
-        return templates.TemplateResponse(
-            "billing.html",
-            template_context(
-                request,
-                title="Billing",
-                **_load_billing_context(request, user=user, db=db, settings=settings, error=settings.maintenance_message),
-            ),
-        )
+        return _render_billing_error(request, user=user, db=db, settings=settings, error=settings.maintenance_message)
     if not settings.stripe_secret_key:
-        return templates.TemplateResponse(
-            "billing.html",
-            template_context(
-                request,
-                title="Billing",
-                **_load_billing_context(request, user=user, db=db, settings=settings, error="Stripe is not configured."),
-            ),
-        )
+        return _render_billing_error(request, user=user, db=db, settings=settings, error="Stripe is not configured.")
 
-    account = ensure_customer(db, user=user, settings=settings)
+    account = ensure_customer(
+        db,
+        user=user,
+        settings=settings,
+        account=_billing_account(request, db, user=user, settings=settings),
+    )
     db.add(account)
     db.commit()
 
-    stripe.api_key = settings.stripe_secret_key
+    stripe = stripe_sdk(settings)
     return_url = str(request.base_url).rstrip("/") + "/billing"
     portal = stripe.billing_portal.Session.create(customer=account.stripe_customer_id, return_url=return_url)
     return RedirectResponse(portal["url"], status_code=303)
@@ -565,46 +557,127 @@ def _already_recorded(
     session_id: str | None = None,
     payment_intent_id: str | None = None,
 ) -> bool:
+    # Both columns are unique-indexed, so one OR'd lookup stays an index probe per clause; selecting a
+    # constant means the indexes alone answer it, without fetching the matching row.
+    clauses = []
     if session_id:
-        existing = db.scalar(
-            select(BillingTransaction.id).where(BillingTransaction.stripe_checkout_session_id == session_id)
-        )
-        if existing:
-            return True
+        clauses.append(BillingTransaction.stripe_checkout_session_id == session_id)
     if payment_intent_id:
-        existing = db.scalar(
-            select(BillingTransaction.id).where(BillingTransaction.stripe_payment_intent_id == payment_intent_id)
-        )
-        if existing:
-            return True
-    return False
+        clauses.append(BillingTransaction.stripe_payment_intent_id == payment_intent_id)
+    if not clauses:
+        return False
+    return db.scalar(select(literal(1)).where(or_(*clauses)).limit(1)) is not None
 
 
-@router.post("/billing/webhook")
-async def billing_webhook(request: Request, db: Session = Depends(db_session)):
-    settings: Settings = request.app.state.settings
-    if not settings.billing_enabled:
-        raise HTTPException(status_code=400, detail="Billing disabled")
-    if not (settings.stripe_secret_key and settings.stripe_webhook_secret):
-        raise HTTPException(status_code=500, detail="Stripe webhook not configured")
+def _finish_topup(
+    settings: Settings,
+    *,
+    user_id: str,
+    user_email: str | None,
+    customer_id: str | None,
+    payment_intent_id: str | None,
+    amount_cents: int,
+    currency: str,
+    occurred_at: dt.datetime | None,
+) -> None:
+    # Runs after the webhook is acknowledged: these Stripe/Mailgun round trips only decorate a
+    # top-up that is already credited, so they must not hold the event loop or delay Stripe's ACK.
+    intent = _retrieve_payment_intent_with_receipt(settings, payment_intent_id)
+    if customer_id and payment_intent_id and intent:
+        try:
+            if isinstance(intent, dict):
+                payment_method = intent.get("payment_method")
+            else:
+                payment_method = getattr(intent, "payment_method", None)
+            if payment_method:
+                stripe_sdk(settings).Customer.modify(
+                    customer_id,
+                    invoice_settings={"default_payment_method": payment_method},
+                )
+        except Exception:
+            pass
+
+    if user_email:
+        try:
+            send_billing_receipt_email(
+                settings,
+                to_email=user_email,
+                amount_cents=amount_cents,
+                currency=currency,
+                kind="topup",
+                receipt_url=_receipt_url_from_intent(intent),
+                payment_intent_id=payment_intent_id,
+                occurred_at=occurred_at,
+            )
+        except Exception as e:
+            log.warning("Failed to send top-up receipt email for user %s: %s", user_id, e)
 
-    payload = await request.body()
-    sig = request.headers.get("stripe-signature")
-    if not sig:
-        raise HTTPException(status_code=400, detail="Missing Stripe signature")
 
-    stripe.api_key = settings.stripe_secret_key
+def _send_auto_charge_receipt(
+    settings: Settings,
+    *,
+    user_id: str,
+    user_email: str,
+    intent: dict,
+    payment_intent_id: str | None,
+    amount_cents: int,
+    currency: str,
+    occurred_at: dt.datetime | None,
+) -> None:
+    receipt_url = _receipt_url_from_intent(intent)
+    if not receipt_url:
+        receipt_url = _receipt_url_from_intent(_retrieve_payment_intent_with_receipt(settings, payment_intent_id))
     try:
-        event = stripe.Webhook.construct_event(payload=payload, sig_header=sig, secret=settings.stripe_webhook_secret)
+        send_billing_receipt_email(
+            settings,
+            to_email=user_email,
+            amount_cents=amount_cents,
+            currency=currency,
+            kind="auto_charge",
+            receipt_url=receipt_url,
+            payment_intent_id=payment_intent_id,
+            occurred_at=occurred_at,
+        )
     except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Invalid signature: {e}") from e
+        log.warning("Failed to send auto-charge receipt email for user %s: %s", user_id, e)
+
 
+async def _read_webhook_payload(request: Request) -> bytes:
+    # The body-size middleware only sees Content-Length, so a chunked body is capped while it streams in.
+    chunks: list[bytes] = []
+    total = 0
+    async for chunk in request.stream():
+        total += len(chunk)
+        if total > _WEBHOOK_MAX_BODY_BYTES:
+            raise HTTPException(status_code=413, detail="Webhook payload too large")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def _webhook_event_relevant(event: dict) -> bool:
+    # Mirrors the early returns in _apply_webhook_event, so filtered events skip the worker-thread hop.
+    event_type = event.get("type", "")
+    if event_type not in _HANDLED_WEBHOOK_EVENTS:
+        return False
+    obj = event.get("data", {}).get("object", {}) or {}
+    if event_type == "checkout.session.completed":
+        return obj.get("mode") == "payment"
+    return (obj.get("metadata") or {}).get("flow") == "auto_charge"
+
+
+def _apply_webhook_event(
+    event: dict,
+    *,
+    settings: Settings,
+    db: Session,
+    background_tasks: BackgroundTasks,
+) -> None:
     event_type = event.get("type", "")
     obj = event.get("data", {}).get("object", {}) or {}
 
     if event_type == "checkout.session.completed":
         if obj.get("mode") != "payment":
-            return {"received": True}
+            return
         metadata = obj.get("metadata") or {}
         user_id = metadata.get("user_id")
         amount_total = obj.get("amount_total")
@@ -613,13 +686,11 @@ async def billing_webhook(request: Request, db: Session = Depends(db_session)):
         payment_intent_id = obj.get("payment_intent")
         customer_id = obj.get("customer")
         if not user_id or amount_total is None:
-            return {"received": True}
-        if _already_recorded(db, session_id=session_id):
-            return {"received": True}
+            return
+        if _already_recorded(db, session_id=session_id, payment_intent_id=payment_intent_id):
+            return
 
-        account = get_or_create_account(db, user_id=user_id, currency=currency)
-        if customer_id and not account.stripe_customer_id:
-            account.stripe_customer_id = customer_id
+        account = upsert_account(db, user_id=user_id, currency=currency, stripe_customer_id=customer_id)
 
         credit_balance(
             db,
@@ -633,63 +704,43 @@ async def billing_webhook(request: Request, db: Session = Depends(db_session)):
         )
         account.auto_charge_last_error = None
         db.add(account)
+        # Read inside the same transaction so the webhook is one BEGIN...COMMIT, not a commit plus a read.
+        user_email = db.scalar(select(User.email).where(User.id == user_id))
         try:
             db.commit()
         except IntegrityError:
             db.rollback()
-            return {"received": True}
-
-        intent = _retrieve_payment_intent_with_receipt(payment_intent_id) if payment_intent_id else None
-        if customer_id and payment_intent_id and intent:
-            try:
-                if isinstance(intent, dict):
-                    payment_method = intent.get("payment_method")
-                else:
-                    payment_method = getattr(intent, "payment_method", None)
-                if payment_method:
-                    stripe.Customer.modify(
-                        customer_id,
-                        invoice_settings={"default_payment_method": payment_method},
-                    )
-            except Exception:
-                pass
-
-        user = db.scalar(select(User).where(User.id == user_id))
-        if user:
-            receipt_url = _receipt_url_from_intent(intent)
-            try:
-                send_billing_receipt_email(
-                    settings,
-                    to_email=user.email,
-                    amount_cents=int(amount_total),
-                    currency=currency,
-                    kind="topup",
-                    receipt_url=receipt_url,
-                    payment_intent_id=payment_intent_id,
-                    occurred_at=_event_created_at(obj),
-                )
-            except Exception as e:
-                log.warning("Failed to send top-up receipt email for user %s: %s", user_id, e)
+            return
+
+        background_tasks.add_task(
+            _finish_topup,
+            settings,
+            user_id=user_id,
+            user_email=user_email,
+            customer_id=customer_id,
+            payment_intent_id=payment_intent_id,
+            amount_cents=int(amount_total),
+            currency=currency,
+            occurred_at=_event_created_at(obj),
+        )
 
     elif event_type == "payment_intent.succeeded":
         metadata = obj.get("metadata") or {}
         if metadata.get("flow") != "auto_charge":
-            return {"received": True}
+            return
         user_id = metadata.get("user_id")
         if not user_id:
-            return {"received": True}
+            return
         payment_intent_id = obj.get("id")
         if _already_recorded(db, payment_intent_id=payment_intent_id):
-            return {"received": True}
+            return
         amount_received = obj.get("amount_received") or obj.get("amount")
         currency = (obj.get("currency") or settings.billing_currency).lower()
         customer_id = obj.get("customer")
         if amount_received is None:
-            return {"received": True}
+            return
 
-        account = get_or_create_account(db, user_id=user_id, currency=currency)
-        if customer_id and not account.stripe_customer_id:
-            account.stripe_customer_id = customer_id
+        account = upsert_account(db, user_id=user_id, currency=currency, stripe_customer_id=customer_id)
 
         credit_balance(
             db,
@@ -707,42 +758,36 @@ async def billing_webhook(request: Request, db: Session = Depends(db_session)):
         account.auto_charge_in_flight_idempotency_key = None
         account.auto_charge_in_flight_payment_intent_id = None
         db.add(account)
+        user_email = db.scalar(select(User.email).where(User.id == user_id))
         try:
             db.commit()
         except IntegrityError:
             db.rollback()
-            return {"received": True}
-
-        user = db.scalar(select(User).where(User.id == user_id))
-        if user:
-            receipt_url = _receipt_url_from_intent(obj)
-            if not receipt_url:
-                intent = _retrieve_payment_intent_with_receipt(payment_intent_id)
-                receipt_url = _receipt_url_from_intent(intent)
-            try:
-                send_billing_receipt_email(
-                    settings,
-                    to_email=user.email,
-                    amount_cents=int(amount_received),
-                    currency=currency,
-                    kind="auto_charge",
-                    receipt_url=receipt_url,
-                    payment_intent_id=payment_intent_id,
-                    occurred_at=_event_created_at(obj),
-                )
-            except Exception as e:
-                log.warning("Failed to send auto-charge receipt email for user %s: %s", user_id, e)
+            return
+
+        if user_email:
+            background_tasks.add_task(
+                _send_auto_charge_receipt,
+                settings,
+                user_id=user_id,
+                user_email=user_email,
+                intent=obj,
+                payment_intent_id=payment_intent_id,
+                amount_cents=int(amount_received),
+                currency=currency,
+                occurred_at=_event_created_at(obj),
+            )
 
     elif event_type == "payment_intent.payment_failed":
         metadata = obj.get("metadata") or {}
         if metadata.get("flow") != "auto_charge":
-            return {"received": True}
+            return
         user_id = metadata.get("user_id")
         if not user_id:
-            return {"received": True}
+            return
         account = db.scalar(select(BillingAccount).where(BillingAccount.user_id == user_id))
         if account is None:
-            return {"received": True}
+            return
         error = (obj.get("last_payment_error") or {}).get("message") or "Auto-charge failed."
         account.auto_charge_last_error = str(error)
         account.auto_charge_in_flight = False
@@ -753,4 +798,60 @@ async def billing_webhook(request: Request, db: Session = Depends(db_session)):
         db.add(account)
         db.commit()
 
+
+@router.post("/billing/webhook")
+async def billing_webhook(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(db_session),
+):
+    settings: Settings = request.app.state.settings
+    if not settings.billing_enabled:
+        raise HTTPException(status_code=400, detail="Billing disabled")
+    if not (settings.stripe_secret_key and settings.stripe_webhook_secret):
+        raise HTTPException(status_code=500, detail="Stripe webhook not configured")
+
+    sig = request.headers.get("stripe-signature")
+    if not sig:
+        raise HTTPException(status_code=400, detail="Missing Stripe signature")
+    payload = await _read_webhook_payload(request)
+
+    # Stripe sends many event types this endpoint ignores; acknowledge those without verifying or
+    # touching the DB. Skipping verification is safe because an ignored event changes no state.
+    try:
+        peeked = orjson.loads(payload)
+    except orjson.JSONDecodeError:
+        peeked = None
+    if isinstance(peeked, dict) and peeked.get("type") not in _HANDLED_WEBHOOK_EVENTS:
+        return {"received": True}
+
+    stripe = stripe_sdk(settings)
+    try:
+        # Signature verification hashes the whole payload; keep it off the event loop.
+        event = await to_thread.run_sync(
+            partial(
+                stripe.Webhook.construct_event,
+                payload=payload,
+                sig_header=sig,
+                secret=settings.stripe_webhook_secret,
+            )
+        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid signature: {e}") from e
+
+    if not _webhook_event_relevant(event):
+        return {"received": True}
+
+    # The event handling below is all blocking DB work (plus scheduling follow-ups); run it on a
+    # worker thread so a burst of webhooks doesn't stall every other request on the event loop.
+    # AnyIO's pool (not asyncio's default executor) is the one sized and shared with sync routes.
+    await to_thread.run_sync(
+        partial(
+            _apply_webhook_event,
+            event,
+            settings=settings,
+            db=db,
+            background_tasks=background_tasks,
+        )
+    )
     return {"received": True}
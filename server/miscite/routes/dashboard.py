@@ -4,19 +4,25 @@ import asyncio
 import datetime as dt
 import json
 import re
+from collections.abc import Callable
+from contextlib import suppress
 from pathlib import Path
 
+import orjson
+from anyio import to_thread
 from fastapi import APIRouter, Depends, Form, HTTPException, Query, Request, UploadFile
 from fastapi.responses import RedirectResponse, Response, StreamingResponse
-from sqlalchemy import desc, func, select
-from sqlalchemy.orm import Session
+from sqlalchemy import Row, and_, desc, exists, func, lambda_stmt, select
+from sqlalchemy.orm import Session, joinedload, undefer_group
+from sqlalchemy.sql.lambdas import StatementLambdaElement
 
 from server.miscite.billing.ledger import get_or_create_account
 from server.miscite.billing.stripe import auto_charge_payment_method_available
 from server.miscite.core.cache import Cache
 from server.miscite.core.config import Settings
 from server.miscite.core.db import db_session, get_sessionmaker
-from server.miscite.core.jobs import delete_job_and_document
+from server.miscite.core.job_events import job_event_listener
+from server.miscite.core.jobs import delete_job_and_document, delete_jobs_bulk
 from server.miscite.core.models import AnalysisJob, AnalysisJobEvent, BillingAccount, Document, JobStatus, User
 from server.miscite.core.rate_limit import acquire_stream_slot, enforce_rate_limit, release_stream_slot
 from server.miscite.core.security import access_token_hint, generate_access_token, hash_token, require_csrf, require_user
@@ -26,6 +32,19 @@ from server.miscite.web.report_pdf import build_report_pdf
 
 router = APIRouter()
 
+# The report columns are deferred on AnalysisJob; views that render a report load them with the row.
+_WITH_REPORT = undefer_group("report")
+
+
+def _report_job_query(*criteria, with_report: bool = True):
+    """Jobs matching `criteria` with their report columns, plus the one document field report views show."""
+    stmt = (
+        select(AnalysisJob)
+        .where(*criteria)
+        .options(joinedload(AnalysisJob.document, innerjoin=True).load_only(Document.original_filename))
+    )
+    return stmt.options(_WITH_REPORT) if with_report else stmt
+
 
 def _billing_ready(settings: Settings, account: BillingAccount | None) -> bool:
     if not settings.billing_enabled:
@@ -50,13 +69,6 @@ def _as_utc(ts: dt.datetime | None) -> dt.datetime | None:
     return ts.astimezone(dt.UTC)
 
 
-def _human_date(ts: dt.datetime | None) -> str:
-    ts = _as_utc(ts)
-    if ts is None:
-        return ""
-    return f"{ts.strftime('%b')} {ts.day}, {ts.year}"
-
-
 def _human_datetime(ts: dt.datetime | None) -> str:
     ts = _as_utc(ts)
     if ts is None:
@@ -141,28 +153,6 @@ def _enable_sharing(settings: Settings, job: AnalysisJob) -> None:
         job.access_token_expires_at = now + dt.timedelta(days=settings.access_token_days)
 
 
-def _relative_time(ts: dt.datetime | None) -> str:
-    ts = _as_utc(ts)
-    if ts is None:
-        return ""
-    now = dt.datetime.now(dt.UTC)
-    delta = now - ts
-    seconds = max(0, int(delta.total_seconds()))
-    if seconds < 60:
-        return "just now"
-    if seconds < 3600:
-        return f"{seconds // 60}m ago"
-    if seconds < 86400:
-        return f"{seconds // 3600}h ago"
-    if seconds < 86400 * 7:
-        return f"{seconds // 86400}d ago"
-    if seconds < 86400 * 30:
-        return f"{max(1, seconds // (86400 * 7))}w ago"
-    if seconds < 86400 * 365:
-        return f"{max(1, seconds // (86400 * 30))}mo ago"
-    return f"{max(1, seconds // (86400 * 365))}y ago"
-
-
 def _safe_error_message(settings: Settings, message: str | None) -> str | None:
     if not message:
         return None
@@ -171,11 +161,26 @@ def _safe_error_message(settings: Settings, message: str | None) -> str | None:
     return "Analysis failed. Please retry or contact support."
 
 
+def _json_column(raw: str | None):
+    if not raw:
+        return None
+    try:
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        # The worker writes with json.dumps, which emits NaN/Infinity for non-finite floats; orjson rejects those.
+        return json.loads(raw)
+
+
+def _json_response(payload: dict) -> Response:
+    # Reports are large nested dicts; encoding directly skips FastAPI's per-value jsonable_encoder walk.
+    return Response(content=orjson.dumps(payload), media_type="application/json")
+
+
 def _load_report(job: AnalysisJob) -> dict | None:
     if not job.report_json:
         return None
     try:
-        report = json.loads(job.report_json)
+        report = _json_column(job.report_json)
     except Exception:
         return None
     if isinstance(report, dict):
@@ -205,27 +210,23 @@ def _token_expired(job: AnalysisJob) -> bool:
 def _resolve_access_token(
     db: Session,
     token_value: str,
+    *,
+    with_report: bool = True,
 ) -> tuple[tuple[AnalysisJob, Document] | None, str | None]:
     token_value = token_value.strip()
     if not token_value:
         return None, "Please enter an access token."
 
     token_hash = hash_token(token_value)
-    row = db.execute(
-        select(AnalysisJob, Document)
-        .join(Document, Document.id == AnalysisJob.document_id)
-        .where(AnalysisJob.access_token_hash == token_hash)
-        .limit(1)
-    ).first()
-    if not row:
+    job = db.scalar(_report_job_query(AnalysisJob.access_token_hash == token_hash, with_report=with_report).limit(1))
+    if not job:
         return None, "That token was not recognized. Double-check and try again."
 
-    job, doc = row
     now = dt.datetime.now(dt.UTC)
     expires_at = _as_utc(job.access_token_expires_at)
     if expires_at is not None and expires_at < now:
         return None, "That token has expired. Request a new token from the report owner."
-    return (job, doc), None
+    return (job, job.document), None
 
 
 _PATH_HINT_RE = re.compile(r"(^/|[A-Za-z]:\\|\\.\\./|/data/|/home/)")
@@ -302,7 +303,7 @@ def _report_pdf_response(
         raise HTTPException(status_code=409, detail="Report is not ready yet.")
 
     if include_context_sections:
-        data_sources = json.loads(job.sources_json) if job.sources_json else None
+        data_sources = _json_column(job.sources_json)
         methodology_md = job.methodology_md or ""
         if not settings.expose_sensitive_report_fields:
             data_sources = _redact_sources(data_sources)
@@ -381,7 +382,8 @@ def report_access(request: Request, token: str = Form(""), db: Session = Depends
         window_seconds=settings.rate_limit_window_seconds,
     )
     token_value = token.strip()
-    resolved, error = _resolve_access_token(db, token_value)
+    # The form only validates the token before redirecting; the report page loads the report itself.
+    _resolved, error = _resolve_access_token(db, token_value, with_report=False)
     if error:
         return templates.TemplateResponse(
             "report_access.html",
@@ -469,6 +471,112 @@ def report_access_pdf(request: Request, token: str, db: Session = Depends(db_ses
     )
 
 
+# The dashboard list renders these scalars only; plain rows skip building AnalysisJob/Document objects.
+_JOB_LIST_COLUMNS = (
+    AnalysisJob.id,
+    AnalysisJob.status,
+    AnalysisJob.created_at,
+    AnalysisJob.error_message,
+    Document.original_filename,
+)
+
+
+def _job_list_item(settings: Settings, row: Row) -> dict:
+    return {
+        "id": row.id,
+        "status": row.status,
+        "created_at": row.created_at,
+        "filename": row.original_filename,
+        "error_message": _safe_error_message(settings, row.error_message),
+    }
+
+
+_STATUS_FILTERS = {
+    "completed": (JobStatus.completed.value,),
+    "failed": (JobStatus.failed.value, JobStatus.canceled.value),
+    "processing": (JobStatus.pending.value, JobStatus.running.value),
+}
+
+
+def _status_count(counts: dict[str, int], status_filter: str) -> int:
+    return sum(counts.get(status, 0) for status in _STATUS_FILTERS[status_filter])
+
+
+def _filtered_jobs(
+    stmt: StatementLambdaElement, *, user_id: str, q: str | None, status_filter: str
+) -> StatementLambdaElement:
+    """Narrow a job-list lambda statement to `user_id`'s jobs matching the dashboard's search and status filter."""
+    # Lambda statements are cached by the lambdas' code, with closure values sent as bound parameters, so each
+    # filter combination builds and compiles its SQL once per process rather than on every dashboard render.
+    stmt += lambda s: s.where(AnalysisJob.user_id == user_id)
+    if q:
+        # Only the filename search needs documents; other filters stay on analysis_jobs alone.
+        pattern = f"%{q}%"
+        stmt += lambda s: s.join(Document, Document.id == AnalysisJob.document_id).where(
+            Document.original_filename.ilike(pattern)
+        )
+    statuses = _STATUS_FILTERS.get(status_filter)
+    if statuses:
+        stmt += lambda s: s.where(AnalysisJob.status.in_(statuses))
+    return stmt
+
+
+def _job_list_order(cols, sort_choice: str) -> tuple:
+    if sort_choice == "oldest":
+        return (cols.created_at,)
+    if sort_choice == "status":
+        return (cols.status, desc(cols.created_at))
+    return (desc(cols.created_at),)
+
+
+def _job_list_page(
+    db: Session, *, user_id: str, q: str | None, status_filter: str, sort_choice: str, limit: int
+) -> list[Row]:
+    # Filter, sort and limit the jobs on their own, then join documents for just the surviving page, so a
+    # status sort over a long history doesn't drag every job's filename through the sort.
+    page = _filtered_jobs(
+        lambda_stmt(
+            lambda: select(
+                AnalysisJob.id,
+                AnalysisJob.status,
+                AnalysisJob.created_at,
+                AnalysisJob.error_message,
+                AnalysisJob.document_id,
+            )
+        ),
+        user_id=user_id,
+        q=q,
+        status_filter=status_filter,
+    )
+    # One lambda per ordering: lambda_stmt caches each lambda's statement, so the sort can't be a closure value.
+    if sort_choice == "oldest":
+        page += lambda s: s.order_by(*_job_list_order(AnalysisJob, "oldest"))
+    elif sort_choice == "status":
+        page += lambda s: s.order_by(*_job_list_order(AnalysisJob, "status"))
+    else:
+        page += lambda s: s.order_by(*_job_list_order(AnalysisJob, "newest"))
+    page += lambda s: s.limit(limit)
+    jobs = page.subquery()
+    return db.execute(
+        select(jobs.c.id, jobs.c.status, jobs.c.created_at, jobs.c.error_message, Document.original_filename)
+        .join(Document, Document.id == jobs.c.document_id)
+        .order_by(*_job_list_order(jobs.c, sort_choice))
+    ).all()
+
+
+def _latest_job_row(db: Session, *, user_id: str, listed: list[Row], listed_is_newest: bool) -> Row | None:
+    # An unfiltered newest-first listing already starts with the latest job; only other views query for it.
+    if listed_is_newest:
+        return listed[0] if listed else None
+    return db.execute(
+        select(*_JOB_LIST_COLUMNS)
+        .join(Document, Document.id == AnalysisJob.document_id)
+        .where(AnalysisJob.user_id == user_id)
+        .order_by(desc(AnalysisJob.created_at))
+        .limit(1)
+    ).first()
+
+
 @router.get("/dashboard")
 def dashboard(
     request: Request,
@@ -494,101 +602,47 @@ def dashboard(
     if sort_choice not in {"newest", "oldest", "status"}:
         sort_choice = "newest"
 
-    total_jobs = (
-        db.scalar(select(func.count()).select_from(AnalysisJob).where(AnalysisJob.user_id == user.id))
-        or 0
-    )
     status_rows = db.execute(
         select(AnalysisJob.status, func.count())
         .where(AnalysisJob.user_id == user.id)
         .group_by(AnalysisJob.status)
     ).all()
     raw_status_counts = {status_name: int(count or 0) for status_name, count in status_rows}
-    completed_count = raw_status_counts.get(JobStatus.completed.value, 0)
-    failed_count = raw_status_counts.get(JobStatus.failed.value, 0) + raw_status_counts.get(
-        JobStatus.canceled.value, 0
-    )
-    processing_count = raw_status_counts.get(JobStatus.pending.value, 0) + raw_status_counts.get(
-        JobStatus.running.value, 0
-    )
+    total_jobs = sum(raw_status_counts.values())
+    completed_count = _status_count(raw_status_counts, "completed")
+    failed_count = _status_count(raw_status_counts, "failed")
+    processing_count = _status_count(raw_status_counts, "processing")
 
-    filter_stmt = (
-        select(AnalysisJob.id)
-        .join(Document, Document.id == AnalysisJob.document_id)
-        .where(AnalysisJob.user_id == user.id)
-    )
-    if q:
-        filter_stmt = filter_stmt.where(Document.original_filename.ilike(f"%{q}%"))
-    if status_filter == "completed":
-        filter_stmt = filter_stmt.where(AnalysisJob.status == JobStatus.completed.value)
-    elif status_filter == "failed":
-        filter_stmt = filter_stmt.where(
-            AnalysisJob.status.in_([JobStatus.failed.value, JobStatus.canceled.value])
-        )
-    elif status_filter == "processing":
-        filter_stmt = filter_stmt.where(AnalysisJob.status.in_([JobStatus.pending.value, JobStatus.running.value]))
-
-    matching_count = db.scalar(select(func.count()).select_from(filter_stmt.subquery())) or 0
-
-    stmt = (
-        select(AnalysisJob, Document)
-        .join(Document, Document.id == AnalysisJob.document_id)
-        .where(AnalysisJob.user_id == user.id)
-    )
     if q:
-        stmt = stmt.where(Document.original_filename.ilike(f"%{q}%"))
-    if status_filter == "completed":
-        stmt = stmt.where(AnalysisJob.status == JobStatus.completed.value)
-    elif status_filter == "failed":
-        stmt = stmt.where(
-            AnalysisJob.status.in_([JobStatus.failed.value, JobStatus.canceled.value])
+        matching_count = (
+            db.scalar(
+                _filtered_jobs(
+                    lambda_stmt(lambda: select(func.count()).select_from(AnalysisJob)),
+                    user_id=user.id,
+                    q=q,
+                    status_filter=status_filter,
+                )
+            )
+            or 0
         )
-    elif status_filter == "processing":
-        stmt = stmt.where(AnalysisJob.status.in_([JobStatus.pending.value, JobStatus.running.value]))
-
-    if sort_choice == "oldest":
-        stmt = stmt.order_by(AnalysisJob.created_at)
-    elif sort_choice == "status":
-        stmt = stmt.order_by(AnalysisJob.status, desc(AnalysisJob.created_at))
     else:
-        stmt = stmt.order_by(desc(AnalysisJob.created_at))
+        # Without a search the per-status tallies above already hold the match count.
+        matching_count = total_jobs if status_filter == "all" else _status_count(raw_status_counts, status_filter)
 
     display_limit = 25
-    rows = db.execute(stmt.limit(display_limit)).all()
-
-    latest_row = db.execute(
-        select(AnalysisJob, Document)
-        .join(Document, Document.id == AnalysisJob.document_id)
-        .where(AnalysisJob.user_id == user.id)
-        .order_by(desc(AnalysisJob.created_at))
-        .limit(1)
-    ).first()
+    rows = _job_list_page(
+        db, user_id=user.id, q=q, status_filter=status_filter, sort_choice=sort_choice, limit=display_limit
+    )
 
-    latest_job = None
-    if latest_row:
-        job, doc = latest_row
-        latest_job = {
-            "id": job.id,
-            "status": job.status,
-            "created_at": job.created_at.isoformat(),
-            "created_at_human": _human_date(job.created_at),
-            "created_at_relative": _relative_time(job.created_at),
-            "filename": doc.original_filename,
-            "error_message": _safe_error_message(settings, job.error_message),
-        }
+    latest_row = _latest_job_row(
+        db,
+        user_id=user.id,
+        listed=rows,
+        listed_is_newest=sort_choice == "newest" and not q and status_filter == "all",
+    )
 
-    jobs = [
-        {
-            "id": job.id,
-            "status": job.status,
-            "created_at": job.created_at.isoformat(),
-            "created_at_human": _human_date(job.created_at),
-            "created_at_relative": _relative_time(job.created_at),
-            "filename": doc.original_filename,
-            "error_message": _safe_error_message(settings, job.error_message),
-        }
-        for job, doc in rows
-    ]
+    latest_job = _job_list_item(settings, latest_row) if latest_row else None
+    jobs = [_job_list_item(settings, row) for row in rows]
 
     billing_required = settings.billing_enabled
     billing_ready = _billing_ready(settings, billing)
@@ -614,6 +668,8 @@ def dashboard(
             processing_count=processing_count,
             matching_count=matching_count,
             display_limit=display_limit,
+            # One clock reading per render keeps every row's "Xm ago" consistent with the others.
+            now=dt.datetime.now(dt.UTC),
         ),
     )
 
@@ -655,7 +711,6 @@ def upload(
         content_type=file.content_type or "application/octet-stream",
         storage_path=stored.storage_path,
         sha256=stored.sha256,
-        created_at=dt.datetime.now(dt.UTC),
     )
     db.add(doc)
     db.flush()
@@ -664,7 +719,6 @@ def upload(
         user_id=user.id,
         document_id=doc.id,
         status=JobStatus.pending.value,
-        created_at=dt.datetime.now(dt.UTC),
     )
     db.add(job)
     db.flush()
@@ -682,17 +736,13 @@ def job_page(
     request.state.user = user
     settings: Settings = request.app.state.settings
 
-    row = db.execute(
-        select(AnalysisJob, Document)
-        .join(Document, Document.id == AnalysisJob.document_id)
-        .where(AnalysisJob.id == job_id, AnalysisJob.user_id == user.id)
-    ).first()
-    if not row:
+    job = db.scalar(_report_job_query(AnalysisJob.id == job_id, AnalysisJob.user_id == user.id))
+    if not job:
         return RedirectResponse("/reports/access?error=invalid", status_code=303)
-    job, doc = row
+    doc = job.document
 
     report = _load_report(job)
-    data_sources = json.loads(job.sources_json) if job.sources_json else None
+    data_sources = _json_column(job.sources_json)
     methodology_md = job.methodology_md or ""
     if not settings.expose_sensitive_report_fields:
         data_sources = _redact_sources(data_sources)
@@ -747,20 +797,15 @@ def job_pdf(
         window_seconds=settings.rate_limit_window_seconds,
     )
 
-    row = db.execute(
-        select(AnalysisJob, Document)
-        .join(Document, Document.id == AnalysisJob.document_id)
-        .where(AnalysisJob.id == job_id, AnalysisJob.user_id == user.id)
-    ).first()
-    if not row:
+    job = db.scalar(_report_job_query(AnalysisJob.id == job_id, AnalysisJob.user_id == user.id))
+    if not job:
         raise HTTPException(status_code=404)
 
-    job, doc = row
     return _report_pdf_response(
         request,
         settings=settings,
         job=job,
-        doc=doc,
+        doc=job.document,
         report_url_path=f"/jobs/{job.id}",
     )
 
@@ -834,14 +879,10 @@ def job_access_token(
     if settings.maintenance_mode:
         raise HTTPException(status_code=503, detail=settings.maintenance_message)
 
-    row = db.execute(
-        select(AnalysisJob, Document)
-        .join(Document, Document.id == AnalysisJob.document_id)
-        .where(AnalysisJob.id == job_id, AnalysisJob.user_id == user.id)
-    ).first()
-    if not row:
+    job = db.scalar(_report_job_query(AnalysisJob.id == job_id, AnalysisJob.user_id == user.id))
+    if not job:
         raise HTTPException(status_code=404)
-    job, doc = row
+    doc = job.document
 
     action_value = (action or "rotate").strip().lower()
     if action_value not in {"rotate", "update-expiration"}:
@@ -864,7 +905,7 @@ def job_access_token(
 
     if error:
         report = _load_report(job)
-        data_sources = json.loads(job.sources_json) if job.sources_json else None
+        data_sources = _json_column(job.sources_json)
         methodology_md = job.methodology_md or ""
         if not settings.expose_sensitive_report_fields:
             data_sources = _redact_sources(data_sources)
@@ -916,7 +957,7 @@ def job_access_token(
     db.commit()
 
     report = _load_report(job)
-    data_sources = json.loads(job.sources_json) if job.sources_json else None
+    data_sources = _json_column(job.sources_json)
     methodology_md = job.methodology_md or ""
     if not settings.expose_sensitive_report_fields:
         data_sources = _redact_sources(data_sources)
@@ -998,11 +1039,7 @@ def job_delete(
 
 
 def _cancel_job(job: AnalysisJob, *, message: str = "Canceled by user.") -> bool:
-    if job.status in {
-        JobStatus.completed.value,
-        JobStatus.failed.value,
-        JobStatus.canceled.value,
-    }:
+    if job.status in _TERMINAL_STATUSES:
         return False
     job.status = JobStatus.canceled.value
     job.error_message = message
@@ -1073,10 +1110,8 @@ def dashboard_bulk_action(
         .where(AnalysisJob.user_id == user.id, AnalysisJob.id.in_(selected_ids))
     ).all()
 
-    storage_paths: set[str] = set()
-    for job, doc in rows:
-        if delete_job_and_document(db, job_id=job.id, document_id=doc.id):
-            storage_paths.add(doc.storage_path)
+    deleted_documents = delete_jobs_bulk(db, job_ids=[job.id for job, _doc in rows])
+    storage_paths = {doc.storage_path for _job, doc in rows if doc.id in deleted_documents}
     db.commit()
 
     for path in storage_paths:
@@ -1197,11 +1232,13 @@ def job_api(
         window_seconds=settings.rate_limit_window_seconds,
     )
 
-    job = db.scalar(select(AnalysisJob).where(AnalysisJob.id == job_id, AnalysisJob.user_id == user.id))
+    job = db.scalar(
+        select(AnalysisJob).where(AnalysisJob.id == job_id, AnalysisJob.user_id == user.id).options(_WITH_REPORT)
+    )
     if not job:
         raise HTTPException(status_code=404)
 
-    data_sources = json.loads(job.sources_json) if job.sources_json else None
+    data_sources = _json_column(job.sources_json)
     methodology_md = job.methodology_md
     if not settings.expose_sensitive_report_fields:
         data_sources = _redact_sources(data_sources)
@@ -1214,20 +1251,20 @@ def job_api(
         "started_at": job.started_at.isoformat() if job.started_at else None,
         "finished_at": job.finished_at.isoformat() if job.finished_at else None,
         "error_message": _safe_error_message(settings, job.error_message),
-        "report": json.loads(job.report_json) if job.report_json else None,
+        "report": _json_column(job.report_json),
         "data_sources": data_sources,
         "methodology_md": methodology_md,
         "billing": {
-            "usage": json.loads(job.llm_usage_json) if job.llm_usage_json else None,
-            "cost": json.loads(job.llm_cost_json) if job.llm_cost_json else None,
+            "usage": _json_column(job.llm_usage_json),
+            "cost": _json_column(job.llm_cost_json),
             "status": job.billing_status,
             "error": job.billing_error,
         },
     }
-    return payload
+    return _json_response(payload)
 
 
-def _event_payload(event: AnalysisJobEvent) -> dict:
+def _event_payload(event: AnalysisJobEvent | Row) -> dict:
     return {
         "id": event.id,
         "stage": event.stage,
@@ -1237,8 +1274,9 @@ def _event_payload(event: AnalysisJobEvent) -> dict:
     }
 
 
-def _require_access_job(db: Session, token_hash: str) -> AnalysisJob:
-    job = db.scalar(select(AnalysisJob).where(AnalysisJob.access_token_hash == token_hash))
+def _require_access_job(db: Session, token_hash: bytes, *, with_report: bool = False) -> AnalysisJob:
+    stmt = select(AnalysisJob).where(AnalysisJob.access_token_hash == token_hash)
+    job = db.scalar(stmt.options(_WITH_REPORT) if with_report else stmt)
     if not job:
         raise HTTPException(status_code=404)
     now = dt.datetime.now(dt.UTC)
@@ -1263,16 +1301,18 @@ def report_api(
         window_seconds=settings.rate_limit_window_seconds,
     )
     token_hash = hash_token(token.strip())
-    job = _require_access_job(db, token_hash)
-    return {
-        "id": job.id,
-        "status": job.status,
-        "created_at": job.created_at.isoformat() if job.created_at else None,
-        "started_at": job.started_at.isoformat() if job.started_at else None,
-        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
-        "error_message": _safe_error_message(settings, job.error_message),
-        "report": json.loads(job.report_json) if job.report_json else None,
-    }
+    job = _require_access_job(db, token_hash, with_report=True)
+    return _json_response(
+        {
+            "id": job.id,
+            "status": job.status,
+            "created_at": job.created_at.isoformat() if job.created_at else None,
+            "started_at": job.started_at.isoformat() if job.started_at else None,
+            "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+            "error_message": _safe_error_message(settings, job.error_message),
+            "report": _json_column(job.report_json),
+        }
+    )
 
 
 @router.get("/api/jobs/{job_id}/events")
@@ -1293,7 +1333,11 @@ def job_events(
         window_seconds=settings.rate_limit_window_seconds,
     )
 
-    job = db.scalar(select(AnalysisJob).where(AnalysisJob.id == job_id, AnalysisJob.user_id == user.id))
+    job = db.execute(
+        select(AnalysisJob.status, AnalysisJob.error_message).where(
+            AnalysisJob.id == job_id, AnalysisJob.user_id == user.id
+        )
+    ).first()
     if not job:
         raise HTTPException(status_code=404)
 
@@ -1341,6 +1385,111 @@ def report_events(
     }
 
 
+_TERMINAL_STATUSES = frozenset({JobStatus.completed.value, JobStatus.failed.value, JobStatus.canceled.value})
+
+# Without the Postgres listener streams poll, backing off from the minimum to the maximum delay while
+# nothing new arrives; with it they poll when notified, plus a slow heartbeat to catch anything written
+# without a notification.
+_STREAM_POLL_MIN_SECONDS = 0.25
+_STREAM_POLL_MAX_SECONDS = 5.0
+_STREAM_HEARTBEAT_SECONDS = 30.0
+
+# A stream poll returns (new event payloads, status payload or None), or None to end the stream.
+_StreamPoll = Callable[[int], tuple[list[dict], dict | None] | None]
+
+
+# Caps one poll's work; a stream catching up on a long backlog drains it over back-to-back polls.
+_STREAM_EVENT_BATCH = 200
+
+
+def _poll_stream(db: Session, settings: Settings, where, last_id: int) -> tuple[Row | None, list[dict], dict | None]:
+    """Read the job matching `where` and its events after `last_id` in one round trip.
+
+    Returns (job row or None, event payloads, status payload). The status is None when the batch came back
+    full, since more events are pending and a terminal status must not end the stream before they are sent.
+    """
+    rows = db.execute(
+        select(
+            AnalysisJob.status,
+            AnalysisJob.error_message,
+            AnalysisJob.access_token_expires_at,
+            AnalysisJobEvent.id,
+            AnalysisJobEvent.stage,
+            AnalysisJobEvent.message,
+            AnalysisJobEvent.progress,
+            AnalysisJobEvent.created_at,
+        )
+        .outerjoin(AnalysisJobEvent, and_(AnalysisJobEvent.job_id == AnalysisJob.id, AnalysisJobEvent.id > last_id))
+        .where(where)
+        .order_by(AnalysisJobEvent.id)
+        .limit(_STREAM_EVENT_BATCH)
+    ).all()
+    if not rows:
+        return None, [], None
+    # A job without new events still yields one row, with NULL event columns from the outer join.
+    events = [_event_payload(row) for row in rows if row.id is not None]
+    job = rows[0]
+    if len(events) >= _STREAM_EVENT_BATCH:
+        return job, events, None
+    return job, events, {"status": job.status, "error_message": _safe_error_message(settings, job.error_message)}
+
+
+def _sse_frame(event: bytes, payload: dict) -> bytes:
+    return b"event: " + event + b"\ndata: " + orjson.dumps(payload) + b"\n\n"
+
+
+async def _sse_event_stream(request: Request, *, poll: _StreamPoll, slot_key: str | None, job_id: str):
+    # Each poll runs on a worker thread and closes its session before anything is yielded, so neither a
+    # query nor a slow client holds up the event loop or a pooled connection.
+    listener = job_event_listener()
+    wakeup = listener.subscribe(job_id) if listener is not None else None
+    last_id = 0
+    empty_polls = 0
+    try:
+        while True:
+            if await request.is_disconnected():
+                break
+
+            if wakeup is not None:
+                # Cleared before polling, so a notification landing mid-poll still triggers the next one.
+                wakeup.clear()
+            result = await to_thread.run_sync(poll, last_id)
+            if result is None:
+                break
+            events, status = result
+            # Everything from one poll goes out as a single chunk, i.e. one ASGI send rather than one per frame.
+            frames = [_sse_frame(b"progress", event) for event in events]
+            done = status is not None and status["status"] in _TERMINAL_STATUSES
+            if status is not None:
+                frames.append(_sse_frame(b"status", status))
+            if done:
+                frames.append(_sse_frame(b"done", {"status": status["status"]}))
+            if frames:
+                yield b"".join(frames)
+            if done:
+                break
+            if events:
+                last_id = events[-1]["id"]
+                empty_polls = 0
+                if status is None:
+                    # A full batch without a status: more events are already waiting.
+                    continue
+
+            if wakeup is None or not listener.running:
+                # Also while the listener reconnects, since notifications sent meanwhile are lost.
+                # Events arrive in bursts while a stage runs: stay quick right after one, slow down when idle.
+                if not events:
+                    empty_polls += 1
+                await asyncio.sleep(min(_STREAM_POLL_MAX_SECONDS, _STREAM_POLL_MIN_SECONDS * 2 ** min(empty_polls, 8)))
+            else:
+                with suppress(TimeoutError):
+                    await asyncio.wait_for(wakeup.wait(), _STREAM_HEARTBEAT_SECONDS)
+    finally:
+        if wakeup is not None:
+            listener.unsubscribe(job_id, wakeup)
+        release_stream_slot(slot_key)
+
+
 @router.get("/api/jobs/{job_id}/stream")
 async def job_stream(
     request: Request,
@@ -1364,53 +1513,25 @@ async def job_stream(
         max_active=settings.rate_limit_stream,
     )
 
-    with SessionLocal() as db:
-        job_exists = db.scalar(select(AnalysisJob.id).where(AnalysisJob.id == job_id, AnalysisJob.user_id == user.id))
-        if not job_exists:
-            raise HTTPException(status_code=404)
-
-    async def event_stream():
-        last_id = 0
-        terminal = {
-            JobStatus.completed.value,
-            JobStatus.failed.value,
-            JobStatus.canceled.value,
-        }
-        try:
-            while True:
-                if await request.is_disconnected():
-                    break
-
-                with SessionLocal() as db:
-                    rows = db.execute(
-                        select(AnalysisJobEvent)
-                        .where(AnalysisJobEvent.job_id == job_id, AnalysisJobEvent.id > last_id)
-                        .order_by(AnalysisJobEvent.id)
-                    ).scalars().all()
-                    for ev in rows:
-                        payload = json.dumps(_event_payload(ev), ensure_ascii=False)
-                        yield f"event: progress\ndata: {payload}\n\n"
-                    if rows:
-                        last_id = rows[-1].id
-
-                    job = db.get(AnalysisJob, job_id)
-                    if job:
-                        status_payload = json.dumps(
-                            {"status": job.status, "error_message": _safe_error_message(settings, job.error_message)},
-                            ensure_ascii=False,
-                        )
-                        yield f"event: status\ndata: {status_payload}\n\n"
-                        if job.status in terminal:
-                            done_payload = json.dumps({"status": job.status}, ensure_ascii=False)
-                            yield f"event: done\ndata: {done_payload}\n\n"
-                            break
-
-                await asyncio.sleep(1.0)
-        finally:
-            release_stream_slot(slot_key)
+    def job_exists() -> bool:
+        with SessionLocal() as db:
+            return bool(db.scalar(select(exists().where(AnalysisJob.id == job_id, AnalysisJob.user_id == user.id))))
+
+    if not await to_thread.run_sync(job_exists):
+        release_stream_slot(slot_key)
+        raise HTTPException(status_code=404)
+
+    def poll(last_id: int) -> tuple[list[dict], dict | None]:
+        with SessionLocal() as db:
+            _job, events, status = _poll_stream(db, settings, AnalysisJob.id == job_id, last_id)
+            return events, status
 
     headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
-    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=headers)
+    return StreamingResponse(
+        _sse_event_stream(request, poll=poll, slot_key=slot_key, job_id=job_id),
+        media_type="text/event-stream",
+        headers=headers,
+    )
 
 
 @router.get("/api/reports/{token}/stream")
@@ -1435,51 +1556,29 @@ async def report_stream(
         max_active=settings.rate_limit_stream,
     )
 
-    with SessionLocal() as db:
-        _require_access_job(db, token_hash)
+    def check_access() -> str:
+        with SessionLocal() as db:
+            return _require_access_job(db, token_hash).id
 
-    async def event_stream():
-        last_id = 0
-        terminal = {
-            JobStatus.completed.value,
-            JobStatus.failed.value,
-            JobStatus.canceled.value,
-        }
-        try:
-            while True:
-                if await request.is_disconnected():
-                    break
-
-                with SessionLocal() as db:
-                    try:
-                        job = _require_access_job(db, token_hash)
-                    except HTTPException:
-                        break
-
-                    rows = db.execute(
-                        select(AnalysisJobEvent)
-                        .where(AnalysisJobEvent.job_id == job.id, AnalysisJobEvent.id > last_id)
-                        .order_by(AnalysisJobEvent.id)
-                    ).scalars().all()
-                    for ev in rows:
-                        payload = json.dumps(_event_payload(ev), ensure_ascii=False)
-                        yield f"event: progress\ndata: {payload}\n\n"
-                    if rows:
-                        last_id = rows[-1].id
-
-                    status_payload = json.dumps(
-                        {"status": job.status, "error_message": _safe_error_message(settings, job.error_message)},
-                        ensure_ascii=False,
-                    )
-                    yield f"event: status\ndata: {status_payload}\n\n"
-                    if job.status in terminal:
-                        done_payload = json.dumps({"status": job.status}, ensure_ascii=False)
-                        yield f"event: done\ndata: {done_payload}\n\n"
-                        break
-
-                await asyncio.sleep(1.0)
-        finally:
-            release_stream_slot(slot_key)
+    try:
+        job_id = await to_thread.run_sync(check_access)
+    except HTTPException:
+        release_stream_slot(slot_key)
+        raise
+
+    def poll(last_id: int) -> tuple[list[dict], dict | None] | None:
+        with SessionLocal() as db:
+            job, events, status = _poll_stream(db, settings, AnalysisJob.access_token_hash == token_hash, last_id)
+        if job is None:
+            return None
+        expires_at = _as_utc(job.access_token_expires_at)
+        if expires_at is not None and expires_at < dt.datetime.now(dt.UTC):
+            return None
+        return events, status
 
     headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
-    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=headers)
+    return StreamingResponse(
+        _sse_event_stream(request, poll=poll, slot_key=slot_key, job_id=job_id),
+        media_type="text/event-stream",
+        headers=headers,
+    )
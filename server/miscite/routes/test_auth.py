@@ -0,0 +1,28 @@
+import unittest
+from unittest import mock
+
+from server.miscite.core.config import Settings
+from server.miscite.routes import auth
+
+
+class TestSendLoginCode(unittest.TestCase):
+    def test_retries_then_gives_up_without_raising(self) -> None:
+        settings = Settings.from_env()
+        with (
+            mock.patch.object(auth, "send_login_code_email", side_effect=[RuntimeError("down"), None]) as send,
+            mock.patch.object(auth.time, "sleep") as sleep,
+        ):
+            auth._send_login_code(settings, to_email="x@example.com", code="123456")
+        self.assertEqual(send.call_count, 2)
+        sleep.assert_called_once_with(1)
+
+        with (
+            mock.patch.object(auth, "send_login_code_email", side_effect=RuntimeError("down")) as send,
+            mock.patch.object(auth.time, "sleep"),
+        ):
+            auth._send_login_code(settings, to_email="x@example.com", code="123456")
+        self.assertEqual(send.call_count, auth._LOGIN_EMAIL_ATTEMPTS)
+
+
+if __name__ == "__main__":
+    unittest.main()
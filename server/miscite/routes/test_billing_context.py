@@ -0,0 +1,105 @@
+import datetime as dt
+import tempfile
+import unittest
+from dataclasses import replace
+from pathlib import Path
+from types import SimpleNamespace
+
+from sqlalchemy import text
+
+from server.miscite.core.config import Settings
+from server.miscite.core.db import count_statements, get_engine, get_sessionmaker
+from server.miscite.core.migrations import upgrade_to_head
+from server.miscite.core.models import BillingAccount, BillingTransaction, User
+from server.miscite.routes import billing
+
+
+class TestBillingAccountAndTransactions(unittest.TestCase):
+    def test_account_and_latest_transactions_load_in_one_query(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = replace(
+                Settings.from_env(),
+                db_url=f"sqlite:///{Path(tmp) / 'billing.db'}",
+                billing_enabled=True,
+            )
+            upgrade_to_head(settings)
+            db = get_sessionmaker(settings)()
+            try:
+                user = User(id="u1", email="u1@example.com", password_hash="!")
+                db.add_all([user, BillingAccount(user_id="u1", balance_cents=1200)])
+                start = dt.datetime(2026, 1, 1)
+                db.add_all(
+                    BillingTransaction(
+                        user_id="u1",
+                        kind="topup",
+                        amount_cents=100,
+                        balance_after_cents=100 * (i + 1),
+                        created_at=start + dt.timedelta(minutes=i),
+                    )
+                    for i in range(12)
+                )
+                db.commit()
+                db.expunge_all()
+
+                engine = get_engine(settings)
+                request = SimpleNamespace(state=SimpleNamespace())
+                with count_statements(engine) as statements:
+                    account, transactions = billing._billing_account_and_transactions(
+                        request, db, user=user, settings=settings
+                    )
+
+                self.assertEqual(len(statements), 1)
+                self.assertEqual(account.balance_cents, 1200)
+                self.assertIs(request.state.billing_account, account)
+                self.assertEqual([txn.balance_after_cents for txn in transactions], [100 * i for i in range(12, 2, -1)])
+
+                # A handler that already loaded the account only fetches the activity rows.
+                _account, again = billing._billing_account_and_transactions(request, db, user=user, settings=settings)
+                self.assertEqual([txn.kind for txn in again], ["topup"] * 10)
+                self.assertEqual(again[0].created_at, start + dt.timedelta(minutes=11))
+
+                other = User(id="u2", email="u2@example.com", password_hash="!")
+                db.add(other)
+                db.commit()
+                with count_statements(engine) as statements:
+                    account, transactions = billing._billing_account_and_transactions(
+                        SimpleNamespace(state=SimpleNamespace()), db, user=other, settings=settings
+                    )
+                self.assertEqual((account.user_id, transactions), ("u2", []))
+                # First visit: the joined lookup plus a single upsert, no second SELECT.
+                self.assertEqual(len(statements), 2)
+            finally:
+                db.close()
+
+    def test_recent_transactions_walk_the_user_created_at_index(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = replace(Settings.from_env(), db_url=f"sqlite:///{Path(tmp) / 'billing.db'}")
+            upgrade_to_head(settings)
+            query = billing._recent_transactions_query("u1", limit=10)
+            sql = str(query.compile(get_engine(settings), compile_kwargs={"literal_binds": True}))
+            with get_engine(settings).connect() as conn:
+                plan = " ".join(row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+            # Ordered by the index itself: the LIMIT stops after 10 entries however long the history is.
+            self.assertIn("ix_billing_transactions_user_created_at", plan)
+            self.assertNotIn("TEMP B-TREE", plan)
+
+
+class TestBillingSettingsContext(unittest.TestCase):
+    def test_built_once_per_app(self) -> None:
+        settings = replace(
+            Settings.from_env(),
+            billing_enabled=True,
+            billing_min_charge_cents=500,
+            stripe_secret_key="sk_test",
+            stripe_webhook_secret="",
+        )
+        app = SimpleNamespace(state=SimpleNamespace())
+        first = billing._billing_settings_context(SimpleNamespace(app=app), settings=settings)
+        second = billing._billing_settings_context(SimpleNamespace(app=app), settings=settings)
+        self.assertIs(first, second)
+        self.assertEqual(first["min_charge_display"], "$5.00")
+        self.assertEqual((first["stripe_configured"], first["stripe_ready"]), (True, False))
+
+
+if __name__ == "__main__":
+    unittest.main()
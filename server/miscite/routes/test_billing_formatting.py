@@ -1,4 +1,5 @@
 import unittest
+from unittest import mock
 
 from server.miscite.routes import billing
 
@@ -14,6 +15,11 @@ class TestBillingFormatting(unittest.TestCase):
         self.assertEqual(cents, 101)
         self.assertIsNone(error)
 
+    def test_parse_amount_to_cents_currency_symbol_skips_decimal(self):
+        with mock.patch.object(billing, "Decimal", side_effect=AssertionError("slow path")):
+            self.assertEqual(billing._parse_amount_to_cents(" $ 12.50 "), (1250, None))
+            self.assertEqual(billing._parse_amount_to_cents("7 $"), (700, None))
+
     def test_parse_amount_to_cents_invalid(self):
         cents, error = billing._parse_amount_to_cents("")
         self.assertIsNone(cents)
@@ -27,13 +33,17 @@ class TestBillingFormatting(unittest.TestCase):
         self.assertIsNone(cents)
         self.assertEqual(error, "Amount must be greater than zero.")
 
-    def test_format_currency(self):
-        self.assertEqual(billing._format_currency(1234), "$12.34")
-        self.assertEqual(billing._format_currency(-11), "-$0.11")
-
-    def test_format_amount(self):
-        self.assertEqual(billing._format_amount(500), "+$5.00")
-        self.assertEqual(billing._format_amount(-500), "-$5.00")
+    def test_is_local_dev_host(self):
+        self.assertTrue(billing._is_local_dev_host("LOCALHOST"))
+        self.assertTrue(billing._is_local_dev_host("miscite.local"))
+        self.assertFalse(billing._is_local_dev_host("miscite.review"))
+        self.assertFalse(billing._is_local_dev_host(None))
+
+    def test_success_message_accepts_both_separators(self):
+        self.assertEqual(billing._success_message("auto-charge-enabled"), ("Auto-charge enabled.", "auto_charge"))
+        self.assertEqual(billing._success_message(" AUTO_CHARGE_SAVED "), ("Saved auto-charge settings.", "auto_charge"))
+        self.assertEqual(billing._success_message("unknown"), (None, None))
+        self.assertEqual(billing._success_message(None), (None, None))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,227 @@
+import tempfile
+import threading
+import unittest
+from dataclasses import replace
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+import anyio
+from fastapi import BackgroundTasks, HTTPException
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from server.miscite.core.config import Settings
+from server.miscite.core.db import get_sessionmaker
+from server.miscite.core.migrations import upgrade_to_head
+from server.miscite.core.models import BillingAccount, BillingTransaction, User
+from server.miscite.routes import billing
+
+
+class TestWebhookFollowUps(unittest.TestCase):
+    def test_finish_topup_sets_default_card_and_sends_receipt(self) -> None:
+        settings = Settings.from_env()
+        intent = {"payment_method": "pm_1", "charges": {"data": [{"receipt_url": "https://r"}]}}
+        sdk = mock.Mock()
+        with (
+            mock.patch.object(billing, "_retrieve_payment_intent_with_receipt", return_value=intent),
+            mock.patch.object(billing, "stripe_sdk", return_value=sdk),
+            mock.patch.object(billing, "send_billing_receipt_email") as send,
+        ):
+            billing._finish_topup(
+                settings,
+                user_id="u1",
+                user_email="u1@example.com",
+                customer_id="cus_1",
+                payment_intent_id="pi_1",
+                amount_cents=500,
+                currency="usd",
+                occurred_at=None,
+            )
+        sdk.Customer.modify.assert_called_once_with("cus_1", invoice_settings={"default_payment_method": "pm_1"})
+        self.assertEqual(send.call_args.kwargs["receipt_url"], "https://r")
+        self.assertEqual(send.call_args.kwargs["to_email"], "u1@example.com")
+
+    def test_auto_charge_receipt_failure_is_logged_not_raised(self) -> None:
+        with mock.patch.object(billing, "send_billing_receipt_email", side_effect=RuntimeError("down")):
+            billing._send_auto_charge_receipt(
+                Settings.from_env(),
+                user_id="u1",
+                user_email="u1@example.com",
+                intent={"charges": {"data": [{"receipt_url": "https://r"}]}},
+                payment_intent_id="pi_1",
+                amount_cents=500,
+                currency="usd",
+                occurred_at=None,
+            )
+
+
+class TestBillingWebhookHandler(unittest.TestCase):
+    def _post(self, payload: bytes, event: dict) -> tuple[dict, mock.Mock, list[int]]:
+        settings = replace(
+            Settings.from_env(),
+            billing_enabled=True,
+            stripe_secret_key="sk_test",
+            stripe_webhook_secret="whsec_test",
+        )
+
+        async def _stream():
+            # Delivered in two chunks, as a chunked-encoding body would be.
+            yield payload[:5]
+            yield payload[5:]
+
+        request = SimpleNamespace(
+            app=SimpleNamespace(state=SimpleNamespace(settings=settings)),
+            headers={"stripe-signature": "t=1,v1=x"},
+            stream=_stream,
+        )
+        sdk = mock.Mock()
+        sdk.Webhook.construct_event.return_value = event
+        applied_on: list[int] = []
+
+        async def _run() -> dict:
+            loop_thread = threading.get_ident()
+            with (
+                mock.patch.object(billing, "stripe_sdk", return_value=sdk),
+                mock.patch.object(
+                    billing, "_apply_webhook_event", side_effect=lambda *_a, **_k: applied_on.append(threading.get_ident())
+                ),
+            ):
+                response = await billing.billing_webhook(request, BackgroundTasks(), db=mock.Mock())
+            self.assertNotIn(loop_thread, applied_on)
+            return response
+
+        return anyio.run(_run), sdk, applied_on
+
+    def test_event_is_applied_on_a_worker_thread(self) -> None:
+        payload = b'{"type": "payment_intent.succeeded"}'
+        event = {"type": "payment_intent.succeeded", "data": {"object": {"metadata": {"flow": "auto_charge"}}}}
+        response, sdk, applied_on = self._post(payload, event)
+        self.assertEqual(response, {"received": True})
+        self.assertEqual(len(applied_on), 1)
+        sdk.Webhook.construct_event.assert_called_once_with(payload=payload, sig_header="t=1,v1=x", secret="whsec_test")
+
+    def test_unhandled_event_types_are_acknowledged_without_verification(self) -> None:
+        response, sdk, applied_on = self._post(b'{"type": "invoice.paid"}', {"type": "invoice.paid"})
+        self.assertEqual(response, {"received": True})
+        sdk.Webhook.construct_event.assert_not_called()
+        self.assertEqual(applied_on, [])
+
+    def test_irrelevant_handled_events_skip_the_db(self) -> None:
+        event = {"type": "checkout.session.completed", "data": {"object": {"mode": "subscription"}}}
+        response, sdk, applied_on = self._post(b'{"type": "checkout.session.completed"}', event)
+        self.assertEqual(response, {"received": True})
+        sdk.Webhook.construct_event.assert_called_once()
+        self.assertEqual(applied_on, [])
+
+    def test_oversized_payload_is_rejected_while_streaming(self) -> None:
+        payload = b'{"type": "checkout.session.completed", "pad": "' + b"x" * billing._WEBHOOK_MAX_BODY_BYTES + b'"}'
+        with self.assertRaises(HTTPException) as ctx:
+            self._post(payload, {})
+        self.assertEqual(ctx.exception.status_code, 413)
+
+
+class TestAlreadyRecorded(unittest.TestCase):
+    def test_matches_either_stripe_id(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = replace(Settings.from_env(), db_url=f"sqlite:///{Path(tmp) / 'webhook.db'}")
+            upgrade_to_head(settings)
+            db = get_sessionmaker(settings)()
+            try:
+                db.add(User(id="u1", email="u1@example.com", password_hash="!"))
+                db.add(
+                    BillingTransaction(
+                        user_id="u1",
+                        kind="topup",
+                        amount_cents=100,
+                        balance_after_cents=100,
+                        stripe_checkout_session_id="cs_1",
+                        stripe_payment_intent_id="pi_1",
+                    )
+                )
+                db.commit()
+                self.assertTrue(billing._already_recorded(db, session_id="cs_1"))
+                self.assertTrue(billing._already_recorded(db, session_id="cs_2", payment_intent_id="pi_1"))
+                self.assertFalse(billing._already_recorded(db, session_id="cs_2", payment_intent_id="pi_2"))
+                self.assertFalse(billing._already_recorded(db))
+            finally:
+                db.close()
+
+
+class TestApplyWebhookEvent(unittest.TestCase):
+    def test_checkout_completed_credits_once_and_schedules_follow_up(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = replace(Settings.from_env(), db_url=f"sqlite:///{Path(tmp) / 'webhook.db'}")
+            upgrade_to_head(settings)
+            db = get_sessionmaker(settings)()
+            try:
+                db.add(User(id="u1", email="u1@example.com", password_hash="!"))
+                db.commit()
+                event = {
+                    "type": "checkout.session.completed",
+                    "data": {
+                        "object": {
+                            "id": "cs_1",
+                            "mode": "payment",
+                            "amount_total": 700,
+                            "currency": "usd",
+                            "payment_intent": "pi_1",
+                            "customer": "cus_1",
+                            "metadata": {"user_id": "u1"},
+                        }
+                    },
+                }
+                first, replay = BackgroundTasks(), BackgroundTasks()
+                billing._apply_webhook_event(event, settings=settings, db=db, background_tasks=first)
+                billing._apply_webhook_event(event, settings=settings, db=db, background_tasks=replay)
+                self.assertEqual([task.func for task in first.tasks], [billing._finish_topup])
+                self.assertEqual(replay.tasks, [])
+
+                account = db.scalar(select(BillingAccount))
+                self.assertEqual((account.balance_cents, account.stripe_customer_id), (700, "cus_1"))
+            finally:
+                db.close()
+
+    def test_auto_charge_succeeded_settles_in_one_transaction(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = replace(Settings.from_env(), db_url=f"sqlite:///{Path(tmp) / 'webhook.db'}")
+            upgrade_to_head(settings)
+            db = get_sessionmaker(settings)()
+            try:
+                db.add(User(id="u1", email="u1@example.com", password_hash="!"))
+                db.add(BillingAccount(user_id="u1", balance_cents=100, auto_charge_in_flight=True))
+                db.commit()
+                commits: list[Session] = []
+                event.listen(db, "after_commit", commits.append)
+                tasks = BackgroundTasks()
+                billing._apply_webhook_event(
+                    {
+                        "type": "payment_intent.succeeded",
+                        "data": {
+                            "object": {
+                                "id": "pi_auto",
+                                "amount_received": 900,
+                                "currency": "usd",
+                                "customer": "cus_9",
+                                "metadata": {"user_id": "u1", "flow": "auto_charge"},
+                            }
+                        },
+                    },
+                    settings=settings,
+                    db=db,
+                    background_tasks=tasks,
+                )
+                self.assertEqual(len(commits), 1)
+                self.assertEqual([task.func for task in tasks.tasks], [billing._send_auto_charge_receipt])
+
+                account = db.scalar(select(BillingAccount))
+                self.assertEqual(
+                    (account.balance_cents, account.stripe_customer_id, account.auto_charge_in_flight),
+                    (1000, "cus_9", False),
+                )
+            finally:
+                db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,493 @@
+import datetime as dt
+import math
+import tempfile
+import threading
+import time
+import unittest
+from dataclasses import replace
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+import anyio
+from sqlalchemy import lambda_stmt, select
+
+from server.miscite.core.config import Settings
+from server.miscite.core.db import count_statements, get_engine, get_sessionmaker
+from server.miscite.core.job_events import JobEventListener
+from server.miscite.core.migrations import upgrade_to_head
+from server.miscite.core.models import AnalysisJob, AnalysisJobEvent, Document, User
+from server.miscite.routes import dashboard
+
+
+class TestSseEventStream(unittest.TestCase):
+    def test_polls_off_the_loop_until_a_terminal_status(self) -> None:
+        async def _connected() -> bool:
+            return False
+
+        async def _no_sleep(_seconds: float) -> None:
+            return None
+
+        request = SimpleNamespace(is_disconnected=_connected)
+        results = [
+            ([{"id": 3, "stage": "parse"}], {"status": "RUNNING", "error_message": None}),
+            ([], {"status": "COMPLETED", "error_message": None}),
+        ]
+        polled: list[tuple[int, int]] = []
+
+        def poll(last_id: int):
+            polled.append((last_id, threading.get_ident()))
+            return results.pop(0)
+
+        async def _run() -> tuple[list[bytes], int]:
+            chunks = [chunk async for chunk in dashboard._sse_event_stream(request, poll=poll, slot_key="k", job_id="j")]
+            return chunks, threading.get_ident()
+
+        with (
+            mock.patch.object(dashboard.asyncio, "sleep", _no_sleep),
+            mock.patch.object(dashboard, "release_stream_slot") as release,
+        ):
+            chunks, loop_thread = anyio.run(_run)
+
+        self.assertEqual([last_id for last_id, _thread in polled], [0, 3])
+        self.assertNotIn(loop_thread, [thread for _last_id, thread in polled])
+        # One chunk per poll, each carrying that poll's frames.
+        self.assertEqual(
+            [[frame.split(b"\n", 1)[0] for frame in chunk.split(b"\n\n") if frame] for chunk in chunks],
+            [[b"event: progress", b"event: status"], [b"event: status", b"event: done"]],
+        )
+        self.assertEqual(chunks[0].split(b"\n\n")[0], b'event: progress\ndata: {"id":3,"stage":"parse"}')
+        release.assert_called_once_with("k")
+
+    def test_backs_off_while_idle_and_resets_on_new_events(self) -> None:
+        async def _connected() -> bool:
+            return False
+
+        delays: list[float] = []
+
+        async def _record_sleep(seconds: float) -> None:
+            delays.append(seconds)
+
+        request = SimpleNamespace(is_disconnected=_connected)
+        running = {"status": "RUNNING", "error_message": None}
+        results = [([{"id": 1}], running)] + [([], running)] * 5 + [([{"id": 2}], running), ([], {"status": "FAILED"})]
+
+        def poll(_last_id: int):
+            return results.pop(0)
+
+        async def _run() -> list[bytes]:
+            return [chunk async for chunk in dashboard._sse_event_stream(request, poll=poll, slot_key=None, job_id="j")]
+
+        with (
+            mock.patch.object(dashboard, "job_event_listener", return_value=None),
+            mock.patch.object(dashboard.asyncio, "sleep", _record_sleep),
+        ):
+            anyio.run(_run)
+
+        self.assertEqual(delays, [0.25, 0.5, 1.0, 2.0, 4.0, 5.0, 0.25])
+
+    def test_poll_returning_none_ends_the_stream(self) -> None:
+        async def _connected() -> bool:
+            return False
+
+        request = SimpleNamespace(is_disconnected=_connected)
+
+        async def _run() -> list[bytes]:
+            return [chunk async for chunk in dashboard._sse_event_stream(request, poll=lambda _last_id: None, slot_key=None, job_id="j")]
+
+        self.assertEqual(anyio.run(_run), [])
+
+    def test_waits_for_a_notification_instead_of_polling_on_a_timer(self) -> None:
+        async def _connected() -> bool:
+            return False
+
+        request = SimpleNamespace(is_disconnected=_connected)
+        listener = JobEventListener()
+        listener._running = True
+        results = [
+            ([], {"status": "RUNNING", "error_message": None}),
+            ([{"id": 1, "stage": "done"}], {"status": "COMPLETED", "error_message": None}),
+        ]
+
+        def poll(_last_id: int):
+            # Simulates the worker's commit landing while the stream is between polls.
+            listener.dispatch("j")
+            return results.pop(0)
+
+        async def _run() -> list[bytes]:
+            return [chunk async for chunk in dashboard._sse_event_stream(request, poll=poll, slot_key=None, job_id="j")]
+
+        with (
+            mock.patch.object(dashboard, "job_event_listener", return_value=listener),
+            mock.patch.object(dashboard, "_STREAM_HEARTBEAT_SECONDS", 60.0),
+            mock.patch.object(dashboard, "_STREAM_POLL_MIN_SECONDS", 60.0),
+        ):
+            started = time.monotonic()
+            chunks = anyio.run(_run)
+
+        self.assertLess(time.monotonic() - started, 10.0)
+        self.assertTrue(chunks[-1].endswith(b'event: done\ndata: {"status":"COMPLETED"}\n\n'))
+        self.assertEqual(listener._waiters, {})
+
+    def test_polls_while_the_listener_is_disconnected(self) -> None:
+        async def _connected() -> bool:
+            return False
+
+        slept: list[float] = []
+
+        async def _sleep(seconds: float) -> None:
+            slept.append(seconds)
+
+        request = SimpleNamespace(is_disconnected=_connected)
+        listener = JobEventListener()
+        results = [
+            ([], {"status": "RUNNING", "error_message": None}),
+            ([], {"status": "COMPLETED", "error_message": None}),
+        ]
+
+        def poll(_last_id: int):
+            return results.pop(0)
+
+        async def _run() -> list[bytes]:
+            return [chunk async for chunk in dashboard._sse_event_stream(request, poll=poll, slot_key=None, job_id="j")]
+
+        with (
+            mock.patch.object(dashboard, "job_event_listener", return_value=listener),
+            mock.patch.object(dashboard.asyncio, "sleep", _sleep),
+        ):
+            chunks = anyio.run(_run)
+
+        # Subscribed, but nothing would ever wake the stream: it falls back to the backoff poll.
+        self.assertEqual(slept, [dashboard._STREAM_POLL_MIN_SECONDS * 2])
+        self.assertTrue(chunks[-1].endswith(b'event: done\ndata: {"status":"COMPLETED"}\n\n'))
+        self.assertEqual(listener._waiters, {})
+
+
+class TestLatestJobRow(unittest.TestCase):
+    def test_reuses_the_newest_listing_and_queries_otherwise(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = replace(Settings.from_env(), db_url=f"sqlite:///{Path(tmp) / 'dashboard.db'}")
+            upgrade_to_head(settings)
+            db = get_sessionmaker(settings)()
+            try:
+                db.add(User(id="u1", email="u1@example.com", password_hash="!"))
+                db.commit()
+                start = dt.datetime(2026, 1, 1)
+                for i in range(3):
+                    db.add(
+                        Document(
+                            id=f"d{i}",
+                            user_id="u1",
+                            original_filename=f"paper{i}.pdf",
+                            content_type="application/pdf",
+                            storage_path=f"/tmp/d{i}",
+                            sha256=bytes([i]) * 32,
+                        )
+                    )
+                db.commit()
+                db.add_all(
+                    AnalysisJob(id=f"j{i}", user_id="u1", document_id=f"d{i}", created_at=start + dt.timedelta(days=i))
+                    for i in range(3)
+                )
+                db.commit()
+
+                listed = ["first-listed-row"]
+                with mock.patch.object(db, "execute", side_effect=AssertionError("queried")):
+                    self.assertEqual(
+                        dashboard._latest_job_row(db, user_id="u1", listed=listed, listed_is_newest=True),
+                        "first-listed-row",
+                    )
+                    self.assertIsNone(dashboard._latest_job_row(db, user_id="u1", listed=[], listed_is_newest=True))
+
+                latest = dashboard._latest_job_row(db, user_id="u1", listed=[], listed_is_newest=False)
+                self.assertEqual((latest.id, latest.original_filename), ("j2", "paper2.pdf"))
+                item = dashboard._job_list_item(Settings.from_env(), latest)
+                self.assertEqual((item["filename"], item["status"]), ("paper2.pdf", "PENDING"))
+                self.assertEqual(item["created_at"], dt.datetime(2026, 1, 3))
+            finally:
+                db.close()
+
+
+class TestFilteredJobs(unittest.TestCase):
+    def test_cached_lambda_statements_bind_each_calls_filters(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = replace(Settings.from_env(), db_url=f"sqlite:///{Path(tmp) / 'dashboard.db'}")
+            upgrade_to_head(settings)
+            db = get_sessionmaker(settings)()
+            try:
+                db.add_all(User(id=f"u{i}", email=f"u{i}@example.com", password_hash="!") for i in (1, 2))
+                db.commit()
+                names = ["alpha.pdf", "beta.pdf", "alpha-2.pdf", "alpha-other.pdf"]
+                db.add_all(
+                    Document(
+                        id=f"d{i}",
+                        user_id="u2" if i == 3 else "u1",
+                        original_filename=name,
+                        content_type="application/pdf",
+                        storage_path=f"/tmp/d{i}",
+                        sha256=bytes([i]) * 32,
+                    )
+                    for i, name in enumerate(names)
+                )
+                db.commit()
+                statuses = ["COMPLETED", "FAILED", "RUNNING", "COMPLETED"]
+                db.add_all(
+                    AnalysisJob(
+                        id=f"j{i}",
+                        user_id="u2" if i == 3 else "u1",
+                        document_id=f"d{i}",
+                        status=status,
+                        created_at=dt.datetime(2026, 1, 1 + i),
+                    )
+                    for i, status in enumerate(statuses)
+                )
+                db.commit()
+
+                def _ids(user_id: str, q: str | None, status_filter: str) -> list[str]:
+                    stmt = dashboard._filtered_jobs(
+                        lambda_stmt(lambda: select(AnalysisJob.id)), user_id=user_id, q=q, status_filter=status_filter
+                    )
+                    stmt += lambda s: s.order_by(AnalysisJob.id)
+                    return list(db.scalars(stmt))
+
+                self.assertEqual(_ids("u1", None, "all"), ["j0", "j1", "j2"])
+                self.assertEqual(_ids("u1", "alpha", "all"), ["j0", "j2"])
+                self.assertEqual(_ids("u1", "beta", "all"), ["j1"])
+                self.assertEqual(_ids("u1", "alpha", "completed"), ["j0"])
+                self.assertEqual(_ids("u1", None, "processing"), ["j2"])
+                self.assertEqual(_ids("u1", None, "failed"), ["j1"])
+                self.assertEqual(_ids("u2", "alpha", "completed"), ["j3"])
+
+                def _page(sort_choice: str, q: str | None = None, limit: int = 25) -> list[tuple[str, str]]:
+                    rows = dashboard._job_list_page(
+                        db, user_id="u1", q=q, status_filter="all", sort_choice=sort_choice, limit=limit
+                    )
+                    return [(row.id, row.original_filename) for row in rows]
+
+                # Each sort is checked back to back, so a cached statement leaking across sorts would show up.
+                self.assertEqual(_page("newest"), [("j2", "alpha-2.pdf"), ("j1", "beta.pdf"), ("j0", "alpha.pdf")])
+                self.assertEqual(_page("oldest", limit=2), [("j0", "alpha.pdf"), ("j1", "beta.pdf")])
+                self.assertEqual([job_id for job_id, _name in _page("status")], ["j0", "j1", "j2"])
+                self.assertEqual(_page("newest", q="alpha", limit=1), [("j2", "alpha-2.pdf")])
+            finally:
+                db.close()
+
+
+class TestDashboardCounts(unittest.TestCase):
+    def test_counts_come_from_the_status_tallies_unless_searching(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = replace(
+                Settings.from_env(), db_url=f"sqlite:///{Path(tmp) / 'dashboard.db'}", billing_enabled=False
+            )
+            upgrade_to_head(settings)
+            db = get_sessionmaker(settings)()
+            try:
+                db.add(User(id="u1", email="u1@example.com", password_hash="!"))
+                db.commit()
+                db.add_all(
+                    Document(
+                        id=f"d{i}",
+                        user_id="u1",
+                        original_filename=f"paper{i}.pdf",
+                        content_type="application/pdf",
+                        storage_path=f"/tmp/d{i}",
+                        sha256=bytes([i]) * 32,
+                    )
+                    for i in range(4)
+                )
+                db.commit()
+                statuses = ["COMPLETED", "FAILED", "CANCELED", "RUNNING"]
+                db.add_all(
+                    AnalysisJob(id=f"j{i}", user_id="u1", document_id=f"d{i}", status=status)
+                    for i, status in enumerate(statuses)
+                )
+                db.commit()
+
+                app = SimpleNamespace(state=SimpleNamespace(settings=settings))
+                request = SimpleNamespace(state=SimpleNamespace(), app=app)
+
+                def _render(q: str | None, status: str | None) -> dict:
+                    with (
+                        mock.patch.object(dashboard, "template_context", side_effect=lambda _request, **ctx: ctx),
+                        mock.patch.object(dashboard.templates, "TemplateResponse", side_effect=lambda _name, ctx: ctx),
+                    ):
+                        return dashboard.dashboard(
+                            request, user=SimpleNamespace(id="u1"), db=db, q=q, status=status, sort=None
+                        )
+
+                with count_statements(get_engine(settings)) as statements:
+                    ctx = _render(None, "failed")
+                # Billing account, per-status tallies, the page and (as the view is filtered) the latest job.
+                self.assertEqual(len(statements), 4)
+                self.assertFalse(any("count(*)" in sql.lower() and "GROUP BY" not in sql for sql in statements))
+                self.assertEqual((ctx["total_jobs"], ctx["matching_count"]), (4, 2))
+                self.assertEqual((ctx["completed_count"], ctx["failed_count"], ctx["processing_count"]), (1, 2, 1))
+
+                ctx = _render("paper1", "failed")
+                self.assertEqual(ctx["matching_count"], 1)
+                self.assertEqual([job["id"] for job in ctx["jobs"]], ["j1"])
+            finally:
+                db.close()
+
+
+class TestPollStream(unittest.TestCase):
+    def test_reads_status_and_new_events_in_one_statement(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = replace(Settings.from_env(), db_url=f"sqlite:///{Path(tmp) / 'dashboard.db'}")
+            upgrade_to_head(settings)
+            db = get_sessionmaker(settings)()
+            try:
+                db.add(User(id="u1", email="u1@example.com", password_hash="!"))
+                db.commit()
+                db.add(
+                    Document(
+                        id="d1",
+                        user_id="u1",
+                        original_filename="paper.pdf",
+                        content_type="application/pdf",
+                        storage_path="/tmp/d1",
+                        sha256=b"\x01" * 32,
+                    )
+                )
+                db.commit()
+                db.add(AnalysisJob(id="j1", user_id="u1", document_id="d1", status="COMPLETED"))
+                db.commit()
+                db.add_all(AnalysisJobEvent(job_id="j1", stage=f"s{i}") for i in range(3))
+                db.commit()
+
+                where = AnalysisJob.id == "j1"
+                with count_statements(get_engine(settings)) as statements:
+                    job, events, status = dashboard._poll_stream(db, settings, where, 1)
+                self.assertEqual(len(statements), 1)
+                self.assertEqual(job.status, "COMPLETED")
+                self.assertEqual([ev["stage"] for ev in events], ["s1", "s2"])
+                self.assertEqual(status, {"status": "COMPLETED", "error_message": None})
+
+                _job, events, status = dashboard._poll_stream(db, settings, where, events[-1]["id"])
+                self.assertEqual((events, status["status"]), ([], "COMPLETED"))
+
+                # A full batch holds the status back so the stream drains the rest before finishing.
+                with mock.patch.object(dashboard, "_STREAM_EVENT_BATCH", 2):
+                    _job, events, status = dashboard._poll_stream(db, settings, where, 0)
+                self.assertEqual(([ev["stage"] for ev in events], status), (["s0", "s1"], None))
+
+                self.assertEqual(dashboard._poll_stream(db, settings, AnalysisJob.id == "missing", 0), (None, [], None))
+            finally:
+                db.close()
+
+
+class TestJobEventsApi(unittest.TestCase):
+    def test_reads_only_status_columns_and_404s_for_other_users(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = replace(
+                Settings.from_env(), db_url=f"sqlite:///{Path(tmp) / 'dashboard.db'}", rate_limit_enabled=False
+            )
+            upgrade_to_head(settings)
+            db = get_sessionmaker(settings)()
+            try:
+                db.add_all(User(id=f"u{i}", email=f"u{i}@example.com", password_hash="!") for i in (1, 2))
+                db.commit()
+                db.add(
+                    Document(
+                        id="d1",
+                        user_id="u1",
+                        original_filename="paper.pdf",
+                        content_type="application/pdf",
+                        storage_path="/tmp/d1",
+                        sha256=b"d" * 32,
+                    )
+                )
+                db.commit()
+                db.add(AnalysisJob(id="j1", user_id="u1", document_id="d1", status="RUNNING"))
+                db.commit()
+                db.add(AnalysisJobEvent(job_id="j1", stage="parse"))
+                db.commit()
+
+                app = SimpleNamespace(state=SimpleNamespace(settings=settings))
+                request = SimpleNamespace(state=SimpleNamespace(), app=app)
+                with count_statements(get_engine(settings)) as statements:
+                    payload = dashboard.job_events(request, "j1", since_id=0, user=SimpleNamespace(id="u1"), db=db)
+                self.assertEqual((payload["status"], [ev["stage"] for ev in payload["events"]]), ("RUNNING", ["parse"]))
+                self.assertNotIn("attempts", statements[0])
+
+                with self.assertRaises(dashboard.HTTPException) as ctx:
+                    dashboard.job_events(request, "j1", since_id=0, user=SimpleNamespace(id="u2"), db=db)
+                self.assertEqual(ctx.exception.status_code, 404)
+            finally:
+                db.close()
+
+
+class TestReportColumnsDeferred(unittest.TestCase):
+    def test_access_checks_skip_the_report_unless_asked(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = replace(Settings.from_env(), db_url=f"sqlite:///{Path(tmp) / 'dashboard.db'}")
+            upgrade_to_head(settings)
+            db = get_sessionmaker(settings)()
+            try:
+                db.add(User(id="u1", email="u1@example.com", password_hash="!"))
+                db.commit()
+                db.add(
+                    Document(
+                        id="d1",
+                        user_id="u1",
+                        original_filename="paper.pdf",
+                        content_type="application/pdf",
+                        storage_path="/tmp/d1",
+                        sha256=b"d" * 32,
+                    )
+                )
+                db.commit()
+                db.add(AnalysisJob(id="j1", user_id="u1", document_id="d1", access_token_hash=b"t" * 32, report_json="{}"))
+                db.commit()
+                db.expunge_all()
+
+                with count_statements(get_engine(settings)) as statements:
+                    dashboard._require_access_job(db, b"t" * 32)
+                    self.assertNotIn("report_json", statements[-1])
+                    db.expunge_all()
+
+                    job = dashboard._require_access_job(db, b"t" * 32, with_report=True)
+                    issued = len(statements)
+                    self.assertEqual((job.report_json, job.sources_json), ("{}", None))
+                    self.assertEqual(len(statements), issued)
+                    db.expunge_all()
+
+                    # Report views get the report and the document's filename from a single joined row.
+                    with mock.patch.object(dashboard, "hash_token", return_value=b"t" * 32):
+                        issued = len(statements)
+                        (job, doc), error = dashboard._resolve_access_token(db, "token")
+                    self.assertIsNone(error)
+                    self.assertEqual((job.report_json, doc.original_filename), ("{}", "paper.pdf"))
+                    self.assertEqual(len(statements), issued + 1)
+                    self.assertNotIn("storage_path", statements[-1])
+                    db.expunge_all()
+
+                    with mock.patch.object(dashboard, "hash_token", return_value=b"t" * 32):
+                        _resolved, error = dashboard._resolve_access_token(db, "token", with_report=False)
+                    self.assertIsNone(error)
+                    self.assertNotIn("report_json", statements[-1])
+            finally:
+                db.close()
+
+
+class TestJsonColumns(unittest.TestCase):
+    def test_falls_back_for_values_orjson_rejects(self) -> None:
+        self.assertIsNone(dashboard._json_column(None))
+        self.assertEqual(dashboard._json_column('{"a": [1, "é"]}'), {"a": [1, "é"]})
+        self.assertTrue(math.isnan(dashboard._json_column('{"score": NaN}')["score"]))
+        self.assertEqual(dashboard._json_column("[Infinity]"), [math.inf])
+
+    def test_load_report_sorts_issues_by_severity(self) -> None:
+        job = SimpleNamespace(report_json='{"issues": [{"severity": "low"}, {"severity": "HIGH"}, {}]}')
+        report = dashboard._load_report(job)
+        self.assertEqual([issue.get("severity") for issue in report["issues"]], ["HIGH", None, "low"])
+        self.assertIsNone(dashboard._load_report(SimpleNamespace(report_json="{not json")))
+
+    def test_json_response_encodes_without_escaping(self) -> None:
+        response = dashboard._json_response({"report": {"title": "Café"}})
+        self.assertEqual(response.media_type, "application/json")
+        self.assertEqual(response.body, '{"report":{"title":"Café"}}'.encode())
+
+
+if __name__ == "__main__":
+    unittest.main()
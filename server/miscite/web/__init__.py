@@ -3,11 +3,15 @@ from __future__ import annotations
 import json
 import re
 from collections.abc import Mapping
+from datetime import UTC, datetime
+from functools import lru_cache
+from pathlib import Path
 from urllib.parse import urlsplit
 from urllib.parse import urlparse
 
 from fastapi import Request
 from fastapi.templating import Jinja2Templates
+from jinja2 import FileSystemBytecodeCache
 from markupsafe import Markup, escape
 
 from server.miscite.core.security import get_csrf_cookie
@@ -18,6 +22,7 @@ templates = Jinja2Templates(directory="server/miscite/templates")
 _DEEP_CITE_RE = re.compile(r"\[R(?P<num>\d{1,4})\]")
 _SAFE_URL_SCHEMES = {"http", "https"}
 _LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1"}
+_MONTH_ABBREVIATIONS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
 _DEFAULT_ROBOTS_INDEX = "index, follow, max-image-preview:large, max-snippet:-1, max-video-preview:-1"
 _DEFAULT_ROBOTS_NOINDEX = "noindex, nofollow, noarchive"
 _DEFAULT_META_KEYWORDS = (
@@ -203,6 +208,94 @@ def pretty_json(value) -> str:
 templates.env.filters["pretty_json"] = pretty_json
 
 
+# Billing amounts repeat heavily (top-up presets, thresholds, balances), so the formatted strings are memoized.
+@lru_cache(maxsize=4096)
+def format_currency(cents: int) -> str:
+    sign = "-" if cents < 0 else ""
+    value = abs(int(cents)) / 100.0
+    return f"{sign}${value:.2f}"
+
+
+templates.env.filters["format_currency"] = format_currency
+
+
+@lru_cache(maxsize=4096)
+def format_amount(cents: int) -> str:
+    sign = "-" if cents < 0 else "+"
+    value = abs(int(cents)) / 100.0
+    return f"{sign}${value:.2f}"
+
+
+templates.env.filters["format_amount"] = format_amount
+
+
+@lru_cache(maxsize=4096)
+def _human_minute(year: int, month: int, day: int, hour: int, minute: int) -> str:
+    return f"{_MONTH_ABBREVIATIONS[month - 1]} {day}, {year} at {hour:02d}:{minute:02d} UTC"
+
+
+def human_datetime(ts: datetime | None) -> str:
+    if ts is None:
+        return ""
+    # Timestamps are unique to the microsecond; keying on the displayed fields lets rows share entries.
+    return _human_minute(ts.year, ts.month, ts.day, ts.hour, ts.minute)
+
+
+templates.env.filters["human_datetime"] = human_datetime
+
+
+@lru_cache(maxsize=4096)
+def _human_day(year: int, month: int, day: int) -> str:
+    return f"{_MONTH_ABBREVIATIONS[month - 1]} {day}, {year}"
+
+
+def human_date(ts: datetime | None) -> str:
+    if ts is None:
+        return ""
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(UTC)
+    # A user's jobs cluster on a few days, so the formatted label is cached per calendar day.
+    return _human_day(ts.year, ts.month, ts.day)
+
+
+templates.env.filters["human_date"] = human_date
+
+
+def relative_time(ts: datetime | None, now: datetime) -> str:
+    """Age of `ts` at `now` ("just now", "5m ago", ...); naive timestamps are taken as UTC."""
+    if ts is None:
+        return ""
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=UTC)
+    seconds = max(0, int((now - ts).total_seconds()))
+    if seconds < 60:
+        return "just now"
+    if seconds < 3600:
+        return f"{seconds // 60}m ago"
+    if seconds < 86400:
+        return f"{seconds // 3600}h ago"
+    if seconds < 86400 * 7:
+        return f"{seconds // 86400}d ago"
+    if seconds < 86400 * 30:
+        return f"{max(1, seconds // (86400 * 7))}w ago"
+    if seconds < 86400 * 365:
+        return f"{max(1, seconds // (86400 * 30))}mo ago"
+    return f"{max(1, seconds // (86400 * 365))}y ago"
+
+
+templates.env.filters["relative_time"] = relative_time
+
+
+def preload_templates(bytecode_dir: Path | None = None) -> None:
+    """Compile every template up front (optionally via an on-disk bytecode cache) so no request pays for parsing."""
+    if bytecode_dir is not None:
+        bytecode_dir.mkdir(parents=True, exist_ok=True)
+        # Entries are checked against the template source checksum, so edited templates are recompiled.
+        templates.env.bytecode_cache = FileSystemBytecodeCache(str(bytecode_dir))
+    for name in templates.env.list_templates(extensions=("html",)):
+        templates.env.get_template(name)
+
+
 def _is_local_origin(origin: str) -> bool:
     try:
         parsed = urlsplit(origin)
@@ -231,9 +324,9 @@ def public_origin(request: Request) -> str:
         forwarded_host = request.headers.get("x-forwarded-host", "")
 
         if forwarded_proto:
-            scheme = forwarded_proto.split(",")[0].strip() or scheme
+            scheme = forwarded_proto.partition(",")[0].strip() or scheme
         if forwarded_host:
-            host = forwarded_host.split(",")[0].strip() or host
+            host = forwarded_host.partition(",")[0].strip() or host
 
     if host:
         return f"{scheme}://{host}".rstrip("/")
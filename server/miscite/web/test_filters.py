@@ -1,7 +1,18 @@
+import datetime as dt
+import tempfile
 import unittest
+from pathlib import Path
+from types import SimpleNamespace
 
 from server.miscite.web import deep_cite_links
+from server.miscite.web import format_amount
+from server.miscite.web import format_currency
+from server.miscite.web import human_date
+from server.miscite.web import human_datetime
+from server.miscite.web import preload_templates
 from server.miscite.web import reference_sources
+from server.miscite.web import relative_time
+from server.miscite.web import templates
 
 
 class TestDeepCiteLinks(unittest.TestCase):
@@ -65,5 +76,65 @@ class TestReferenceSources(unittest.TestCase):
         self.assertEqual(labels, ["Science Press"])
 
 
+class TestBillingFilters(unittest.TestCase):
+    def test_format_currency(self) -> None:
+        self.assertEqual(format_currency(1234), "$12.34")
+        self.assertEqual(format_currency(-11), "-$0.11")
+
+    def test_format_amount(self) -> None:
+        self.assertEqual(format_amount(500), "+$5.00")
+        self.assertEqual(format_amount(-500), "-$5.00")
+
+    def test_human_datetime(self) -> None:
+        self.assertEqual(human_datetime(None), "")
+        ts = dt.datetime(2026, 3, 7, 9, 5, 41, 123456)
+        self.assertEqual(human_datetime(ts), "Mar 7, 2026 at 09:05 UTC")
+        self.assertEqual(human_datetime(ts.replace(second=2, tzinfo=dt.UTC)), "Mar 7, 2026 at 09:05 UTC")
+
+    def test_filters_render_plain_transaction_rows(self) -> None:
+        row = SimpleNamespace(amount_cents=-250, balance_after_cents=750, created_at=dt.datetime(2026, 12, 1, 18, 0))
+        html = templates.env.from_string(
+            "{{ t.amount_cents|format_amount }} {{ t.balance_after_cents|format_currency }} {{ t.created_at|human_datetime }}"
+        ).render(t=row)
+        self.assertEqual(html, "-$2.50 $7.50 Dec 1, 2026 at 18:00 UTC")
+
+
+class TestJobDateFilters(unittest.TestCase):
+    def test_human_date(self) -> None:
+        self.assertEqual(human_date(None), "")
+        self.assertEqual(human_date(dt.datetime(2026, 1, 3, 23, 59)), "Jan 3, 2026")
+        eastern = dt.timezone(dt.timedelta(hours=-5))
+        self.assertEqual(human_date(dt.datetime(2026, 1, 3, 21, 0, tzinfo=eastern)), "Jan 4, 2026")
+
+    def test_relative_time(self) -> None:
+        now = dt.datetime(2026, 6, 1, 12, 0, tzinfo=dt.UTC)
+        ages = [dt.timedelta(seconds=30), dt.timedelta(minutes=5), dt.timedelta(hours=3), dt.timedelta(days=2)]
+        ages += [dt.timedelta(days=15), dt.timedelta(days=100), dt.timedelta(days=800), dt.timedelta(minutes=-5)]
+        self.assertEqual(
+            [relative_time((now - age).replace(tzinfo=None), now) for age in ages],
+            ["just now", "5m ago", "3h ago", "2d ago", "2w ago", "3mo ago", "2y ago", "just now"],
+        )
+        self.assertEqual(relative_time(None, now), "")
+
+    def test_filters_render_a_job_row(self) -> None:
+        job = SimpleNamespace(created_at=dt.datetime(2026, 5, 31, 11, 0))
+        html = templates.env.from_string("{{ job.created_at|human_date }} {{ job.created_at|relative_time(now) }}").render(
+            job=job, now=dt.datetime(2026, 6, 1, 12, 0, tzinfo=dt.UTC)
+        )
+        self.assertEqual(html, "May 31, 2026 1d ago")
+
+
+class TestPreloadTemplates(unittest.TestCase):
+    def test_compiles_every_template_into_the_bytecode_cache(self) -> None:
+        previous = templates.env.bytecode_cache
+        self.addCleanup(setattr, templates.env, "bytecode_cache", previous)
+        with tempfile.TemporaryDirectory() as tmp:
+            bytecode_dir = Path(tmp) / "jinja"
+            preload_templates(bytecode_dir)
+            names = templates.env.list_templates(extensions=("html",))
+            self.assertIn("billing.html", names)
+            self.assertEqual(len(list(bytecode_dir.iterdir())), len(names))
+
+
 if __name__ == "__main__":
     unittest.main()
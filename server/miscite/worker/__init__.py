@@ -8,20 +8,27 @@ import uuid
 from dataclasses import asdict
 from pathlib import Path
 
-from sqlalchemy import or_, select, update
+from sqlalchemy import delete, or_, select, update
 from sqlalchemy.orm import Session
 
 from server.miscite.billing.costing import compute_cost
 from server.miscite.billing.ledger import apply_usage_charge
 from server.miscite.billing.pricing import get_openrouter_pricing
-from server.miscite.billing.stripe import create_auto_charge_payment_intent
+from server.miscite.billing.stripe import create_auto_charge_payment_intent, install_http_client, stripe_sdk
 from server.miscite.billing.usage import UsageTracker
 from server.miscite.analysis.pipeline import analyze_document
 from server.miscite.core.cache import Cache
 from server.miscite.core.config import Settings
 from server.miscite.core.db import get_sessionmaker, init_db
-from server.miscite.core.jobs import delete_job_and_document
-from server.miscite.core.models import AnalysisJob, AnalysisJobEvent, BillingAccount, Document, JobStatus
+from server.miscite.core.jobs import delete_jobs_bulk
+from server.miscite.core.models import (
+    AnalysisJob,
+    AnalysisJobEvent,
+    BillingAccount,
+    Document,
+    JobStatus,
+    LoginCode,
+)
 from server.miscite.core.security import access_token_hint, generate_access_token
 from server.miscite.sources.predatory_sync import sync_predatory_datasets
 from server.miscite.sources.retractionwatch_sync import sync_retractionwatch_dataset
@@ -295,7 +302,7 @@ def _process_job(settings: Settings, job_id: str, *, log: logging.Logger | None
         report, sources, methodology_md = analyze_document(
             Path(doc.storage_path),
             settings=settings,
-            document_sha256=doc.sha256,
+            document_sha256=doc.sha256.hex(),
             usage_tracker=usage_tracker,
             progress_cb=progress_cb,
         )
@@ -501,7 +508,6 @@ def _maybe_auto_charge(settings: Settings, *, user_id: str) -> None:
                 auto_charge_in_flight_idempotency_key=idempotency_key,
                 auto_charge_in_flight_payment_intent_id=None,
                 auto_charge_last_error=None,
-                updated_at=now,
             )
         )
         if result.rowcount != 1:
@@ -523,7 +529,6 @@ def _maybe_auto_charge(settings: Settings, *, user_id: str) -> None:
                 .values(
                     auto_charge_in_flight_payment_intent_id=intent_id,
                     auto_charge_last_error=None,
-                    updated_at=dt.datetime.now(dt.UTC),
                 )
             )
             db.commit()
@@ -538,7 +543,6 @@ def _maybe_auto_charge(settings: Settings, *, user_id: str) -> None:
                     auto_charge_in_flight_amount_cents=0,
                     auto_charge_in_flight_idempotency_key=None,
                     auto_charge_in_flight_payment_intent_id=None,
-                    updated_at=dt.datetime.now(dt.UTC),
                 )
             )
             db.commit()
@@ -609,10 +613,8 @@ def _reap_expired_jobs(settings: Settings) -> None:
         ).all()
         if not rows:
             return
-        for job, doc in rows:
-            deleted_document = delete_job_and_document(db, job_id=job.id, document_id=doc.id)
-            if deleted_document:
-                expired_paths.append(doc.storage_path)
+        deleted_documents = delete_jobs_bulk(db, job_ids=[job.id for job, _doc in rows])
+        expired_paths = sorted({doc.storage_path for _job, doc in rows if doc.id in deleted_documents})
         db.commit()
         committed = True
     except Exception:
@@ -629,6 +631,21 @@ def _reap_expired_jobs(settings: Settings) -> None:
             pass
 
 
+def _reap_login_codes(settings: Settings) -> None:
+    SessionLocal = get_sessionmaker(settings)
+    db = SessionLocal()
+    try:
+        db.execute(
+            delete(LoginCode).where(LoginCode.expires_at < dt.datetime.now(dt.UTC)),
+            execution_options={"synchronize_session": False},
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+    finally:
+        db.close()
+
+
 def _reap_cache(settings: Settings) -> None:
     if not settings.cache_enabled:
         return
@@ -681,6 +698,9 @@ def run_worker_loop(settings: Settings, *, process_index: int = 0) -> None:
 
     next_pricing_sync_at = 0.0
     if settings.billing_enabled:
+        # Same Stripe setup as the web process: key set once, bounded timeout, one kept-alive connection.
+        install_http_client(pool_maxsize=1)
+        stripe_sdk(settings)
         snapshot = get_openrouter_pricing(settings, cache=Cache(settings=settings), force_refresh=True)
         if snapshot is not None:
             log.info("OpenRouter pricing synced (%s models, source=%s)", len(snapshot.models), snapshot.source)
@@ -713,6 +733,7 @@ def run_worker_loop(settings: Settings, *, process_index: int = 0) -> None:
         if time.time() >= next_reap_at:
             _reap_stale_jobs(settings)
             _reap_expired_jobs(settings)
+            _reap_login_codes(settings)
             _reap_cache(settings)
             next_reap_at = time.time() + float(settings.job_reap_interval_seconds)
 